@@ -10,14 +10,20 @@ Key improvements:
 - Data augmentation: generates more training samples
 """
 
+import glob
+import hashlib
+import importlib.util
 import json
 import math
+import os
 import pickle
 import random
 import sys
 from datetime import datetime
 from typing import List, Tuple, Dict, Optional
 
+import numpy as np
+
 if __name__ == '__main__':
     sys.modules['AI'] = sys.modules['__main__']
 
@@ -27,14 +33,38 @@ try:
 except ImportError:
     TQDM_AVAILABLE = False
 
+# PyTorch is only imported when a torch model is trained or loaded (torch_models.py);
+# the CPU and NumPy models run without it
+TORCH_AVAILABLE = importlib.util.find_spec('torch') is not None
+
+_TORCH_EXPORTS = ('LightNeuralNetwork', 'DeepNeuralNetwork', 'LogisticRegression',
+                  'FocusDataset', 'EnsembleModel', 'torch')
+
+
+def _torch_models():
+    """Import torch_models.py (and with it torch) on first use"""
+    ai_dir = os.path.dirname(os.path.abspath(__file__))
+    if ai_dir not in sys.path:
+        sys.path.append(ai_dir)
+    import torch_models
+    return torch_models
+
+
+def __getattr__(name):
+    # Older pickles (and callers) refer to the torch classes as AI.<name>
+    if name in _TORCH_EXPORTS:
+        return getattr(_torch_models(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _cuda_available() -> bool:
+    return TORCH_AVAILABLE and _torch_models().torch.cuda.is_available()
+
 try:
-    import torch
-    import torch.nn as nn
-    import torch.optim as optim
-    from torch.utils.data import Dataset, DataLoader
-    TORCH_AVAILABLE = True
+    import scipy.sparse as sp
+    SCIPY_AVAILABLE = True
 except ImportError:
-    TORCH_AVAILABLE = False
+    SCIPY_AVAILABLE = False
 
 
 class FeatureExtractor:
@@ -42,6 +72,9 @@ class FeatureExtractor:
 
     NUMERIC_FEATURES = ["keystrokes_per_min", "mouse_px_per_min", "pred_focus"]
 
+    # Bump when fit() / transform() change, so cached feature matrices are rebuilt
+    VERSION = 1
+
     def __init__(self):
         self.app_vocabulary = {}
         self.tag_vocabulary = {}
@@ -100,6 +133,40 @@ class FeatureExtractor:
         self.is_fitted = True
         print(f"  Feature space ready: {self.get_feature_dimension()} dimensions")
 
+    def to_dict(self) -> dict:
+        """JSON-serializable state (used by the NumPy model file)"""
+        if not self.is_fitted:
+            raise ValueError("Please call fit() first")
+        return {
+            'app_vocabulary': self.app_vocabulary,
+            'tag_vocabulary': self.tag_vocabulary,
+            'domain_vocabulary': self.domain_vocabulary,
+            'numeric_stats': self.numeric_stats,
+            'focus_keywords': sorted(self.focus_keywords),
+            'distraction_keywords': sorted(self.distraction_keywords),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'FeatureExtractor':
+        extractor = cls()
+        extractor.app_vocabulary = dict(state['app_vocabulary'])
+        extractor.tag_vocabulary = dict(state['tag_vocabulary'])
+        extractor.domain_vocabulary = dict(state['domain_vocabulary'])
+        extractor.numeric_stats = {key: dict(stats) for key, stats in state['numeric_stats'].items()}
+        extractor.focus_keywords = set(state['focus_keywords'])
+        extractor.distraction_keywords = set(state['distraction_keywords'])
+        extractor.is_fitted = True
+        return extractor
+
+    def fingerprint(self) -> dict:
+        """Everything besides the training data that decides the features (see FeatureCache)"""
+        return {
+            'version': self.VERSION,
+            'numeric_features': self.NUMERIC_FEATURES,
+            'focus_keywords': sorted(self.focus_keywords),
+            'distraction_keywords': sorted(self.distraction_keywords),
+        }
+
     def get_feature_dimension(self) -> int:
         if not self.is_fitted:
             raise ValueError("Please call fit() first")
@@ -175,214 +242,138 @@ class FeatureExtractor:
 
         return features
 
+    def transform_compact(self, data_points: List[dict]) -> 'CompactFeatures':
+        """
+        Compact (active-index) features for many data points
 
-# ==================== Model 1: Lightweight Neural Network ====================
-class LightNeuralNetwork(nn.Module):
-    """Lightweight network: works well for Medium and Very Hard cases"""
-
-    def __init__(self, input_dim: int, dropout_rate: float = 0.2):
-        super(LightNeuralNetwork, self).__init__()
-        self.network = nn.Sequential(
-            nn.Linear(input_dim, 64),
-            nn.BatchNorm1d(64),
-            nn.ReLU(),
-            nn.Dropout(dropout_rate),
-            nn.Linear(64, 32),
-            nn.BatchNorm1d(32),
-            nn.ReLU(),
-            nn.Dropout(dropout_rate),
-            nn.Linear(32, 1),
-            nn.Sigmoid()
-        )
-
-    def forward(self, x):
-        return self.network(x)
-
-
-# ==================== Model 2: Deep Neural Network ====================
-class DeepNeuralNetwork(nn.Module):
-    """Deep network: best for Extreme cases"""
-
-    def __init__(self, input_dim: int, dropout_rate: float = 0.3):
-        super(DeepNeuralNetwork, self).__init__()
-        self.network = nn.Sequential(
-            nn.Linear(input_dim, 128),
-            nn.BatchNorm1d(128),
-            nn.ReLU(),
-            nn.Dropout(dropout_rate),
-            nn.Linear(128, 64),
-            nn.BatchNorm1d(64),
-            nn.ReLU(),
-            nn.Dropout(dropout_rate),
-            nn.Linear(64, 32),
-            nn.BatchNorm1d(32),
-            nn.ReLU(),
-            nn.Dropout(dropout_rate),
-            nn.Linear(32, 1),
-            nn.Sigmoid()
-        )
-
-    def forward(self, x):
-        return self.network(x)
-
-
-# ==================== Model 3: Logistic Regression ====================
-class LogisticRegression(nn.Module):
-    """Simple logistic regression: good for Easy and Hard cases"""
-
-    def __init__(self, input_dim: int):
-        super(LogisticRegression, self).__init__()
-        self.linear = nn.Linear(input_dim, 1)
-        self.sigmoid = nn.Sigmoid()
-
-    def forward(self, x):
-        return self.sigmoid(self.linear(x))
-
-
-class FocusDataset(Dataset):
-    def __init__(self, X: List[List[float]], y: List[int]):
-        self.X = torch.FloatTensor(X)
-        self.y = torch.FloatTensor(y).unsqueeze(1)
-
-    def __len__(self):
-        return len(self.X)
-
-    def __getitem__(self, idx):
-        return self.X[idx], self.y[idx]
-
-
-class EnsembleModel:
-    """Ensemble model: combines predictions from 3 models"""
-
-    def __init__(self, input_dim: int, use_gpu: bool = True):
-        self.device = torch.device('cuda' if use_gpu and torch.cuda.is_available() else 'cpu')
-        print(f"  Ensemble model using device: {self.device}")
-
-        # Our 3 models
-        self.light_model = LightNeuralNetwork(input_dim, dropout_rate=0.2).to(self.device)
-        self.deep_model = DeepNeuralNetwork(input_dim, dropout_rate=0.3).to(self.device)
-        self.logistic_model = LogisticRegression(input_dim).to(self.device)
-
-        self.models = [self.light_model, self.deep_model, self.logistic_model]
-        self.model_names = ["Lightweight", "Deep", "Logistic"]
-
-        # Optimizers
-        self.optimizers = [
-            optim.Adam(self.light_model.parameters(), lr=0.001, weight_decay=0.0001),
-            optim.Adam(self.deep_model.parameters(), lr=0.001, weight_decay=0.0001),
-            optim.Adam(self.logistic_model.parameters(), lr=0.01, weight_decay=0.001)
-        ]
-
-        self.criterion = nn.BCELoss()
-        self.is_trained = False
-
-    def fit(self, X: List[List[float]], y: List[int], max_epochs: int = 100, batch_size: int = 32):
-        """Train all 3 models"""
-        dataset = FocusDataset(X, y)
-        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
-
-        print("\n  Training ensemble model (3 sub-models)...")
-
-        for model_idx, (model, optimizer, name) in enumerate(zip(self.models, self.optimizers, self.model_names)):
-            print(f"\n  [{model_idx+1}/3] Training {name} model...")
-            model.train()
-
-            if TQDM_AVAILABLE:
-                pbar = tqdm(range(max_epochs), desc=f"    {name}", ncols=100)
-            else:
-                pbar = range(max_epochs)
-
-            best_loss = float('inf')
-            patience_counter = 0
-
-            for epoch in pbar:
-                epoch_loss = 0.0
-                correct = 0
-                total = 0
-
-                for batch_X, batch_y in dataloader:
-                    batch_X = batch_X.to(self.device)
-                    batch_y = batch_y.to(self.device)
-
-                    outputs = model(batch_X)
-                    loss = self.criterion(outputs, batch_y)
-
-                    optimizer.zero_grad()
-                    loss.backward()
-                    optimizer.step()
-
-                    epoch_loss += loss.item()
-                    predictions = (outputs >= 0.5).float()
-                    correct += (predictions == batch_y).sum().item()
-                    total += batch_y.size(0)
-
-                avg_loss = epoch_loss / len(dataloader)
-                accuracy = correct / total
-
-                if TQDM_AVAILABLE:
-                    pbar.set_postfix({'loss': f'{avg_loss:.4f}', 'acc': f'{accuracy:.2%}'})
-
-                # Early stopping
-                if avg_loss < best_loss:
-                    best_loss = avg_loss
-                    patience_counter = 0
-                else:
-                    patience_counter += 1
-                    if patience_counter >= 15:
-                        if TQDM_AVAILABLE:
-                            pbar.close()
-                        break
-
-            print(f"    {name} model training complete (accuracy: {accuracy:.2%})")
-
-        self.is_trained = True
-
-    def predict_proba(self, features: List[float]) -> float:
-        """Ensemble prediction: weighted average"""
-        if not self.is_trained:
-            raise ValueError("Model not trained yet")
+        Instead of the three one-hot blocks, each row keeps the column index of
+        its active app / tag / domain entry (-1 if unseen in training), so the
+        size of a row does not depend on the vocabulary sizes. Dense columns
+        (numeric, engineered, keyword) are stored as-is.
 
-        # Put all models in eval mode (important!)
-        for model in self.models:
-            model.eval()
+        Args:
+            data_points: List of activity data dictionaries
 
-        with torch.no_grad():
-            X = torch.FloatTensor([features]).to(self.device)
-
-            # Get predictions from all 3 models
-            probs = [model(X).item() for model in self.models]
-
-            # Weighted average (based on model characteristics)
-            # Lightweight: 0.4, Deep: 0.4, Logistic: 0.2
-            weights = [0.4, 0.4, 0.2]
-            ensemble_prob = sum(p * w for p, w in zip(probs, weights))
-
-            return ensemble_prob
-
-    def predict(self, features: List[float]) -> int:
-        prob = self.predict_proba(features)
-        return 1 if prob >= 0.5 else 0
+        Returns:
+            CompactFeatures with the same values transform() would produce
+        """
+        if not self.is_fitted:
+            raise ValueError("Please call fit() first")
 
-    def batch_predict(self, X: List[List[float]]) -> List[int]:
-        # Set all models to eval mode
-        for model in self.models:
-            model.eval()
+        n = len(data_points)
+        n_numeric = len(self.NUMERIC_FEATURES)
+        app_offset = n_numeric + 6
+        tag_offset = app_offset + len(self.app_vocabulary)
+        domain_offset = tag_offset + len(self.tag_vocabulary)
+        keyword_offset = domain_offset + len(self.domain_vocabulary)
+        dim = keyword_offset + 2
+        dense_columns = np.array(list(range(app_offset)) + [keyword_offset, keyword_offset + 1], dtype=np.int64)
 
-        with torch.no_grad():
-            X_tensor = torch.FloatTensor(X).to(self.device)
+        # 1. Normalize numeric features
+        raw = np.array([[d[key] for key in self.NUMERIC_FEATURES] for d in data_points],
+                       dtype=np.float64).reshape(n, n_numeric)
+        means = np.array([self.numeric_stats[key]["mean"] for key in self.NUMERIC_FEATURES])
+        stds = np.array([self.numeric_stats[key]["std"] for key in self.NUMERIC_FEATURES])
+        kbd = raw[:, self.NUMERIC_FEATURES.index("keystrokes_per_min")]
+        mouse = raw[:, self.NUMERIC_FEATURES.index("mouse_px_per_min")]
+        pred_focus = raw[:, self.NUMERIC_FEATURES.index("pred_focus")]
 
-            # Predictions from all 3 models
-            probs_list = [model(X_tensor).squeeze() for model in self.models]
+        dense = np.empty((n, len(dense_columns)), dtype=np.float64)
+        dense[:, :n_numeric] = (raw - means) / stds
 
-            # Ensemble
-            weights = torch.tensor([0.4, 0.4, 0.2], device=self.device)
-            ensemble_probs = sum(p * w for p, w in zip(probs_list, weights))
+        # 2. Engineered features
+        total_activity = kbd + mouse / 1000.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dense[:, n_numeric] = np.where(total_activity > 0, kbd / total_activity, 0.0)
+        dense[:, n_numeric + 1] = (pred_focus > 70) | (pred_focus < 30)
+        # math.log1p (not np.log1p) so values match transform() bit for bit
+        dense[:, n_numeric + 2] = [math.log1p(k) * math.log1p(m / 1000.0)
+                                   for k, m in zip(kbd.tolist(), mouse.tolist())]
+        dense[:, n_numeric + 3] = 1.0 - np.abs(pred_focus / 100.0 - np.minimum(1.0, total_activity / 300.0))
 
-            predictions = (ensemble_probs >= 0.5).int().tolist()
+        # 3. Activity pattern features
+        dense[:, n_numeric + 4] = kbd > 200
+        dense[:, n_numeric + 5] = mouse > 30000
+
+        # 4. One-hot blocks as active column indices (title-derived values once per unique title)
+        title_info = {}
+        for d in data_points:
+            title = d["title"]
+            if title not in title_info:
+                domain = self.extract_domain_from_title(title)
+                domain_idx = self.domain_vocabulary.get(domain)
+                title_info[title] = (domain_offset + domain_idx if domain_idx is not None else -1,
+                                     1.0 if self.has_focus_keywords(title) else 0.0,
+                                     1.0 if self.has_distraction_keywords(title) else 0.0)
+
+        active = np.empty((n, 3), dtype=np.int64)
+        for row, d in enumerate(data_points):
+            app_idx = self.app_vocabulary.get(d["app"])
+            tag_idx = self.tag_vocabulary.get(d["tags"])
+            info = title_info[d["title"]]
+            active[row, 0] = app_offset + app_idx if app_idx is not None else -1
+            active[row, 1] = tag_offset + tag_idx if tag_idx is not None else -1
+            active[row, 2] = info[0]
+
+            # 5. Keyword features
+            dense[row, -2] = info[1]
+            dense[row, -1] = info[2]
+
+        return CompactFeatures(dense, active, dense_columns, dim)
+
+    def transform_batch(self, data_points: List[dict], sparse: bool = False):
+        """
+        Transform many data points at once (same features as transform)
+
+        Args:
+            data_points: List of activity data dictionaries
+            sparse: Return a scipy CSR matrix instead of a dense array (needs scipy)
+
+        Returns:
+            float64 array of shape (len(data_points), get_feature_dimension())
+        """
+        if sparse and not SCIPY_AVAILABLE:
+            raise ImportError("scipy is required for sparse=True")
+        compact = self.transform_compact(data_points)
+        return compact.to_csr() if sparse else compact.to_dense()
+
+
+class CompactFeatures:
+    """
+    Active-index form of a feature batch (see FeatureExtractor.transform_compact)
+
+    dense:         (n, k) values of the always-present columns
+    dense_columns: (k,) column index of each dense value in the full vector
+    active:        (n, 3) column index of the active app / tag / domain one-hot entry, -1 = none
+    dim:           full feature dimension
+    """
+
+    def __init__(self, dense: np.ndarray, active: np.ndarray, dense_columns: np.ndarray, dim: int):
+        self.dense = dense
+        self.active = active
+        self.dense_columns = dense_columns
+        self.dim = dim
 
-            if isinstance(predictions, int):
-                return [predictions]
-            return predictions
+    def __len__(self):
+        return len(self.dense)
+
+    def to_dense(self) -> np.ndarray:
+        n = len(self.dense)
+        X = np.zeros((n, self.dim), dtype=np.float64)
+        X[:, self.dense_columns] = self.dense
+        rows, slots = np.nonzero(self.active >= 0)
+        X[rows, self.active[rows, slots]] = 1.0
+        return X
+
+    def to_csr(self):
+        n, k = self.dense.shape
+        rows, slots = np.nonzero(self.active >= 0)
+        X = sp.csr_matrix((np.concatenate([self.dense.ravel(), np.ones(len(rows))]),
+                           (np.concatenate([np.repeat(np.arange(n), k), rows]),
+                            np.concatenate([np.tile(self.dense_columns, n), self.active[rows, slots]]))),
+                          shape=(n, self.dim))
+        X.eliminate_zeros()
+        return X
 
 
 class CPUEnsembleModel:
@@ -404,6 +395,16 @@ class CPUEnsembleModel:
         return 1.0 / (1.0 + math.exp(-z))
 
     def compute_activation(self, features: List[float]) -> float:
+        if isinstance(features, CompactFeatures):
+            # Only the dense columns and the active one-hot entries contribute
+            activation = self.weights[0]
+            for col, x in zip(features.dense_columns.tolist(), features.dense[0].tolist()):
+                activation += self.weights[col + 1] * x
+            for col in features.active[0].tolist():
+                if col >= 0:
+                    activation += self.weights[col + 1]
+            return activation
+
         activation = self.weights[0]
         for w, x in zip(self.weights[1:], features):
             activation += w * x
@@ -415,8 +416,34 @@ class CPUEnsembleModel:
     def predict(self, features: List[float]) -> int:
         return 1 if self.predict_proba(features) >= 0.5 else 0
 
+    def predict_with_proba(self, features: List[float]) -> Tuple[int, float]:
+        prob = self.predict_proba(features)
+        return (1 if prob >= 0.5 else 0), prob
+
+    def batch_predict_proba(self, X: List[List[float]]) -> List[float]:
+        if isinstance(X, CompactFeatures):
+            w = np.asarray(self.weights, dtype=np.float64)
+            z = X.dense @ w[1:][X.dense_columns] + w[0]
+            z += np.where(X.active >= 0, w[1:][np.maximum(X.active, 0)], 0.0).sum(axis=1)
+        else:
+            # One matrix-vector product for the whole batch (lists, arrays and sparse matrices)
+            if not (SCIPY_AVAILABLE and sp.issparse(X)):
+                X = np.asarray(X, dtype=np.float64).reshape(-1, self.input_dim)
+            w = np.asarray(self.weights, dtype=np.float64)
+            z = X @ w[1:] + w[0]
+        z = np.asarray(z).reshape(-1)
+        with np.errstate(over='ignore'):
+            probs = np.where(z < -60, 0.0, np.where(z > 60, 1.0, 1.0 / (1.0 + np.exp(-z))))
+        return probs.tolist()
+
     def batch_predict(self, X: List[List[float]]) -> List[int]:
-        return [self.predict(f) for f in X]
+        return [1 if p >= 0.5 else 0 for p in self.batch_predict_proba(X)]
+
+    def to_numpy(self) -> 'NumpyEnsembleModel':
+        """Export for the NumPy runtime (a single logistic layer)"""
+        W = np.asarray(self.weights[1:], dtype=np.float64).reshape(-1, 1)
+        b = np.asarray(self.weights[:1], dtype=np.float64)
+        return NumpyEnsembleModel([[(W, b, 'sigmoid')]], [1.0], ["Logistic"])
 
     def fit(self, X: List[List[float]], y: List[int], max_epochs: int = 1000, learning_rate: float = 0.1):
         if TQDM_AVAILABLE:
@@ -433,14 +460,15 @@ class CPUEnsembleModel:
                 loss = -(label * math.log(prob + 1e-10) + (1 - label) * math.log(1 - prob + 1e-10))
                 total_loss += loss
 
+                # Accuracy from the activation already computed (before the update)
+                if (1 if prob >= 0.5 else 0) == label:
+                    correct += 1
+
                 error = prob - label
                 self.weights[0] -= learning_rate * error
                 for i in range(len(features)):
                     self.weights[i + 1] -= learning_rate * error * features[i]
 
-                if self.predict(features) == label:
-                    correct += 1
-
             if TQDM_AVAILABLE and epoch % 100 == 0:
                 pbar.set_postfix({
                     'loss': f'{total_loss/len(X):.4f}',
@@ -449,6 +477,273 @@ class CPUEnsembleModel:
 
         self.is_trained = True
 
+    def fit_vectorized(self, X, y: List[int], max_epochs: int = 1000, learning_rate: float = 0.5,
+                       batch_size: int = 256, validation_split: float = 0.1, patience: int = 20,
+                       seed: int = 0):
+        """
+        Mini-batch gradient descent with NumPy matmuls (same logistic model as fit())
+
+        Args:
+            X: Feature matrix (NumPy array or scipy sparse matrix, e.g. transform_batch(sparse=True))
+            y: Labels (0/1)
+            max_epochs: Maximum number of passes over the training rows
+            learning_rate: Step size for the mean mini-batch gradient
+            batch_size: Rows per gradient step
+            validation_split: Fraction of rows held out for early stopping (0 disables it)
+            patience: Stop after this many epochs without a lower validation loss;
+                      the weights with the best validation loss are kept
+            seed: Shuffling seed
+        """
+        if not (SCIPY_AVAILABLE and sp.issparse(X)):
+            X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        rng = np.random.default_rng(seed)
+
+        order = rng.permutation(X.shape[0])
+        n_val = int(len(order) * validation_split) if validation_split > 0 else 0
+        val_idx, train_idx = order[:n_val], order[n_val:]
+        X_val, y_val = X[val_idx], y[val_idx]
+
+        w = np.asarray(self.weights[1:], dtype=np.float64)
+        b = float(self.weights[0])
+
+        def probabilities(features, w, b):
+            return 1.0 / (1.0 + np.exp(-np.clip(features @ w + b, -60.0, 60.0)))
+
+        def log_loss(prob, labels):
+            return float(-np.mean(labels * np.log(prob + 1e-10) + (1 - labels) * np.log(1 - prob + 1e-10)))
+
+        best = (float('inf'), w.copy(), b)
+        epochs_without_improvement = 0
+
+        if TQDM_AVAILABLE:
+            pbar = tqdm(range(max_epochs), desc="CPU Training", ncols=100)
+        else:
+            pbar = range(max_epochs)
+
+        for epoch in pbar:
+            rng.shuffle(train_idx)
+            total_loss = 0.0
+            correct = 0
+
+            for start in range(0, len(train_idx), batch_size):
+                idx = train_idx[start:start + batch_size]
+                X_batch, y_batch = X[idx], y[idx]
+                prob = probabilities(X_batch, w, b)
+                total_loss += log_loss(prob, y_batch) * len(idx)
+                correct += int(np.sum((prob >= 0.5) == (y_batch == 1)))
+
+                error = prob - y_batch
+                w -= learning_rate * np.asarray(X_batch.T @ error).reshape(-1) / len(idx)
+                b -= learning_rate * float(error.mean())
+
+            if n_val:
+                val_loss = log_loss(probabilities(X_val, w, b), y_val)
+                if val_loss < best[0] - 1e-6:
+                    best = (val_loss, w.copy(), b)
+                    epochs_without_improvement = 0
+                else:
+                    epochs_without_improvement += 1
+
+            if TQDM_AVAILABLE:
+                postfix = {'loss': f'{total_loss/len(train_idx):.4f}', 'acc': f'{correct/len(train_idx):.2%}'}
+                if n_val:
+                    postfix['val_loss'] = f'{val_loss:.4f}'
+                pbar.set_postfix(postfix)
+
+            if n_val and epochs_without_improvement >= patience:
+                if TQDM_AVAILABLE:
+                    pbar.close()
+                break
+
+        if n_val:
+            _, w, b = best
+        # Same representation as fit(): [bias, w_1, ..., w_n] as plain floats
+        self.weights = [float(b)] + w.tolist()
+        self.is_trained = True
+
+
+class NumpyEnsembleModel:
+    """
+    Torch-free inference runtime for the ensemble models
+
+    Each sub-model is a list of dense layers (W of shape (in, out), b, activation)
+    with BatchNorm already folded into W and b (see export_models.py); the
+    prediction is the weighted average of the sub-model outputs.
+    """
+
+    def __init__(self, sub_models: List[list], ensemble_weights: List[float], model_names: List[str] = None):
+        self.sub_models = [[(np.asarray(W), np.asarray(b), act) for W, b, act in layers] for layers in sub_models]
+        self.ensemble_weights = [float(w) for w in ensemble_weights]
+        self.model_names = list(model_names or [f"model_{i}" for i in range(len(sub_models))])
+        self.input_dim = self.sub_models[0][0][0].shape[0]
+        self.is_trained = True
+
+    @staticmethod
+    def _activate(z: np.ndarray, activation: Optional[str]) -> np.ndarray:
+        if activation == 'relu':
+            return np.maximum(z, 0.0)
+        if activation == 'sigmoid':
+            # Clamped like CPUEnsembleModel.sigmoid (exp never overflows)
+            return 1.0 / (1.0 + np.exp(-np.clip(z, -60.0, 60.0)))
+        return z
+
+    @staticmethod
+    def _input_layer(W: np.ndarray, b: np.ndarray, X) -> np.ndarray:
+        if isinstance(X, CompactFeatures):
+            # Gather only the rows of W that belong to non-zero features
+            h = X.dense @ W[X.dense_columns] + b
+            known = X.active >= 0
+            return h + (W[np.where(known, X.active, 0)] * known[..., None]).sum(axis=1)
+        return np.asarray(X @ W) + b
+
+    def batch_predict_proba(self, X: List[List[float]]) -> List[float]:
+        if not isinstance(X, CompactFeatures) and not (SCIPY_AVAILABLE and sp.issparse(X)):
+            X = np.asarray(X, dtype=np.float64).reshape(-1, self.input_dim)
+        total = 0.0
+        for layers, weight in zip(self.sub_models, self.ensemble_weights):
+            W, b, activation = layers[0]
+            h = self._activate(self._input_layer(W, b, X), activation)
+            for W, b, activation in layers[1:]:
+                h = self._activate(h @ W + b, activation)
+            total = total + weight * h.reshape(-1)
+        return np.asarray(total).tolist()
+
+    def batch_predict(self, X: List[List[float]]) -> List[int]:
+        return [1 if p >= 0.5 else 0 for p in self.batch_predict_proba(X)]
+
+    def predict_proba(self, features: List[float]) -> float:
+        if isinstance(features, CompactFeatures):
+            return self.batch_predict_proba(features)[0]
+        return self.batch_predict_proba([features])[0]
+
+    def predict(self, features: List[float]) -> int:
+        return 1 if self.predict_proba(features) >= 0.5 else 0
+
+    def predict_with_proba(self, features: List[float]) -> Tuple[int, float]:
+        prob = self.predict_proba(features)
+        return (1 if prob >= 0.5 else 0), prob
+
+    def save(self, filename: str, meta: dict):
+        """Plain arrays in one .npz (no pickle); meta (JSON) describes the layers"""
+        arrays = {}
+        layout = []
+        for i, layers in enumerate(self.sub_models):
+            layout.append([])
+            for j, (W, b, activation) in enumerate(layers):
+                arrays[f"m{i}_l{j}_W"] = W
+                arrays[f"m{i}_l{j}_b"] = b
+                layout[-1].append(activation)
+        meta = dict(meta, layout=layout, ensemble_weights=self.ensemble_weights, model_names=self.model_names)
+        arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+        with open(filename, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, filename: str) -> Tuple['NumpyEnsembleModel', dict]:
+        with np.load(filename, allow_pickle=False) as data:
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            sub_models = [[(data[f"m{i}_l{j}_W"], data[f"m{i}_l{j}_b"], activation)
+                           for j, activation in enumerate(activations)]
+                          for i, activations in enumerate(meta['layout'])]
+        return cls(sub_models, meta['ensemble_weights'], meta['model_names']), meta
+
+
+class FeatureCache:
+    """
+    Preprocessed training data for FocusClassifier.train, stored as one .npz per input
+
+    The key is a SHA-256 over the data files' bytes, the feature extractor fingerprint
+    and the preprocessing settings, so editing the data or the features invalidates the
+    entry automatically. An entry holds the fitted feature extractor, the train / test
+    feature matrices (compact form) with labels, and the parsed, augmented and split
+    records (only read with with_records=True).
+    """
+
+    DIRECTORY = 'feature_cache'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @classmethod
+    def for_data(cls, data_file: str) -> 'FeatureCache':
+        """Cache directory next to the data file"""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(data_file)), cls.DIRECTORY))
+
+    @staticmethod
+    def key(files: List[str], settings: dict) -> str:
+        digest = hashlib.sha256()
+        for filename in files:
+            with open(filename, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            digest.update(b'\0')
+        digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _prefix(files: List[str]) -> str:
+        return '+'.join(os.path.splitext(os.path.basename(f))[0] for f in files)
+
+    def path(self, files: List[str], key: str) -> str:
+        return os.path.join(self.directory, f"{self._prefix(files)}.{key[:16]}.npz")
+
+    def load(self, files: List[str], key: str, with_records: bool = False) -> Optional[dict]:
+        filename = self.path(files, key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename, allow_pickle=False) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('key') != key:
+                    return None
+                extractor = FeatureExtractor.from_dict(meta['extractor'])
+                dim = extractor.get_feature_dimension()
+                entry = {
+                    'meta': meta,
+                    'extractor': extractor,
+                    'train_features': CompactFeatures(data['train_dense'], data['train_active'],
+                                                      data['dense_columns'], dim),
+                    'y_train': data['y_train'].tolist(),
+                    'test_features': CompactFeatures(data['test_dense'], data['test_active'],
+                                                     data['dense_columns'], dim),
+                    'y_test': data['y_test'].tolist(),
+                }
+                if with_records:
+                    records = json.loads(data['records'].tobytes().decode('utf-8'))
+                    entry['train_set'] = [tuple(r) for r in records['train']]
+                    entry['test_set'] = [tuple(r) for r in records['test']]
+            return entry
+        except (OSError, KeyError, ValueError) as e:
+            print(f"  Ignoring unreadable feature cache {filename}: {e}")
+            return None
+
+    def save(self, files: List[str], key: str, extractor: 'FeatureExtractor',
+             train_set: List[Tuple[dict, int]], test_set: List[Tuple[dict, int]],
+             train_features: 'CompactFeatures', test_features: 'CompactFeatures', meta: dict = None) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        filename = self.path(files, key)
+        meta = dict(meta or {}, key=key, extractor=extractor.to_dict(),
+                    created=datetime.now().isoformat(timespec='seconds'))
+        records = {'train': train_set, 'test': test_set}
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f,
+                     meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                     records=np.frombuffer(json.dumps(records).encode('utf-8'), dtype=np.uint8),
+                     dense_columns=train_features.dense_columns,
+                     train_dense=train_features.dense, train_active=train_features.active,
+                     y_train=np.asarray([label for _, label in train_set], dtype=np.int8),
+                     test_dense=test_features.dense, test_active=test_features.active,
+                     y_test=np.asarray([label for _, label in test_set], dtype=np.int8))
+        os.replace(tmp, filename)
+
+        # Older entries for the same data files are stale now
+        for old in glob.glob(os.path.join(self.directory, f"{glob.escape(self._prefix(files))}.*.npz")):
+            if old != filename:
+                os.remove(old)
+        return filename
+
 
 def augment_data(data_point: dict, label: int, n_augmentations: int = 2) -> List[Tuple[dict, int]]:
     """Data augmentation: generate variations"""
@@ -477,8 +772,9 @@ class FocusClassifier:
     def __init__(self, use_gpu: bool = True, use_augmentation: bool = True):
         self.feature_extractor = FeatureExtractor()
         self.model = None
-        self.use_gpu = use_gpu and TORCH_AVAILABLE and torch.cuda.is_available()
+        self.use_gpu = use_gpu and _cuda_available()
         self.use_augmentation = use_augmentation
+        self.version = '5.0-Ensemble'
         self.is_ready = False
 
         if self.use_gpu:
@@ -506,8 +802,14 @@ class FocusClassifier:
         if not self.is_ready:
             raise ValueError("Model not ready yet")
 
-        X_test = [self.feature_extractor.transform(data) for data, _ in test_set]
+        X_test = self.feature_extractor.transform_compact([data for data, _ in test_set])
         y_test = [label for _, label in test_set]
+        return self.evaluate_features(X_test, y_test)
+
+    def evaluate_features(self, X_test, y_test: List[int]) -> Dict[str, float]:
+        """evaluate() on already transformed features"""
+        if not self.is_ready:
+            raise ValueError("Model not ready yet")
 
         predictions = self.model.batch_predict(X_test)
 
@@ -521,17 +823,95 @@ class FocusClassifier:
 
         return {'accuracy': accuracy, 'precision': precision, 'recall': recall}
 
-    def train(self, focused_file: str, unfocused_file: str, test_split: float = 0.2) -> Tuple[Dict, Dict]:
+    def train(self, focused_file: str, unfocused_file: str, test_split: float = 0.2,
+              use_cache: bool = True) -> Tuple[Dict, Dict]:
+        """
+        Train on two JSON-lines files. With use_cache, the parsed, augmented, split and
+        transformed data is stored in a FeatureCache next to focused_file and reused while
+        the data files and the feature extractor stay the same (same split every run).
+        """
         print("\n" + "=" * 60)
         print("Hybrid Ensemble Classifier Training")
         print("=" * 60)
 
+        files = [focused_file, unfocused_file]
+        cache = cache_key = cached = None
+        if use_cache:
+            cache = FeatureCache.for_data(focused_file)
+            settings = {'features': FeatureExtractor().fingerprint(),
+                        'augmentation': self.use_augmentation, 'test_split': test_split}
+            try:
+                cache_key = FeatureCache.key(files, settings)
+                cached = cache.load(files, cache_key)
+            except OSError:
+                cache = None  # missing data file: load_data reports it below
+
+        if cached is not None:
+            meta = cached['meta']
+            print(f"\nUsing cached features ({os.path.basename(cache.path(files, cache_key))}, "
+                  f"created {meta['created']})")
+            print(f"  Focused: {meta['n_focused']} samples, Unfocused: {meta['n_unfocused']} samples")
+            print(f"  Training: {len(cached['y_train'])} samples, Testing: {len(cached['y_test'])} samples")
+            self.feature_extractor = cached['extractor']
+            train_features, y_train = cached['train_features'], cached['y_train']
+            test_features, y_test = cached['test_features'], cached['y_test']
+        else:
+            prepared = self._prepare_training_data(focused_file, unfocused_file, test_split)
+            if prepared is None:
+                return None, None
+            train_set, test_set, counts = prepared
+            train_features = self.feature_extractor.transform_compact([data for data, _ in train_set])
+            y_train = [label for _, label in train_set]
+            test_features = self.feature_extractor.transform_compact([data for data, _ in test_set])
+            y_test = [label for _, label in test_set]
+            if cache is not None:
+                filename = cache.save(files, cache_key, self.feature_extractor, train_set, test_set,
+                                      train_features, test_features, meta=counts)
+                print(f"  Cached features in {filename}")
+
+        print("\nStarting ensemble model training...")
+        if self.use_gpu:
+            self.model = _torch_models().EnsembleModel(
+                input_dim=self.feature_extractor.get_feature_dimension(),
+                use_gpu=True
+            )
+            self.model.fit(train_features.to_dense(), y_train, max_epochs=100, fast=True)
+        else:
+            self.model = CPUEnsembleModel(
+                input_dim=self.feature_extractor.get_feature_dimension()
+            )
+            X_train = train_features.to_csr() if SCIPY_AVAILABLE else train_features.to_dense()
+            self.model.fit_vectorized(X_train, y_train, max_epochs=1000, batch_size=256)
+
+        self.is_ready = True
+
+        print("\nEvaluating performance...")
+        train_metrics = self.evaluate_features(train_features, y_train)
+        test_metrics = self.evaluate_features(test_features, y_test)
+
+        print("\n" + "=" * 60)
+        print("Training Results")
+        print("=" * 60)
+        print(f"Training set:")
+        print(f"  Accuracy: {train_metrics['accuracy']:.2%}")
+        print(f"  Precision: {train_metrics['precision']:.2%}")
+        print(f"  Recall: {train_metrics['recall']:.2%}")
+        print(f"\nTest set:")
+        print(f"  Accuracy: {test_metrics['accuracy']:.2%}")
+        print(f"  Precision: {test_metrics['precision']:.2%}")
+        print(f"  Recall: {test_metrics['recall']:.2%}")
+        print("=" * 60)
+
+        return train_metrics, test_metrics
+
+    def _prepare_training_data(self, focused_file: str, unfocused_file: str, test_split: float):
+        """Load, augment, shuffle and split the data and fit the feature extractor"""
         focused_data = self.load_data(focused_file)
         unfocused_data = self.load_data(unfocused_file)
 
         if not focused_data or not unfocused_data:
             print("Failed to load data")
-            return None, None
+            return None
 
         print(f"\nOriginal data:")
         print(f"  Focused: {len(focused_data)} samples")
@@ -561,54 +941,27 @@ class FocusClassifier:
 
         self.feature_extractor.fit(train_set)
 
-        X_train = [self.feature_extractor.transform(data) for data, _ in train_set]
-        y_train = [label for _, label in train_set]
-
-        print("\nStarting ensemble model training...")
-        if self.use_gpu:
-            self.model = EnsembleModel(
-                input_dim=self.feature_extractor.get_feature_dimension(),
-                use_gpu=True
-            )
-            self.model.fit(X_train, y_train, max_epochs=100, batch_size=32)
-        else:
-            self.model = CPUEnsembleModel(
-                input_dim=self.feature_extractor.get_feature_dimension()
-            )
-            self.model.fit(X_train, y_train, max_epochs=1000, learning_rate=0.1)
-
-        self.is_ready = True
-
-        print("\nEvaluating performance...")
-        train_metrics = self.evaluate(train_set)
-        test_metrics = self.evaluate(test_set)
-
-        print("\n" + "=" * 60)
-        print("Training Results")
-        print("=" * 60)
-        print(f"Training set:")
-        print(f"  Accuracy: {train_metrics['accuracy']:.2%}")
-        print(f"  Precision: {train_metrics['precision']:.2%}")
-        print(f"  Recall: {train_metrics['recall']:.2%}")
-        print(f"\nTest set:")
-        print(f"  Accuracy: {test_metrics['accuracy']:.2%}")
-        print(f"  Precision: {test_metrics['precision']:.2%}")
-        print(f"  Recall: {test_metrics['recall']:.2%}")
-        print("=" * 60)
-
-        return train_metrics, test_metrics
+        return train_set, test_set, {'n_focused': len(focused_data), 'n_unfocused': len(unfocused_data)}
 
     def predict(self, data_point: dict) -> Tuple[int, List[float]]:
         if not self.is_ready:
             raise ValueError("Model not trained yet")
 
-        features = self.feature_extractor.transform(data_point)
-        prediction = self.model.predict(features)
-        prob_focus = self.model.predict_proba(features)
+        features = self.feature_extractor.transform_compact([data_point])
+        prediction, prob_focus = self.model.predict_with_proba(features)
         prob_unfocus = 1.0 - prob_focus
 
         return prediction, [prob_unfocus, prob_focus]
 
+    def predict_batch(self, data_points: List[dict]) -> List[Tuple[int, List[float]]]:
+        """predict for many data points: one batch transform and one model call"""
+        if not self.is_ready:
+            raise ValueError("Model not trained yet")
+
+        X = self.feature_extractor.transform_compact(data_points)
+        probs = self.model.batch_predict_proba(X)
+        return [(1 if p >= 0.5 else 0, [1.0 - p, p]) for p in probs]
+
     def get_reminder(self, data_point: dict, prediction: int, probability: List[float]) -> Dict[str, any]:
         is_focused = (prediction == 1)
         confidence = probability[prediction] * 100
@@ -644,29 +997,44 @@ class FocusClassifier:
         ]
         return random.choice(tips)
 
+    def _monitor_result(self, data_point: dict, prediction: int, probability: List[float]) -> Dict:
+        reminder = self.get_reminder(data_point, prediction, probability)
+        return {
+            'prediction': {
+                'is_focused': prediction == 1,
+                'confidence': probability[prediction],
+                'probabilities': {
+                    'unfocused': probability[0],
+                    'focused': probability[1]
+                }
+            },
+            'message': reminder['message'],
+            'suggestion': reminder.get('suggestion', ''),
+            'status': reminder['status']
+        }
+
     def monitor_activity(self, data_point: dict) -> Optional[Dict]:
         if not self.is_ready:
             return None
         try:
             prediction, probability = self.predict(data_point)
-            reminder = self.get_reminder(data_point, prediction, probability)
-            return {
-                'prediction': {
-                    'is_focused': prediction == 1,
-                    'confidence': probability[prediction],
-                    'probabilities': {
-                        'unfocused': probability[0],
-                        'focused': probability[1]
-                    }
-                },
-                'message': reminder['message'],
-                'suggestion': reminder.get('suggestion', ''),
-                'status': reminder['status']
-            }
+            return self._monitor_result(data_point, prediction, probability)
         except Exception as e:
             print(f"Prediction error: {e}")
             return None
 
+    def monitor_batch(self, data_points: List[dict]) -> List[Optional[Dict]]:
+        """monitor_activity for many data points with a single batched model call"""
+        if not self.is_ready:
+            return [None] * len(data_points)
+        try:
+            predictions = self.predict_batch(data_points)
+        except Exception:
+            # A bad record should only fail itself, not the whole batch
+            return [self.monitor_activity(d) for d in data_points]
+        return [self._monitor_result(d, prediction, probability)
+                for d, (prediction, probability) in zip(data_points, predictions)]
+
     def save_model(self, filename: str = 'focus_model.pkl'):
         if not self.is_ready:
             raise ValueError("No model to save")
@@ -679,7 +1047,7 @@ class FocusClassifier:
             'feature_extractor': self.feature_extractor,
             'model': self.model,
             'use_gpu': self.use_gpu,
-            'version': '5.0-Ensemble'
+            'version': self.version
         }
 
         with open(filename, 'wb') as f:
@@ -691,7 +1059,52 @@ class FocusClassifier:
 
         print(f"\nModel saved to {filename}")
 
+    def export_numpy(self, filename: str = 'focus_model.npz'):
+        """Save the model for the torch-free NumPy runtime (plain arrays + feature space as JSON)"""
+        if not self.is_ready:
+            raise ValueError("No model to save")
+
+        runtime_model = self.model if isinstance(self.model, NumpyEnsembleModel) else self.model.to_numpy()
+        runtime_model.save(filename, {
+            'version': self.version,
+            'feature_extractor': self.feature_extractor.to_dict(),
+        })
+        print(f"NumPy model saved to {filename}")
+
+    def export_torchscript(self, filename: str = 'focus_model.pt'):
+        """Save the ensemble as one fused, frozen TorchScript graph (feature space in meta.json)"""
+        if not self.is_ready:
+            raise ValueError("No model to save")
+
+        runtime_model = self.model if isinstance(self.model, NumpyEnsembleModel) else self.model.to_numpy()
+        _torch_models().save_torchscript(runtime_model, filename, {
+            'version': self.version,
+            'input_dim': runtime_model.input_dim,
+            'feature_extractor': self.feature_extractor.to_dict(),
+        })
+        print(f"TorchScript model saved to {filename}")
+
     def load_model(self, filename: str = 'focus_model.pkl'):
+        if filename.endswith('.pt'):
+            # Fused TorchScript graph: needs torch, but no pickled AI classes
+            self.model, meta = _torch_models().TorchScriptEnsembleModel.load(filename)
+            self.feature_extractor = FeatureExtractor.from_dict(meta['feature_extractor'])
+            self.use_gpu = False
+            self.version = meta.get('version', 'unknown')
+            self.is_ready = True
+            print(f"Model loaded (version: {self.version}, TorchScript)")
+            return
+
+        if filename.endswith('.npz'):
+            # NumPy runtime: no pickle, no AI classes needed in the file, no torch
+            self.model, meta = NumpyEnsembleModel.load(filename)
+            self.feature_extractor = FeatureExtractor.from_dict(meta['feature_extractor'])
+            self.use_gpu = False
+            self.version = meta.get('version', 'unknown')
+            self.is_ready = True
+            print(f"Model loaded (version: {self.version}, NumPy runtime)")
+            return
+
         with open(filename, 'rb') as f:
             model_data = pickle.load(f)
 
@@ -699,13 +1112,17 @@ class FocusClassifier:
         self.model = model_data['model']
         self.use_gpu = model_data.get('use_gpu', False)
 
-        if self.use_gpu and TORCH_AVAILABLE and torch.cuda.is_available():
+        if self.use_gpu and _cuda_available():
             if hasattr(self.model, 'models'):
                 for model in self.model.models:
                     model.to(self.model.device)
 
+        if hasattr(self.model, 'eval_mode'):
+            self.model.eval_mode()
+
+        self.version = model_data.get('version', 'unknown')
         self.is_ready = True
-        print(f"Model loaded (version: {model_data.get('version', 'unknown')})")
+        print(f"Model loaded (version: {self.version})")
 
 
 if __name__ == "__main__":
@@ -718,4 +1135,6 @@ if __name__ == "__main__":
 
     if train_result[0] is not None:
         classifier.save_model()
+        # Keep the NumPy runtime file (preferred by the backend) in sync with the pickle
+        classifier.export_numpy()
         print("\nTraining complete!")
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Per-call benchmark for FocusClassifier.predict
+
+Compares the previous single-row path (dense transform, model.predict() followed
+by model.predict_proba(), and .eval() on every sub-model inside each call) with the
+current fused path (compact features + predict_with_proba, eval mode set once at load).
+
+Usage:
+    python bench_predict.py [--model focus_model.pkl] [--data focused_data.txt] [--n 2000]
+
+The shipped model is a CPUEnsembleModel. When PyTorch is installed, an EnsembleModel
+with the same feature space (randomly initialized, only for timing) is measured too.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import AI
+
+sys.modules['__main__'] = AI  # focus_model.pkl was pickled from AI.py run as a script
+
+
+def legacy_torch_predict_proba(model, features):
+    """EnsembleModel.predict_proba as it was: eval() per call, one .item() per sub-model"""
+    for m in model.models:
+        m.eval()
+    with AI.torch.no_grad():
+        X = AI.torch.FloatTensor([features]).to(model.device)
+        probs = [m(X).item() for m in model.models]
+        return sum(p * w for p, w in zip(probs, [0.4, 0.4, 0.2]))
+
+
+def legacy_predict(classifier, data_point, predict_proba):
+    features = classifier.feature_extractor.transform(data_point)
+    prob_focus = predict_proba(features)
+    prediction = 1 if prob_focus >= 0.5 else 0  # model.predict(): first ensemble pass
+    prob_focus = predict_proba(features)          # model.predict_proba(): second pass
+    return prediction, [1.0 - prob_focus, prob_focus]
+
+
+def time_per_call(fn, rows, n):
+    for row in rows[:50]:  # warm-up
+        fn(row)
+    start = time.perf_counter()
+    for i in range(n):
+        fn(rows[i % len(rows)])
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def bench(name, classifier, rows, n, legacy_proba):
+    old = time_per_call(lambda d: legacy_predict(classifier, d, legacy_proba), rows, n)
+    new = time_per_call(classifier.predict, rows, n)
+    mismatches = sum(1 for d in rows[:500]
+                     if legacy_predict(classifier, d, legacy_proba)[0] != classifier.predict(d)[0])
+    print(f"{name:<28} legacy {old:8.1f} us   fused {new:8.1f} us   "
+          f"saving {old - new:8.1f} us/call ({old / new:.1f}x)   label mismatches: {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='focus_model.pkl')
+    parser.add_argument('--data', default='focused_data.txt')
+    parser.add_argument('--n', type=int, default=2000, help='predict calls per measurement')
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    classifier = AI.FocusClassifier(use_gpu=False)
+    classifier.load_model(args.model)
+    print(f"\n{len(rows)} data points, {classifier.feature_extractor.get_feature_dimension()} features, "
+          f"{args.n} calls each\n")
+
+    bench(type(classifier.model).__name__, classifier, rows, args.n,
+          lambda features: classifier.model.predict_proba(features))
+
+    if AI.TORCH_AVAILABLE:
+        AI.torch.manual_seed(0)
+        torch_classifier = AI.FocusClassifier(use_gpu=False)
+        torch_classifier.feature_extractor = classifier.feature_extractor
+        torch_classifier.model = AI.EnsembleModel(classifier.feature_extractor.get_feature_dimension(),
+                                                  use_gpu=False)
+        torch_classifier.model.is_trained = True
+        torch_classifier.model.eval_mode()
+        torch_classifier.is_ready = True
+        bench('EnsembleModel (random init)', torch_classifier, rows, args.n,
+              lambda features: legacy_torch_predict_proba(torch_classifier.model, features))
+
+
+if __name__ == '__main__':
+    main()
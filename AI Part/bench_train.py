@@ -0,0 +1,94 @@
+"""
+Wall-clock benchmark for EnsembleModel.fit (PyTorch, CPU)
+
+Trains the same initial ensemble on focused_data.txt + not_focused_data.txt with
+  - the DataLoader loop (sub-models one after another, --batch-size rows per step)
+  - the tensor-resident loop (fast=True) at the same batch size and at FAST_BATCH_SIZE
+  - parallel=True (one worker process per sub-model, DataLoader loop)
+and compares wall clock and training accuracy.
+
+Usage:
+    python bench_train.py [--epochs 5] [--batch-size 32] [--num-threads N]
+                          [--threads-per-worker N] [--no-parallel] [--limit N]
+
+Early stopping needs 15 epochs without improvement, so short runs do the same work on both paths.
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+
+import AI
+
+DATA_FILES = ('focused_data.txt', 'not_focused_data.txt')
+
+
+def load_training_set(limit=None):
+    data = []
+    for label, filename in zip((1, 0), DATA_FILES):
+        with open(filename, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        data.extend((d, label) for d in rows[:limit])
+    return data
+
+
+def accuracy(model, X, y):
+    predictions = model.batch_predict(X)
+    return sum(1 for p, t in zip(predictions, y) if p == t) / len(y)
+
+
+def run(name, model, X, y, **fit_kwargs):
+    start = time.perf_counter()
+    model.fit(X, y, **fit_kwargs)
+    elapsed = time.perf_counter() - start
+    return name, elapsed, accuracy(model, X, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--num-threads', type=int, default=None, help='torch threads for the sequential runs')
+    parser.add_argument('--threads-per-worker', type=int, default=None)
+    parser.add_argument('--no-parallel', action='store_true', help='skip the process pool run')
+    parser.add_argument('--limit', type=int, default=None, help='rows per data file')
+    args = parser.parse_args()
+
+    if not AI.TORCH_AVAILABLE:
+        print("PyTorch not installed")
+        return 1
+
+    data = load_training_set(args.limit)
+    extractor = AI.FeatureExtractor()
+    extractor.fit(data)
+    X = extractor.transform_batch([d for d, _ in data])
+    y = [label for _, label in data]
+    print(f"\n{len(y)} rows, {X.shape[1]} features, {args.epochs} epochs, {os.cpu_count()} CPU(s)")
+
+    AI.torch.manual_seed(0)
+    base = AI.EnsembleModel(X.shape[1], use_gpu=False)
+    fast_batch = AI.EnsembleModel.FAST_BATCH_SIZE
+    common = dict(max_epochs=args.epochs, num_threads=args.num_threads)
+    results = [
+        run(f'DataLoader (batch {args.batch_size})', copy.deepcopy(base), X, y,
+            batch_size=args.batch_size, **common),
+        run(f'tensor (batch {args.batch_size})', copy.deepcopy(base), X, y,
+            batch_size=args.batch_size, fast=True, **common),
+        run(f'tensor (batch {fast_batch})', copy.deepcopy(base), X, y, fast=True, **common),
+    ]
+    if not args.no_parallel:
+        results.append(run(f'parallel (batch {args.batch_size})', copy.deepcopy(base), X, y,
+                           max_epochs=args.epochs, batch_size=args.batch_size,
+                           parallel=True, threads_per_worker=args.threads_per_worker))
+
+    print()
+    baseline = results[0][1]
+    for name, elapsed, acc in results:
+        print(f"{name:<24} {elapsed:7.1f} s   {baseline / elapsed:5.2f}x   train accuracy {acc:.2%}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+"""
+Export focus_model.pkl for the torch-free NumPy runtime
+
+    python export_models.py [--model focus_model.pkl] [--out focus_model.npz]
+                            [--torchscript [focus_model.pt]] [--no-check] [--check-torch]
+
+Folds BatchNorm into the preceding Linear layers, writes every sub-model as plain
+arrays (plus the fitted feature space as JSON) into one .npz, then:
+  - checks parity against the original model on focused_data.txt and not_focused_data.txt
+  - loads both files in fresh interpreters and compares load time, peak memory and
+    whether torch got imported
+
+--torchscript additionally writes all sub-models and the 0.4/0.4/0.2 weighting as one
+fused, frozen TorchScript graph (feature space stored in the archive's meta.json). Its
+parity test loads the file with plain torch.jit.load, without the AI classes.
+
+--check-torch also exports a briefly trained torch EnsembleModel on the same feature
+space and checks its parity (the shipped model is a CPUEnsembleModel).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import AI
+
+sys.modules['__main__'] = AI  # focus_model.pkl was pickled from AI.py run as a script
+
+DATA_FILES = ('focused_data.txt', 'not_focused_data.txt')
+TOLERANCE = 1e-5
+
+LOAD_SNIPPET = r"""
+import sys, time
+t0 = time.perf_counter()
+import AI
+sys.modules['__main__'] = AI
+classifier = AI.FocusClassifier(use_gpu=False)
+classifier.load_model(sys.argv[1])
+elapsed = time.perf_counter() - t0
+peak_mb = float('nan')
+try:
+    with open('/proc/self/status') as f:  # Linux: high-water mark of this process only
+        peak_mb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+except OSError:
+    try:
+        import psutil
+        peak_mb = psutil.Process().memory_info().peak_wset / (1024 * 1024)  # Windows
+    except (ImportError, AttributeError):
+        pass
+print('RESULT', elapsed, peak_mb, 'torch' in sys.modules)
+"""
+
+
+def load_records(files=DATA_FILES):
+    records = []
+    for filename in files:
+        with open(filename, 'r', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def parity_check(name, reference_model, exported_model, features) -> bool:
+    expected = reference_model.batch_predict_proba(features)
+    actual = exported_model.batch_predict_proba(features)
+    max_diff = max(abs(a - b) for a, b in zip(expected, actual))
+    mismatches = sum(1 for a, b in zip(expected, actual) if (a >= 0.5) != (b >= 0.5))
+    ok = max_diff <= TOLERANCE and mismatches == 0
+    print(f"  {name}: {len(expected)} rows, max |p - p_ref| = {max_diff:.2e}, "
+          f"label mismatches = {mismatches} -> {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+class ScriptedModel:
+    """Minimal wrapper so a bare torch.jit.load() module can go through parity_check"""
+
+    def __init__(self, filename):
+        import torch
+        self.torch = torch
+        extra_files = {'meta.json': ''}
+        self.module = torch.jit.load(filename, map_location='cpu', _extra_files=extra_files)
+        self.meta = json.loads(extra_files['meta.json'])
+
+    def batch_predict_proba(self, X):
+        with self.torch.inference_mode():
+            return self.module(self.torch.as_tensor(X, dtype=self.torch.float32)).tolist()
+
+
+def check_torchscript(name, reference_model, filename, dense_features) -> bool:
+    return parity_check(f"{name} -> TorchScript", reference_model, ScriptedModel(filename), dense_features)
+
+
+def measure_load(filename):
+    out = subprocess.run([sys.executable, '-c', LOAD_SNIPPET, filename], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in out.stdout.splitlines():
+        if line.startswith('RESULT '):
+            _, elapsed, peak_mb, torch_loaded = line.split()
+            return float(elapsed), float(peak_mb), torch_loaded == 'True'
+    raise RuntimeError(f"Loading {filename} failed:\n{out.stderr}")
+
+
+def check_torch_export(classifier, records, torchscript_path=None) -> bool:
+    if not AI.TORCH_AVAILABLE:
+        print("  PyTorch not installed, skipping torch export check")
+        return True
+    extractor = classifier.feature_extractor
+    X = extractor.transform_batch(records)
+    y = [1] * len(load_records(DATA_FILES[:1])) + [0] * len(load_records(DATA_FILES[1:]))
+    model = AI.EnsembleModel(extractor.get_feature_dimension(), use_gpu=False)
+    model.fit(X, y, max_epochs=2, batch_size=64)
+    ok = parity_check("EnsembleModel (2 epochs)", model, model.to_numpy(), extractor.transform_compact(records))
+    if torchscript_path:
+        trained = AI.FocusClassifier(use_gpu=False)
+        trained.feature_extractor, trained.model, trained.is_ready = extractor, model, True
+        path = torchscript_path.replace('.pt', '_check.pt')
+        trained.export_torchscript(path)
+        ok = check_torchscript("EnsembleModel (2 epochs)", model, path, X) and ok
+        os.remove(path)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='focus_model.pkl')
+    parser.add_argument('--out', default='focus_model.npz')
+    parser.add_argument('--torchscript', nargs='?', const='focus_model.pt', default=None,
+                        help='also export a fused TorchScript graph (default path: focus_model.pt)')
+    parser.add_argument('--no-check', action='store_true', help='skip parity and load checks')
+    parser.add_argument('--check-torch', action='store_true', help='also check a torch EnsembleModel export')
+    args = parser.parse_args()
+
+    classifier = AI.FocusClassifier(use_gpu=False)
+    classifier.load_model(args.model)
+    classifier.export_numpy(args.out)
+    print(f"  {os.path.getsize(args.model) / 1024:.0f} KB -> {os.path.getsize(args.out) / 1024:.0f} KB")
+    if args.torchscript:
+        classifier.export_torchscript(args.torchscript)
+    if args.no_check:
+        return 0
+
+    print("\nParity check:")
+    runtime = AI.FocusClassifier(use_gpu=False)
+    runtime.load_model(args.out)
+    records = load_records()
+    ok = parity_check(type(classifier.model).__name__, classifier.model, runtime.model,
+                      classifier.feature_extractor.transform_compact(records))
+    if args.torchscript:
+        ok = check_torchscript(type(classifier.model).__name__, classifier.model, args.torchscript,
+                               classifier.feature_extractor.transform_batch(records)) and ok
+    if args.check_torch:
+        ok = check_torch_export(classifier, records, args.torchscript) and ok
+
+    print("\nCold load (fresh interpreter):")
+    for filename in (args.model, args.out) + ((args.torchscript,) if args.torchscript else ()):
+        elapsed, peak_mb, torch_loaded = measure_load(filename)
+        print(f"  {filename:<18} {elapsed * 1000:7.0f} ms   peak RSS {peak_mb:6.0f} MB   "
+              f"torch imported: {torch_loaded}")
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
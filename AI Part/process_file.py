@@ -4,7 +4,9 @@ Compatible with GPU-accelerated AI.py
 """
 
 import json
+import os
 import sys
+from pathlib import Path
 from typing import Optional
 
 # Fix pickle loading issue - needed even when running as main
@@ -21,7 +23,63 @@ except ImportError:
     sys.exit(1)
 
 
-def process_data(input_file: str, output_file: str, verbose: bool = True):
+# NumPy runtime export (see export_models.py) if present: no torch import, no pickle
+MODEL_FILE = 'focus_model.npz' if os.path.exists('focus_model.npz') else 'focus_model.pkl'
+SERVICE_ENV = 'FOXMATE_INFERENCE_SERVICE'  # "host:port" of backend/inference_service.py
+SERVICE_BATCH_SIZE = 256
+
+_default_classifier = None
+
+
+def get_default_classifier(model_file: str = MODEL_FILE) -> FocusClassifier:
+    """Load the classifier once per process and reuse it"""
+    global _default_classifier
+    if _default_classifier is None:
+        classifier = FocusClassifier(use_gpu=False)  # CPU is fine for inference
+        classifier.load_model(model_file)
+        _default_classifier = classifier
+    return _default_classifier
+
+
+def connect_service(address: Optional[str] = None):
+    """
+    Connect to the shared inference service (backend/inference_service.py)
+
+    Args:
+        address: "host:port"; defaults to the FOXMATE_INFERENCE_SERVICE environment variable
+
+    Returns:
+        InferenceClient, or None if no address is configured or the service is unreachable
+    """
+    address = address or os.environ.get(SERVICE_ENV)
+    if not address:
+        return None
+    backend_dir = str(Path(__file__).resolve().parent.parent / 'backend')
+    if backend_dir not in sys.path:
+        sys.path.append(backend_dir)
+    from inference_client import InferenceClient
+    try:
+        return InferenceClient.from_address(address)
+    except OSError as e:
+        print(f"Inference service {address} unavailable ({e}), using local model")
+        return None
+
+
+def _from_service_result(result: dict):
+    """monitor_activity-style service result -> (prediction, probability, reminder)"""
+    pred = result['prediction']
+    prediction = 1 if pred['is_focused'] else 0
+    probability = [pred['probabilities']['unfocused'], pred['probabilities']['focused']]
+    reminder = {
+        'status': result['status'],
+        'confidence': pred['confidence'] * 100,
+        'message': result['message'],
+        'suggestion': result.get('suggestion', ''),
+    }
+    return prediction, probability, reminder
+
+
+def process_data(input_file: str, output_file: str, verbose: bool = True, client=None):
     """
     Read data file, analyze with AI, output reminders and suggestions
 
@@ -29,31 +87,40 @@ def process_data(input_file: str, output_file: str, verbose: bool = True):
         input_file: Input file path (one JSON object per line)
         output_file: Output file path
         verbose: Show detailed progress
+        client: InferenceClient for the shared inference service (optional;
+                defaults to FOXMATE_INFERENCE_SERVICE, else the local model is used)
     """
     if verbose:
         print("=" * 60)
         print("Focus Analysis Processing")
         print("=" * 60)
 
+    if client is None:
+        client = connect_service()
+
     # Load model
-    if verbose:
-        print("\nLoading AI model...")
+    classifier = None
+    if client is not None:
+        if verbose:
+            print(f"\nUsing inference service {client.host}:{client.port}")
+    else:
+        if verbose:
+            print("\nLoading AI model...")
 
-    try:
-        classifier = FocusClassifier(use_gpu=False)  # CPU is fine for inference
-        classifier.load_model('focus_model.pkl')
+        try:
+            classifier = get_default_classifier()
 
-        if verbose:
-            print("Model loaded successfully!")
-    except FileNotFoundError:
-        print("\nError: Model file focus_model.pkl not found")
-        print("   Please run AI.py first to train the model")
-        return False
-    except Exception as e:
-        print(f"\nFailed to load model: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+            if verbose:
+                print("Model loaded successfully!")
+        except FileNotFoundError:
+            print(f"\nError: Model file {MODEL_FILE} not found")
+            print("   Please run AI.py first to train the model")
+            return False
+        except Exception as e:
+            print(f"\nFailed to load model: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
 
     # Process data
     if verbose:
@@ -81,14 +148,52 @@ def process_data(input_file: str, output_file: str, verbose: bool = True):
     count_focused = 0
     count_unfocused = 0
 
+    # Parse data
+    parsed = []
     for i, line in enumerate(lines, 1):
         try:
-            # Parse data
-            data = json.loads(line)
+            parsed.append((i, json.loads(line)))
+        except json.JSONDecodeError:
+            if verbose:
+                print(f"Skipping line {i}: Invalid JSON format")
 
+    # Local model: one batch transform + one model call for the whole file;
+    # if any record is malformed, fall back to per-line prediction below
+    local_results = {}
+    if classifier is not None and parsed:
+        try:
+            batch = classifier.predict_batch([data for _, data in parsed])
+            local_results = {i: result for (i, _), result in zip(parsed, batch)}
+        except Exception:
+            local_results = {}
+
+    # Service: one request per batch of records instead of one model call per line
+    service_results = {}
+    if client is not None:
+        for start in range(0, len(parsed), SERVICE_BATCH_SIZE):
+            chunk = parsed[start:start + SERVICE_BATCH_SIZE]
+            try:
+                batch = client.predict([data for _, data in chunk])
+            except Exception as e:
+                if verbose:
+                    print(f"Service request failed for lines {chunk[0][0]}-{chunk[-1][0]}: {e}")
+                continue
+            for (i, _), result in zip(chunk, batch):
+                service_results[i] = result
+
+    for i, data in parsed:
+        try:
             # AI analysis
-            prediction, probability = classifier.predict(data)
-            reminder = classifier.get_reminder(data, prediction, probability)
+            if client is not None:
+                if i not in service_results:
+                    continue
+                prediction, probability, reminder = _from_service_result(service_results[i])
+            else:
+                if i in local_results:
+                    prediction, probability = local_results[i]
+                else:
+                    prediction, probability = classifier.predict(data)
+                reminder = classifier.get_reminder(data, prediction, probability)
 
             # Track stats
             count_success += 1
@@ -113,10 +218,6 @@ def process_data(input_file: str, output_file: str, verbose: bool = True):
             if verbose and i % 10 == 0:
                 print(f"   Processed: {i}/{len(lines)}")
 
-        except json.JSONDecodeError:
-            if verbose:
-                print(f"Skipping line {i}: Invalid JSON format")
-            continue
         except KeyError as e:
             if verbose:
                 print(f"Skipping line {i}: Missing field {e}")
@@ -173,27 +274,31 @@ def process_data(input_file: str, output_file: str, verbose: bool = True):
     return True
 
 
-def process_single_activity(data: dict, classifier: Optional[FocusClassifier] = None) -> Optional[dict]:
+def process_single_activity(data: dict, classifier: Optional[FocusClassifier] = None,
+                            client=None) -> Optional[dict]:
     """
     Analyze a single activity data point
 
     Args:
         data: Activity data dictionary
-        classifier: Classifier instance (optional, will create new one if not provided)
+        classifier: Classifier instance (optional, the cached default model is used if not provided)
+        client: InferenceClient for the shared inference service (optional, takes precedence)
 
     Returns:
         Analysis result dictionary, or None if failed
     """
-    if classifier is None:
-        classifier = FocusClassifier(use_gpu=False)
+    if client is None and classifier is None:
         try:
-            classifier.load_model('focus_model.pkl')
-        except:
+            classifier = get_default_classifier()
+        except Exception:
             return None
 
     try:
-        prediction, probability = classifier.predict(data)
-        reminder = classifier.get_reminder(data, prediction, probability)
+        if client is not None:
+            prediction, probability, reminder = _from_service_result(client.predict([data])[0])
+        else:
+            prediction, probability = classifier.predict(data)
+            reminder = classifier.get_reminder(data, prediction, probability)
 
         return {
             'status': reminder['status'],
@@ -0,0 +1,610 @@
+"""
+PyTorch sub-models and the GPU ensemble
+
+Split out of AI.py so that loading a CPU or NumPy model never imports torch.
+AI.py re-exports these classes on first access (older pickles refer to them as
+AI.<name> / __main__.<name>), so `AI.EnsembleModel` keeps working.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import Dataset, DataLoader
+
+from AI import CompactFeatures, NumpyEnsembleModel, SCIPY_AVAILABLE, TQDM_AVAILABLE
+
+if TQDM_AVAILABLE:
+    from tqdm import tqdm
+
+if SCIPY_AVAILABLE:
+    import scipy.sparse as sp
+
+
+# ==================== Model 1: Lightweight Neural Network ====================
+class LightNeuralNetwork(nn.Module):
+    """Lightweight network: works well for Medium and Very Hard cases"""
+
+    def __init__(self, input_dim: int, dropout_rate: float = 0.2):
+        super(LightNeuralNetwork, self).__init__()
+        self.network = nn.Sequential(
+            nn.Linear(input_dim, 64),
+            nn.BatchNorm1d(64),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(64, 32),
+            nn.BatchNorm1d(32),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(32, 1),
+            nn.Sigmoid()
+        )
+
+    def forward(self, x):
+        return self.network(x)
+
+    def layers(self):
+        return list(self.network)
+
+    def input_layer(self):
+        return self.network[0]
+
+    def forward_hidden(self, h):
+        """Everything after the first Linear layer (for sparse-aware inference)"""
+        for layer in islice(self.network, 1, None):
+            h = layer(h)
+        return h
+
+
+# ==================== Model 2: Deep Neural Network ====================
+class DeepNeuralNetwork(nn.Module):
+    """Deep network: best for Extreme cases"""
+
+    def __init__(self, input_dim: int, dropout_rate: float = 0.3):
+        super(DeepNeuralNetwork, self).__init__()
+        self.network = nn.Sequential(
+            nn.Linear(input_dim, 128),
+            nn.BatchNorm1d(128),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(128, 64),
+            nn.BatchNorm1d(64),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(64, 32),
+            nn.BatchNorm1d(32),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(32, 1),
+            nn.Sigmoid()
+        )
+
+    def forward(self, x):
+        return self.network(x)
+
+    def layers(self):
+        return list(self.network)
+
+    def input_layer(self):
+        return self.network[0]
+
+    def forward_hidden(self, h):
+        """Everything after the first Linear layer (for sparse-aware inference)"""
+        for layer in islice(self.network, 1, None):
+            h = layer(h)
+        return h
+
+
+# ==================== Model 3: Logistic Regression ====================
+class LogisticRegression(nn.Module):
+    """Simple logistic regression: good for Easy and Hard cases"""
+
+    def __init__(self, input_dim: int):
+        super(LogisticRegression, self).__init__()
+        self.linear = nn.Linear(input_dim, 1)
+        self.sigmoid = nn.Sigmoid()
+
+    def forward(self, x):
+        return self.sigmoid(self.linear(x))
+
+    def layers(self):
+        return [self.linear, self.sigmoid]
+
+    def input_layer(self):
+        return self.linear
+
+    def forward_hidden(self, h):
+        """Everything after the first Linear layer (for sparse-aware inference)"""
+        return self.sigmoid(h)
+
+
+class FocusDataset(Dataset):
+    def __init__(self, X: List[List[float]], y: List[int]):
+        self.X = torch.FloatTensor(X)
+        self.y = torch.FloatTensor(y).unsqueeze(1)
+
+    def __len__(self):
+        return len(self.X)
+
+    def __getitem__(self, idx):
+        return self.X[idx], self.y[idx]
+
+
+class EnsembleModel:
+    """Ensemble model: combines predictions from 3 models"""
+
+    # Weighted average (based on model characteristics)
+    # Lightweight: 0.4, Deep: 0.4, Logistic: 0.2
+    ENSEMBLE_WEIGHTS = [0.4, 0.4, 0.2]
+
+    # Default batch sizes: DataLoader path / tensor-resident path (fast=True)
+    BATCH_SIZE = 32
+    FAST_BATCH_SIZE = 256
+
+    def __init__(self, input_dim: int, use_gpu: bool = True):
+        self.device = torch.device('cuda' if use_gpu and torch.cuda.is_available() else 'cpu')
+        print(f"  Ensemble model using device: {self.device}")
+
+        # Our 3 models
+        self.light_model = LightNeuralNetwork(input_dim, dropout_rate=0.2).to(self.device)
+        self.deep_model = DeepNeuralNetwork(input_dim, dropout_rate=0.3).to(self.device)
+        self.logistic_model = LogisticRegression(input_dim).to(self.device)
+
+        self.models = [self.light_model, self.deep_model, self.logistic_model]
+        self.model_names = ["Lightweight", "Deep", "Logistic"]
+
+        # Optimizers
+        self.optimizers = [
+            optim.Adam(self.light_model.parameters(), lr=0.001, weight_decay=0.0001),
+            optim.Adam(self.deep_model.parameters(), lr=0.001, weight_decay=0.0001),
+            optim.Adam(self.logistic_model.parameters(), lr=0.01, weight_decay=0.001)
+        ]
+
+        self.criterion = nn.BCELoss()
+        self.is_trained = False
+
+    def fit(self, X: List[List[float]], y: List[int], max_epochs: int = 100, batch_size: int = None,
+            parallel: bool = False, threads_per_worker: int = None, fast: bool = False,
+            num_threads: int = None):
+        """
+        Train all 3 models
+
+        fast=True keeps the whole dataset as one tensor on the training device, shuffles by
+        index permutation and reads loss / accuracy back once per epoch instead of per batch.
+        batch_size defaults to BATCH_SIZE, or FAST_BATCH_SIZE on the fast path.
+
+        parallel=True trains the sub-models concurrently in a process pool (CPU only): each
+        worker gets a copy of its sub-model and optimizer, runs with threads_per_worker torch
+        threads (default: CPU count / 3) and sends the trained weights back.
+
+        num_threads sets torch.set_num_threads for the duration of a sequential fit().
+        """
+        if batch_size is None:
+            batch_size = self.FAST_BATCH_SIZE if fast else self.BATCH_SIZE
+
+        print("\n  Training ensemble model (3 sub-models)...")
+
+        if parallel and self.device.type != 'cpu':
+            print("  Parallel training is CPU only, training sequentially on", self.device)
+            parallel = False
+
+        if parallel:
+            self._fit_parallel(X, y, max_epochs, batch_size, threads_per_worker, fast)
+        else:
+            previous_threads = torch.get_num_threads()
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            try:
+                if fast:
+                    data = _training_tensors(X, y, self.device)
+                else:
+                    data = DataLoader(FocusDataset(X, y), batch_size=batch_size, shuffle=True)
+                for model_idx, (model, optimizer, name) in enumerate(zip(self.models, self.optimizers, self.model_names)):
+                    print(f"\n  [{model_idx+1}/3] Training {name} model...")
+                    if fast:
+                        accuracy, _ = _fit_submodel_tensors(model, optimizer, self.criterion, *data,
+                                                            max_epochs, batch_size, name)
+                    else:
+                        accuracy, _ = _fit_submodel(model, optimizer, self.criterion, data, self.device,
+                                                    max_epochs, name)
+                    print(f"    {name} model training complete (accuracy: {accuracy:.2%})")
+            finally:
+                torch.set_num_threads(previous_threads)
+
+        self.is_trained = True
+        self.eval_mode()
+
+    def _fit_parallel(self, X, y, max_epochs: int, batch_size: int, threads_per_worker: int = None,
+                      fast: bool = False):
+        """One worker process per sub-model; weights and optimizer state are copied back afterwards"""
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // len(self.models))
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        jobs = [(name, _to_bytes({'model': model, 'optimizer': optimizer.state_dict(),
+                                  'optimizer_class': type(optimizer)}),
+                 X, y, max_epochs, batch_size, threads_per_worker, int(torch.randint(2 ** 31, (1,))), fast)
+                for model, optimizer, name in zip(self.models, self.optimizers, self.model_names)]
+
+        print(f"  Training {len(jobs)} sub-models in parallel ({threads_per_worker} torch thread(s) each)...")
+        # spawn: same behaviour on Windows and Linux, and no forked copy of the parent's torch thread pool
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_train_submodel, jobs))
+
+        for model, optimizer, name, (payload, accuracy, epochs, seconds) in zip(
+                self.models, self.optimizers, self.model_names, results):
+            state = _from_bytes(payload)
+            model.load_state_dict(state['model'])
+            optimizer.load_state_dict(state['optimizer'])
+            print(f"    {name} model training complete (accuracy: {accuracy:.2%}, "
+                  f"{epochs} epochs, {seconds:.1f}s)")
+
+    def eval_mode(self):
+        """Put all models in eval mode (important!). Done once after fit() and at load time, not per prediction"""
+        for model in self.models:
+            model.eval()
+
+    def predict_proba(self, features: List[float]) -> float:
+        """Ensemble prediction: weighted average"""
+        if not self.is_trained:
+            raise ValueError("Model not trained yet")
+
+        if isinstance(features, CompactFeatures):
+            return self.batch_predict_proba(features)[0]
+
+        with torch.inference_mode():
+            X = torch.FloatTensor([features]).to(self.device)
+
+            # Get predictions from all 3 models, combine before reading the value back
+            ensemble_prob = sum(model(X) * w for model, w in zip(self.models, self.ENSEMBLE_WEIGHTS))
+
+            return ensemble_prob.item()
+
+    def predict(self, features: List[float]) -> int:
+        prob = self.predict_proba(features)
+        return 1 if prob >= 0.5 else 0
+
+    def predict_with_proba(self, features: List[float]) -> Tuple[int, float]:
+        """Label and focus probability from a single ensemble pass"""
+        prob = self.predict_proba(features)
+        return (1 if prob >= 0.5 else 0), prob
+
+    def _compact_inputs(self, X: 'CompactFeatures'):
+        """(column index, value) pairs per row; unseen one-hot entries point at column 0 with value 0"""
+        known = X.active >= 0
+        columns = np.hstack([np.broadcast_to(X.dense_columns, X.dense.shape), np.where(known, X.active, 0)])
+        values = np.hstack([X.dense, known.astype(np.float64)])
+        return (torch.as_tensor(columns, device=self.device),
+                torch.as_tensor(values, dtype=torch.float32, device=self.device))
+
+    @staticmethod
+    def _input_layer_compact(linear, columns, values):
+        """First Linear layer from active indices: gathers only the weight columns that are non-zero"""
+        n, k = columns.shape
+        gathered = linear.weight.index_select(1, columns.reshape(-1)).view(-1, n, k)  # (out, n, k)
+        return (gathered * values).sum(dim=-1).t() + linear.bias
+
+    def _input_layer_sparse(self, linear, X):
+        """First Linear layer for a scipy sparse matrix"""
+        coo = X.tocoo()
+        indices = torch.as_tensor(np.vstack([coo.row, coo.col]), dtype=torch.long)
+        X_sparse = torch.sparse_coo_tensor(indices, torch.as_tensor(coo.data, dtype=torch.float32),
+                                           coo.shape, device=self.device, check_invariants=False)
+        return torch.sparse.mm(X_sparse, linear.weight.t()) + linear.bias
+
+    def batch_predict_proba(self, X: List[List[float]]) -> List[float]:
+        """Ensemble probabilities for many rows in one forward pass per sub-model"""
+        with torch.inference_mode():
+            if isinstance(X, CompactFeatures):
+                columns, values = self._compact_inputs(X)
+                probs_list = []
+                for model in self.models:
+                    h = self._input_layer_compact(model.input_layer(), columns, values)
+                    probs_list.append(model.forward_hidden(h).reshape(-1))
+            elif SCIPY_AVAILABLE and sp.issparse(X):
+                probs_list = []
+                for model in self.models:
+                    h = self._input_layer_sparse(model.input_layer(), X)
+                    probs_list.append(model.forward_hidden(h).reshape(-1))
+            else:
+                X_tensor = torch.as_tensor(np.asarray(X), dtype=torch.float32).to(self.device)
+
+                # Predictions from all 3 models
+                probs_list = [model(X_tensor).reshape(-1) for model in self.models]
+
+            # Ensemble
+            ensemble_probs = sum(p * w for p, w in zip(probs_list, self.ENSEMBLE_WEIGHTS))
+
+            return ensemble_probs.cpu().tolist()
+
+    def batch_predict(self, X: List[List[float]]) -> List[int]:
+        return [1 if p >= 0.5 else 0 for p in self.batch_predict_proba(X)]
+
+    def to_numpy(self) -> NumpyEnsembleModel:
+        """Export for the torch-free runtime: BatchNorm folded into the preceding Linear layer"""
+        sub_models = [fold_layers(model.layers()) for model in self.models]
+        return NumpyEnsembleModel(sub_models, self.ENSEMBLE_WEIGHTS, self.model_names)
+
+
+def _fit_submodel(model, optimizer, criterion, dataloader, device, max_epochs: int, name: str,
+                  progress: bool = True) -> Tuple[float, int]:
+    """Train one sub-model with early stopping on the training loss; returns (accuracy, epochs)"""
+    model.train()
+
+    if TQDM_AVAILABLE and progress:
+        pbar = tqdm(range(max_epochs), desc=f"    {name}", ncols=100)
+    else:
+        pbar = range(max_epochs)
+
+    best_loss = float('inf')
+    patience_counter = 0
+    accuracy = 0.0
+    epochs = 0
+
+    for epoch in pbar:
+        epoch_loss = 0.0
+        correct = 0
+        total = 0
+
+        for batch_X, batch_y in dataloader:
+            batch_X = batch_X.to(device)
+            batch_y = batch_y.to(device)
+
+            outputs = model(batch_X)
+            loss = criterion(outputs, batch_y)
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+            epoch_loss += loss.item()
+            predictions = (outputs >= 0.5).float()
+            correct += (predictions == batch_y).sum().item()
+            total += batch_y.size(0)
+
+        avg_loss = epoch_loss / len(dataloader)
+        accuracy = correct / total
+        epochs = epoch + 1
+
+        if TQDM_AVAILABLE and progress:
+            pbar.set_postfix({'loss': f'{avg_loss:.4f}', 'acc': f'{accuracy:.2%}'})
+
+        # Early stopping
+        if avg_loss < best_loss:
+            best_loss = avg_loss
+            patience_counter = 0
+        else:
+            patience_counter += 1
+            if patience_counter >= 15:
+                if TQDM_AVAILABLE and progress:
+                    pbar.close()
+                break
+
+    return accuracy, epochs
+
+
+def _training_tensors(X, y, device) -> Tuple[torch.Tensor, torch.Tensor]:
+    """The whole training set as two tensors on the training device (copied once)"""
+    X_tensor = torch.as_tensor(np.asarray(X, dtype=np.float32), device=device)
+    y_tensor = torch.as_tensor(np.asarray(y, dtype=np.float32), device=device).reshape(-1, 1)
+    return X_tensor, y_tensor
+
+
+def _fit_submodel_tensors(model, optimizer, criterion, X: torch.Tensor, y: torch.Tensor, max_epochs: int,
+                          batch_size: int, name: str, progress: bool = True) -> Tuple[float, int]:
+    """
+    Same loop as _fit_submodel without the DataLoader: mini-batches are index slices of a
+    per-epoch permutation, and loss / correct counts stay on the device until the epoch ends
+    """
+    model.train()
+
+    if TQDM_AVAILABLE and progress:
+        pbar = tqdm(range(max_epochs), desc=f"    {name}", ncols=100)
+    else:
+        pbar = range(max_epochs)
+
+    n = len(X)
+    # BatchNorm cannot train on a single row, so a trailing batch of one is skipped
+    n_used = n - 1 if n > 1 and n % batch_size == 1 else n
+    n_batches = -(-n_used // batch_size)
+
+    best_loss = float('inf')
+    patience_counter = 0
+    accuracy = 0.0
+    epochs = 0
+
+    for epoch in pbar:
+        permutation = torch.randperm(n, device=X.device)
+        epoch_loss = torch.zeros((), device=X.device)
+        correct = torch.zeros((), device=X.device)
+
+        for start in range(0, n_used, batch_size):
+            idx = permutation[start:start + batch_size]
+            batch_X = X.index_select(0, idx)
+            batch_y = y.index_select(0, idx)
+
+            outputs = model(batch_X)
+            loss = criterion(outputs, batch_y)
+
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            optimizer.step()
+
+            epoch_loss += loss.detach()
+            correct += ((outputs.detach() >= 0.5) == (batch_y >= 0.5)).sum()
+
+        # One device -> host sync per epoch
+        avg_loss, correct = torch.stack([epoch_loss / n_batches, correct]).tolist()
+        accuracy = correct / n_used
+        epochs = epoch + 1
+
+        if TQDM_AVAILABLE and progress:
+            pbar.set_postfix({'loss': f'{avg_loss:.4f}', 'acc': f'{accuracy:.2%}'})
+
+        # Early stopping
+        if avg_loss < best_loss:
+            best_loss = avg_loss
+            patience_counter = 0
+        else:
+            patience_counter += 1
+            if patience_counter >= 15:
+                if TQDM_AVAILABLE and progress:
+                    pbar.close()
+                break
+
+    return accuracy, epochs
+
+
+def _to_bytes(obj) -> bytes:
+    # Plain bytes rather than tensors: multiprocessing would otherwise move the
+    # storages into shared memory and both processes would write the same weights
+    buffer = io.BytesIO()
+    torch.save(obj, buffer)
+    return buffer.getvalue()
+
+
+def _from_bytes(payload: bytes):
+    return torch.load(io.BytesIO(payload), weights_only=False)
+
+
+def _train_submodel(job) -> Tuple[bytes, float, int, float]:
+    """Process pool worker: train one sub-model on CPU, return (state bytes, accuracy, epochs, seconds)"""
+    name, payload, X, y, max_epochs, batch_size, num_threads, seed, fast = job
+    start = time.perf_counter()
+    torch.set_num_threads(num_threads)
+    torch.manual_seed(seed)
+
+    state = _from_bytes(payload)
+    model = state['model']
+    optimizer = state['optimizer_class'](model.parameters())
+    optimizer.load_state_dict(state['optimizer'])
+
+    if fast:
+        accuracy, epochs = _fit_submodel_tensors(model, optimizer, nn.BCELoss(),
+                                                 *_training_tensors(X, y, torch.device('cpu')),
+                                                 max_epochs, batch_size, name, progress=False)
+    else:
+        dataloader = DataLoader(FocusDataset(X, y), batch_size=batch_size, shuffle=True)
+        accuracy, epochs = _fit_submodel(model, optimizer, nn.BCELoss(), dataloader, torch.device('cpu'),
+                                         max_epochs, name, progress=False)
+    payload = _to_bytes({'model': model.state_dict(), 'optimizer': optimizer.state_dict()})
+    return payload, accuracy, epochs, time.perf_counter() - start
+
+
+def fold_layers(layers) -> list:
+    """
+    Convert an inference-mode layer sequence into [(W, b, activation), ...]
+
+    W is stored as (in, out). A BatchNorm1d after a Linear layer is folded into it:
+    W' = W * s, b' = (b - running_mean) * s + beta with s = gamma / sqrt(running_var + eps).
+    Dropout is the identity at inference time and is dropped.
+    """
+    folded = []
+    with torch.no_grad():
+        for layer in layers:
+            if isinstance(layer, nn.Linear):
+                folded.append([layer.weight.detach().cpu().numpy().T.copy(),
+                               layer.bias.detach().cpu().numpy().copy(), None])
+            elif isinstance(layer, nn.BatchNorm1d):
+                W, b, _ = folded[-1]
+                scale = (layer.weight / torch.sqrt(layer.running_var + layer.eps)).cpu().numpy()
+                folded[-1][0] = W * scale
+                folded[-1][1] = (b - layer.running_mean.cpu().numpy()) * scale + layer.bias.cpu().numpy()
+            elif isinstance(layer, nn.ReLU):
+                folded[-1][2] = 'relu'
+            elif isinstance(layer, nn.Sigmoid):
+                folded[-1][2] = 'sigmoid'
+            elif not isinstance(layer, nn.Dropout):
+                raise ValueError(f"Cannot export layer {layer!r}")
+    return [tuple(layer) for layer in folded]
+
+
+# ==================== Fused single-graph export ====================
+class FusedEnsemble(nn.Module):
+    """All sub-models and the ensemble weighting in one graph (exported with TorchScript)"""
+
+    def __init__(self, sub_models: List[nn.Module], ensemble_weights: List[float]):
+        super(FusedEnsemble, self).__init__()
+        self.sub_models = nn.ModuleList(sub_models)
+        self.register_buffer('ensemble_weights', torch.tensor(ensemble_weights, dtype=torch.float32))
+
+    def forward(self, x):
+        out = torch.zeros(x.shape[0], dtype=x.dtype, device=x.device)
+        i = 0
+        for model in self.sub_models:
+            out = out + model(x).reshape(-1) * self.ensemble_weights[i]
+            i += 1
+        return out
+
+    @classmethod
+    def from_numpy(cls, numpy_model: NumpyEnsembleModel) -> 'FusedEnsemble':
+        """Rebuild the (BatchNorm-folded) layers of a NumpyEnsembleModel as torch modules"""
+        sub_models = []
+        for layers in numpy_model.sub_models:
+            modules = []
+            for W, b, activation in layers:
+                linear = nn.Linear(W.shape[0], W.shape[1])
+                with torch.no_grad():
+                    linear.weight.copy_(torch.as_tensor(W.T, dtype=torch.float32))
+                    linear.bias.copy_(torch.as_tensor(b, dtype=torch.float32))
+                modules.append(linear)
+                if activation == 'relu':
+                    modules.append(nn.ReLU())
+                elif activation == 'sigmoid':
+                    modules.append(nn.Sigmoid())
+            sub_models.append(nn.Sequential(*modules))
+        return cls(sub_models, numpy_model.ensemble_weights)
+
+
+def save_torchscript(numpy_model: NumpyEnsembleModel, filename: str, meta: dict):
+    """Script + freeze the fused ensemble; meta (feature space etc.) goes into the archive as meta.json"""
+    scripted = torch.jit.script(FusedEnsemble.from_numpy(numpy_model).eval())
+    frozen = torch.jit.freeze(scripted)
+    torch.jit.save(frozen, filename, _extra_files={'meta.json': json.dumps(meta)})
+
+
+class TorchScriptEnsembleModel:
+    """Runs a fused ensemble saved by save_torchscript (no pickled AI classes involved)"""
+
+    def __init__(self, module, input_dim: int):
+        self.module = module
+        self.input_dim = input_dim
+        self.is_trained = True
+
+    @classmethod
+    def load(cls, filename: str) -> Tuple['TorchScriptEnsembleModel', dict]:
+        extra_files = {'meta.json': ''}
+        module = torch.jit.load(filename, map_location='cpu', _extra_files=extra_files)
+        meta = json.loads(extra_files['meta.json'])
+        return cls(module.eval(), meta['input_dim']), meta
+
+    def batch_predict_proba(self, X: List[List[float]]) -> List[float]:
+        if isinstance(X, CompactFeatures):
+            X = X.to_dense()
+        elif SCIPY_AVAILABLE and sp.issparse(X):
+            X = X.toarray()
+        with torch.inference_mode():
+            X_tensor = torch.as_tensor(np.asarray(X), dtype=torch.float32).reshape(-1, self.input_dim)
+            return self.module(X_tensor).tolist()
+
+    def batch_predict(self, X: List[List[float]]) -> List[int]:
+        return [1 if p >= 0.5 else 0 for p in self.batch_predict_proba(X)]
+
+    def predict_proba(self, features: List[float]) -> float:
+        return self.batch_predict_proba(features)[0]
+
+    def predict(self, features: List[float]) -> int:
+        return 1 if self.predict_proba(features) >= 0.5 else 0
+
+    def predict_with_proba(self, features: List[float]) -> Tuple[int, float]:
+        prob = self.predict_proba(features)
+        return (1 if prob >= 0.5 else 0), prob
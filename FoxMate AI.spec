@@ -10,6 +10,7 @@ a = Analysis(
         # --- Frontend Files ---
         ('frontend/app.py', 'frontend'),  # 主前端文件
         ('frontend/routes.py', 'frontend'),
+        ('frontend/backend_link.py', 'frontend'),
         ('frontend/pages', 'frontend/pages'),
         ('frontend/__init__.py', 'frontend'),  # 确保frontend是一个包
         
@@ -19,26 +20,52 @@ a = Analysis(
         # --- Backend Files & Models ---
         ('backend/run.py', 'backend'),
         ('backend/pet_ui.py', 'backend'),
+        ('backend/embedding_cache.py', 'backend'),
+        ('backend/inference_worker.py', 'backend'),
+        ('backend/lean_regressor.py', 'backend'),
+        ('backend/log_writer.py', 'backend'),
+        ('backend/activity_log.py', 'backend'),
+        ('backend/columnar_store.py', 'backend'),
+        ('backend/rollups.py', 'backend'),
+        ('backend/tick_timing.py', 'backend'),
+        ('backend/ready_reporter.py', 'backend'),
+        ('backend/focus_engine.py', 'backend'),
+        ('backend/inference_client.py', 'backend'),
+        ('backend/inference_service.py', 'backend'),
         ('backend/__init__.py', 'backend'),  # 确保backend是一个包
         ('backend/focus_regressor_sbert.pkl', 'backend'), # Model bundle
         ('backend/result.txt', 'backend'),
         
         # --- AI Part Files ---
         ('AI Part/AI.py', 'AI Part'),
+        ('AI Part/torch_models.py', 'AI Part'),
         ('AI Part/focus_model.pkl', 'AI Part'), # Classifier model
+        ('AI Part/focus_model.npz', 'AI Part'), # Classifier model (NumPy runtime, preferred)
         
         # --- Sound File ---
         ('notification-alert-269289.mp3', '.'),
         
-        # --- Data Files (Needed for logging, though content is skipped) ---
-        ('backend/activity_log_focus.jsonl', 'backend'),
+        # 活动日志不再打包：运行时由 BufferedLogWriter 创建并按段轮转归档
     ],
     hiddenimports=[
         # Frontend and Backend modules (explicitly include)
         'app',  # frontend/app.py
         'run',  # backend/run.py
         'routes',  # frontend/routes.py
+        'backend_link',  # frontend/backend_link.py
         'pet_ui',  # backend/pet_ui.py
+        'embedding_cache',  # backend/embedding_cache.py
+        'inference_worker',  # backend/inference_worker.py
+        'lean_regressor',  # backend/lean_regressor.py
+        'log_writer',  # backend/log_writer.py
+        'activity_log',  # backend/activity_log.py
+        'columnar_store',  # backend/columnar_store.py
+        'rollups',  # backend/rollups.py
+        'tick_timing',  # backend/tick_timing.py
+        'ready_reporter',  # backend/ready_reporter.py
+        'focus_engine',  # backend/focus_engine.py
+        'inference_client',  # backend/inference_client.py
+        'inference_service',  # backend/inference_service.py
         
         # System monitoring
         'psutil', 'pynput', 'win32gui', 'win32process',
@@ -66,12 +93,13 @@ a = Analysis(
         'tkinter', 'tkinter.ttk', 'tkinter.filedialog', 'tkinter.messagebox',
         
         # PySide6 GUI
-        'PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets',
+        'PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets', 'PySide6.QtNetwork',
         
         # Windows COM for sound playback
         'win32com.client',
         
-        # PyTorch and transformers (if used by models)
+        # PyTorch and transformers (sentence-transformers needs them; the classifier
+        # itself runs on NumPy via focus_model.npz)
         'torch', 'torch.nn', 'torch.optim', 'torch.utils.data',
         'transformers',
         
@@ -0,0 +1,337 @@
+# backend/activity_log.py
+"""
+活动日志的分段存储：
+- 当前段：activity_log_focus.jsonl（由 BufferedLogWriter 追加）
+- 历史段：activity_archive/<stem>.<YYYYmmdd-HHMMSS>.jsonl.gz
+- manifest：activity_archive/manifest.json，记录每段的时间范围
+- 小时索引：每段记录 {"YYYY-MM-DDTHH": 该小时第一条记录的字节偏移}，
+  当前段存放在 activity_log_focus.jsonl.idx.json，归档段写在 manifest 里
+
+读取方只打开与查询时间范围有交集的段，并直接 seek 到起始小时，不再扫描整份日志。
+"""
+import os, io, gzip, json, threading
+from datetime import datetime
+from pathlib import Path
+
+ARCHIVE_DIR_NAME = "activity_archive"
+MANIFEST_NAME = "manifest.json"
+INDEX_SUFFIX = ".idx.json"
+
+_TAIL_BYTES = 64 * 1024
+
+
+def archive_dir_for(log_path) -> Path:
+    return Path(log_path).parent / ARCHIVE_DIR_NAME
+
+
+def _ts_str(value):
+    """datetime / ISO 字符串 / None -> 可直接做字符串比较的 ISO 字符串。"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def index_path_for(log_path) -> Path:
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def hour_key(ts: str) -> str:
+    return ts[:13]  # "2025-10-21T09"
+
+
+def _first_ts(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            ts = json.loads(line).get("ts")
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        if ts:
+            return ts
+    return None
+
+
+def scan_range(path):
+    """
+    只读文件开头和结尾各一小块，返回 (first_ts, last_ts)。
+    日志是按时间顺序追加的，不需要整份扫描。
+    """
+    path = Path(path)
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return None, None
+    if size == 0:
+        return None, None
+    with open(path, "rb") as f:
+        head = f.read(_TAIL_BYTES).decode("utf-8", errors="ignore").splitlines()
+        f.seek(max(0, size - _TAIL_BYTES))
+        tail = f.read().decode("utf-8", errors="ignore").splitlines()
+    if size > _TAIL_BYTES:
+        head, tail = head[:-1], tail[1:]  # 去掉被截断的半行
+    return _first_ts(head), _first_ts(reversed(tail))
+
+
+# === 小时索引 ===
+def load_hour_index(log_path):
+    """返回 (已索引到的字节数, {hour: offset})；没有索引时返回 (0, {})。"""
+    try:
+        with open(index_path_for(log_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return int(data.get("size", 0)), dict(data.get("hours", {}))
+    except FileNotFoundError:
+        return 0, {}
+    except Exception as e:
+        print("Hour index load failed:", e)
+        return 0, {}
+
+
+def save_hour_index(log_path, size: int, hours: dict):
+    path = index_path_for(log_path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"size": size, "hours": hours}, f)
+    os.replace(tmp, path)
+
+
+def build_hour_index(log_path, start_offset: int = 0, hours=None):
+    """
+    从 start_offset 开始扫描日志，补全小时索引。返回 (扫描到的字节数, hours)。
+    只在启动时对当前段（最多一天 / 几 MB）做一次。
+    """
+    hours = dict(hours or {})
+    offset = start_offset
+    try:
+        f = open(log_path, "rb")
+    except FileNotFoundError:
+        return 0, {}
+    with f:
+        f.seek(start_offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # 最后半行留给下次
+            try:
+                ts = json.loads(raw).get("ts")
+            except (json.JSONDecodeError, AttributeError):
+                ts = None
+            if ts:
+                hours.setdefault(hour_key(ts), offset)
+            offset += len(raw)
+    return offset, hours
+
+
+def seek_offset(hours: dict, start) -> int:
+    """
+    根据小时索引找到 start 之后第一条记录所在的偏移；
+    索引为空或 start 为空时返回 0，所有记录都早于 start 时返回 None。
+    """
+    if start is None or not hours:
+        return 0
+    key = hour_key(_ts_str(start))
+    later = [h for h in hours if h >= key]
+    if not later:
+        return None
+    return hours[min(later)]
+
+
+class SegmentManifest:
+    """activity_archive/manifest.json 的读写（线程安全，原子替换）。"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.path = self.archive_dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.segments = []
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.segments = json.load(f).get("segments", [])
+        except FileNotFoundError:
+            self.segments = []
+        except Exception as e:
+            print("Manifest load failed:", e)
+            self.segments = []
+
+    def save(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self.segments}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def add(self, segment: dict):
+        with self._lock:
+            self.segments.append(segment)
+            self.segments.sort(key=lambda s: s.get("start") or "")
+            self.save()
+
+    def overlapping(self, start=None, end=None):
+        """返回与 [start, end] 有交集的段（按时间排序）。"""
+        start, end = _ts_str(start), _ts_str(end)
+        out = []
+        for seg in self.segments:
+            if start is not None and seg.get("end") and seg["end"] < start:
+                continue
+            if end is not None and seg.get("start") and seg["start"] > end:
+                continue
+            out.append(seg)
+        return out
+
+
+def live_hour_index(log_path):
+    """
+    当前段的 (已索引字节数, hours)。索引文件落后于日志（写入器还没保存、
+    或上次没正常退出）时，现场补扫没覆盖到的尾部（不写回索引文件）。
+    """
+    size, hours = load_hour_index(log_path)
+    try:
+        if Path(log_path).stat().st_size > size:
+            size, hours = build_hour_index(log_path, size, hours)
+    except OSError:
+        pass
+    return size, hours
+
+
+def logged_days(log_path) -> set:
+    """日志里有记录的天（"YYYY-MM-DD"），只看 manifest 和小时索引，不读记录本身。"""
+    log_path = Path(log_path)
+    days = set()
+    for seg in SegmentManifest(archive_dir_for(log_path)).segments:
+        days.update(h[:10] for h in (seg.get("hours") or {}))
+    days.update(h[:10] for h in live_hour_index(log_path)[1])
+    return days
+
+
+def archive_segment(log_path, manifest: SegmentManifest, start, end, hours=None) -> dict:
+    """
+    把当前段 gzip 压缩进归档目录并登记到 manifest（连同小时索引，偏移为解压后的字节偏移）。
+    调用方负责之后截断当前段和它的索引。
+    """
+    log_path = Path(log_path)
+    manifest.archive_dir.mkdir(parents=True, exist_ok=True)
+    stamp = (start or datetime.now().isoformat())[:19].replace("-", "").replace(":", "").replace("T", "-")
+    name = f"{log_path.stem}.{stamp}.jsonl.gz"
+    dst = manifest.archive_dir / name
+    n = 1
+    while dst.exists():  # 同一秒内多次轮转（很少见）
+        name = f"{log_path.stem}.{stamp}-{n}.jsonl.gz"
+        dst = manifest.archive_dir / name
+        n += 1
+
+    tmp = dst.with_name(dst.name + ".tmp")
+    lines = 0
+    raw_bytes = 0
+    with open(log_path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as gz:
+        while True:
+            chunk = src.read(1 << 20)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+            raw_bytes += len(chunk)
+            gz.write(chunk)
+    os.replace(tmp, dst)
+
+    segment = {"file": name, "start": start, "end": end, "lines": lines, "bytes": raw_bytes,
+               "hours": dict(hours or {})}
+    manifest.add(segment)
+    return segment
+
+
+def _iter_lines(fileobj):
+    for line in fileobj:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _open_at(path, offset):
+    """打开一段日志（.gz 或明文）并定位到 offset（gzip 为解压后的偏移）。"""
+    raw = gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+    if offset:
+        raw.seek(offset)
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def iter_records(log_path, start=None, end=None, include_markers=False):
+    """
+    按时间顺序产出 [start, end] 内的 tick 记录：先归档段（只打开有交集的），再当前段。
+    每段用小时索引直接 seek 到 start 所在的小时。
+    include_markers=True 时也产出 {"session_start": ...} 之类没有 ts 的标记行
+    （有 start 时，被 seek 跳过的标记行不会出现）。
+    """
+    log_path = Path(log_path)
+    start, end = _ts_str(start), _ts_str(end)
+    manifest = SegmentManifest(archive_dir_for(log_path))
+
+    # (文件, 小时索引, 索引覆盖到的字节数)；归档段的索引是完整的，不需要第三项
+    sources = [(manifest.archive_dir / seg["file"], seg.get("hours") or {}, None)
+               for seg in manifest.overlapping(start, end)]
+    live_start, live_end = scan_range(log_path)
+    if not ((start is not None and live_end and live_end < start) or
+            (end is not None and live_start and live_start > end)):
+        size, hours = live_hour_index(log_path)
+        sources.append((log_path, hours, size))
+
+    for src, hours, indexed in sources:
+        offset = seek_offset(hours, start)
+        if offset is None:
+            if indexed is None:
+                continue
+            offset = indexed  # 当前段：索引之后才写入的行仍然要读
+        try:
+            f = _open_at(src, offset)
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in _iter_lines(f):
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                ts = rec.get("ts")
+                if ts is None:
+                    if include_markers:
+                        yield rec
+                    continue
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    # 段内按时间有序，后面不会再有范围内的记录
+                    break
+                yield rec
+
+
+def read_records(log_path, start=None, end=None):
+    return list(iter_records(log_path, start, end))
+
+
+def query(log_path, start=None, end=None, as_arrays: bool = False, store=None):
+    """
+    时间范围查询：
+    - as_arrays=False：返回记录 dict 列表（走分段 + 小时索引）
+    - as_arrays=True：返回 {列名: ndarray}。给了列式存储（ColumnarActivityStore）
+      就直接在 mmap 的 ts 列上二分，否则由记录现场转换。
+      存储只覆盖它第一行之后的时间；更早的部分（导入之前的历史）仍从日志读出再拼在前面。
+    """
+    if not as_arrays:
+        return read_records(log_path, start, end)
+    import numpy as np
+    from columnar_store import records_to_arrays, ts_to_epoch, epoch_to_ts
+    if store is None or not len(store):
+        return records_to_arrays(iter_records(log_path, start, end))
+    start, end = _ts_str(start), _ts_str(end)
+    first = store.first_epoch()
+    recent = store.time_range(start, end)
+    if start is not None and ts_to_epoch(start) >= first:
+        return recent
+    older_end = end if end is not None and ts_to_epoch(end) < first else epoch_to_ts(first)
+    older = records_to_arrays(iter_records(log_path, start, older_end))
+    keep = older["ts"] < first
+    return {c: np.concatenate([older[c][keep], recent[c]]) for c in recent}
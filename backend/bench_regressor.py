@@ -0,0 +1,97 @@
+# backend/bench_regressor.py
+# 单行回归推理的微基准：原 predict_focus 路径（scaler.transform + pd.DataFrame + reg.predict）
+# 对比 LeanRegressor（预分配 NumPy 行 + Booster.predict）。
+#
+#   python bench_regressor.py [--rows 2000] [--repeat 3] [--random-emb] [--bundle PATH] [--log PATH]
+import os, sys, json, time, argparse
+import joblib, numpy as np, pandas as pd
+
+from lean_regressor import LeanRegressor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_PATH = os.path.join(BASE_DIR, "focus_regressor_sbert.pkl")
+LOG_PATH = os.path.join(BASE_DIR, "activity_log_focus.jsonl")
+
+
+def load_rows(path, limit):
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                d = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "ts" not in d:  # 跳过 session_start 之类的标记行
+                continue
+            rows.append(d)
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+def old_path(reg, scaler, emb, ks, mp):
+    num = scaler.transform([[ks, mp]])
+    X = np.hstack([emb[None, :], num])
+    X_df = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    return float(reg.predict(X_df)[0])
+
+
+def lean_path(lean, emb, ks, mp):
+    return lean.predict(emb, (ks, mp))
+
+
+def bench(fn, args_list, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(args_list) * 1e6  # µs / row
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--bundle", default=BUNDLE_PATH)
+    ap.add_argument("--log", default=LOG_PATH)
+    ap.add_argument("--random-emb", action="store_true",
+                    help="用随机向量代替 SBERT 编码（离线时用，不影响计时）")
+    args = ap.parse_args()
+
+    bundle = joblib.load(args.bundle)
+    reg, scaler = bundle["regressor"], bundle["numeric_scaler"]
+    lean = LeanRegressor(reg, scaler)
+
+    rows = load_rows(args.log, args.rows)
+    print(f"Loaded {len(rows)} rows from {os.path.basename(args.log)}")
+    texts = [f"{r['app']} | {r['title']} | {r['tags']}" for r in rows]
+    uniq = sorted(set(texts))
+    if args.random_emb:
+        rng = np.random.default_rng(0)
+        uniq_emb = rng.normal(size=(len(uniq), lean.emb_dim)).astype(np.float32)
+    else:
+        from sentence_transformers import SentenceTransformer
+        sbert = SentenceTransformer(bundle["sbert_model_name"])
+        uniq_emb = sbert.encode(uniq, convert_to_numpy=True, show_progress_bar=False)
+    emb_of = dict(zip(uniq, uniq_emb))
+    embs = [emb_of[t] for t in texts]
+
+    old_args = [(reg, scaler, e, r["keystrokes_per_min"], r["mouse_px_per_min"]) for e, r in zip(embs, rows)]
+    lean_args = [(lean, e, r["keystrokes_per_min"], r["mouse_px_per_min"]) for e, r in zip(embs, rows)]
+
+    max_diff = max(abs(old_path(*a) - lean_path(*b)) for a, b in zip(old_args, lean_args))
+    t_old = bench(old_path, old_args, args.repeat)
+    t_lean = bench(lean_path, lean_args, args.repeat)
+
+    print(f"DataFrame path : {t_old:8.1f} µs/row")
+    print(f"Lean path      : {t_lean:8.1f} µs/row  ({t_old / t_lean:.1f}x faster)")
+    print(f"Max |diff|     : {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
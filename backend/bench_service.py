@@ -0,0 +1,197 @@
+# backend/bench_service.py
+# 推理服务压测：N 个客户端线程各自建立连接，按给定批大小连续发送 predict 请求，
+# 统计吞吐（records/s）和请求延迟分位数。
+#
+#   python bench_service.py [--address 127.0.0.1:8765] [--clients 8] [--requests 200] [--batch 1]
+#                           [--spawn [--no-regressor] [--max-batch 256] [--max-wait-ms 0] [--no-batching]]
+#                           [--keep-pred] [--log PATH]
+#
+# --sweep off,0,2,5 会依次以不同的 --max-wait-ms（off = --no-batching）启动服务并各跑一轮，
+# 输出吞吐 / 延迟对照表。
+import os, sys, json, time, random, argparse, threading, subprocess
+from pathlib import Path
+
+import numpy as np
+
+from inference_client import InferenceClient
+
+BASE_DIR = Path(__file__).resolve().parent
+LOG_PATH = BASE_DIR / "activity_log_focus.jsonl"
+
+
+def load_records(path, limit=5000):
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                d = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "ts" in d:
+                rows.append(d)
+                if len(rows) >= limit:
+                    break
+    return rows
+
+
+def spawn_service(address, no_regressor, extra_args=(), timeout=300.0):
+    host, _, port = address.rpartition(":")
+    cmd = [sys.executable, str(BASE_DIR / "inference_service.py"), "--host", host or "127.0.0.1", "--port", port]
+    if no_regressor:
+        cmd.append("--no-regressor")
+    cmd.extend(extra_args)
+    proc = subprocess.Popen(cmd, cwd=str(BASE_DIR))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"inference service exited with code {proc.returncode}")
+        try:
+            with InferenceClient.from_address(address, timeout=2.0) as c:
+                c.ping()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise TimeoutError("inference service did not start")
+
+
+def run_client(address, records, n_requests, batch, keep_pred, latencies, errors, seed):
+    rng = random.Random(seed)
+    try:
+        client = InferenceClient.from_address(address)
+    except OSError as e:
+        errors.append(str(e))
+        return
+    with client:
+        for _ in range(n_requests):
+            batch_recs = rng.sample(records, batch)
+            if not keep_pred:
+                batch_recs = [{k: v for k, v in r.items() if k not in ("pred_focus", "tags")} for r in batch_recs]
+            t0 = time.perf_counter()
+            try:
+                client.predict(batch_recs)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            latencies.append(time.perf_counter() - t0)
+
+
+def strip_pred(records):
+    return [{k: v for k, v in r.items() if k not in ("pred_focus", "tags")} for r in records]
+
+
+def run_load(args, records):
+    """预热后跑一轮并发压测，返回统计结果（失败时返回 None）。"""
+    # 预热：第一次请求会触发懒加载 / JIT 等一次性开销
+    with InferenceClient.from_address(args.address) as c:
+        print("Service:", c.ping().get("models"))
+        c.predict(records[:8] if args.keep_pred else strip_pred(records[:8]))
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=run_client,
+                                args=(args.address, records, args.requests, args.batch,
+                                      args.keep_pred, latencies, errors, i))
+               for i in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    with InferenceClient.from_address(args.address) as c:
+        batching = c.ping().get("batching")
+
+    n = len(latencies)
+    if errors:
+        print(f"{len(errors)} errors, e.g. {errors[0]}")
+    if not n:
+        return None
+    lat = np.array(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(lat, (50, 95, 99))
+    return {"requests": n, "wall": wall, "req_s": n / wall, "rec_s": n * args.batch / wall,
+            "p50": p50, "p95": p95, "p99": p99, "max": lat.max(), "batching": batching}
+
+
+def print_result(args, r):
+    print(f"clients={args.clients} batch={args.batch}: {r['requests']} requests in {r['wall']:.2f}s "
+          f"-> {r['req_s']:,.0f} req/s, {r['rec_s']:,.0f} records/s")
+    print(f"latency ms: p50={r['p50']:.2f} p95={r['p95']:.2f} p99={r['p99']:.2f} max={r['max']:.2f}")
+    if r["batching"]:
+        b = r["batching"]
+        print(f"batching: {b['batches']} batches, {b['mean_requests_per_batch']} requests / "
+              f"{b['mean_records_per_batch']} records per batch")
+
+
+def service_args(args, wait=None):
+    """--spawn 时传给 inference_service.py 的合并参数；wait="off" 表示关闭合并。"""
+    if wait == "off" or (wait is None and args.no_batching):
+        return ["--no-batching"]
+    out = ["--max-batch", str(args.max_batch)]
+    if wait is not None or args.max_wait_ms is not None:
+        out += ["--max-wait-ms", str(wait if wait is not None else args.max_wait_ms)]
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--address", default="127.0.0.1:8765")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=200, help="每个客户端的请求数")
+    ap.add_argument("--batch", type=int, default=1, help="每个请求包含的记录数")
+    ap.add_argument("--keep-pred", action="store_true",
+                    help="保留记录里的 pred_focus / tags（只测分类器，配合 --no-regressor）")
+    ap.add_argument("--spawn", action="store_true", help="先启动一个服务子进程，测完关闭")
+    ap.add_argument("--no-regressor", action="store_true")
+    ap.add_argument("--max-batch", type=int, default=256, help="--spawn 时服务端合并批的记录数上限")
+    ap.add_argument("--max-wait-ms", type=float, default=None, help="--spawn 时服务端凑批的最长等待")
+    ap.add_argument("--no-batching", action="store_true", help="--spawn 时关闭服务端合并")
+    ap.add_argument("--sweep", default=None,
+                    help="逗号分隔的 --max-wait-ms 取值（off = 不合并），每个取值启动一次服务")
+    ap.add_argument("--log", default=str(LOG_PATH))
+    args = ap.parse_args()
+
+    records = load_records(args.log)
+    print(f"Loaded {len(records)} records from {os.path.basename(args.log)}")
+
+    if args.sweep:
+        rows = []
+        for wait in [w.strip() for w in args.sweep.split(",") if w.strip()]:
+            print(f"\n--- max-wait-ms={wait} ---")
+            proc = spawn_service(args.address, args.no_regressor, service_args(args, wait))
+            try:
+                r = run_load(args, records)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+            if r is not None:
+                print_result(args, r)
+                rows.append((wait, r))
+        print(f"\nclients={args.clients} batch={args.batch} requests/client={args.requests}")
+        print(f"{'wait_ms':>8} {'req/s':>9} {'rec/s':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'recs/batch':>10}")
+        for wait, r in rows:
+            per_batch = r["batching"]["mean_records_per_batch"] if r["batching"] else args.batch
+            print(f"{wait:>8} {r['req_s']:>9,.0f} {r['rec_s']:>9,.0f} {r['p50']:>7.2f} "
+                  f"{r['p95']:>7.2f} {r['p99']:>7.2f} {per_batch:>10}")
+        return 0 if rows else 1
+
+    proc = spawn_service(args.address, args.no_regressor, service_args(args)) if args.spawn else None
+    try:
+        r = run_load(args, records)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if r is None:
+        print("No successful requests")
+        return 1
+    print_result(args, r)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
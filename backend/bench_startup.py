@@ -0,0 +1,65 @@
+# backend/bench_startup.py
+# 启动耗时基准：每次在全新的 Python 进程里测量
+#   frontend : import launcher（前端进程实际付出的导入成本，包含 import run）
+#   backend  : import launcher + run.init_models()（--backend 进程加载模型）
+# 同时列出各模式下是否已经加载了 torch / sentence_transformers / lightgbm。
+#
+#   python bench_startup.py [--repeat 3] [--mode frontend backend]
+import os, sys, json, time, argparse, statistics, subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BASE_DIR.parent
+HEAVY_MODULES = ("torch", "sentence_transformers", "lightgbm", "joblib", "matplotlib", "pynput")
+
+_PROBE = r"""
+import sys, time, json
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import launcher
+t_import = time.perf_counter() - t0
+t_init = 0.0
+if {mode!r} == "backend":
+    run = launcher._backend_run_module
+    if run is None:
+        raise SystemExit("import run failed (see launcher.py)")
+    t1 = time.perf_counter()
+    run.init_models()
+    t_init = time.perf_counter() - t1
+print(json.dumps({{
+    "import": t_import,
+    "init": t_init,
+    "run_imported": launcher._backend_run_module is not None,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(mode: str) -> dict:
+    code = _PROBE.format(root=str(ROOT_DIR), mode=mode, heavy=HEAVY_MODULES)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=str(ROOT_DIR))
+    wall = time.perf_counter() - t0
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip() or out.stdout.strip())
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["wall"] = wall
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--mode", nargs="+", default=["frontend", "backend"], choices=["frontend", "backend"])
+    args = ap.parse_args()
+
+    for mode in args.mode:
+        runs = [probe(mode) for _ in range(args.repeat)]
+        med = lambda k: statistics.median(r[k] for r in runs) * 1000
+        print(f"{mode:<9} import {med('import'):8.0f} ms   init_models {med('init'):8.0f} ms   "
+              f"process {med('wall'):8.0f} ms")
+        print(f"{'':<9} run imported: {runs[-1]['run_imported']}   heavy modules: {runs[-1]['heavy'] or '-'}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
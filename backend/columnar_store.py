@@ -0,0 +1,412 @@
+# backend/columnar_store.py
+"""
+tick 记录的列式二进制存储（与 JSONL 日志并存，只追加）：
+
+    activity_columns/
+        meta.json            版本和各列 dtype
+        writer.lock          写入进程持有的文件锁（同一时间只允许一个写入者）
+        ts.bin               float64  本地时间的 epoch 秒
+        keystrokes_per_min.bin float32
+        mouse_px_per_min.bin float32
+        pred_focus.bin       float32
+        app.bin / title.bin / tags.bin   int32 字典编码
+        app.dict / title.dict / tags.dict 每行一个 JSON 字符串，行号即编码
+
+每列都是定长小端数组，可以直接 np.memmap；读一周的数据只是几次 mmap，
+不需要逐行 json.loads。
+
+导入已有日志（含归档段）：
+    python columnar_store.py --rebuild
+不加 --rebuild 时只导入比存储里最后一条更新的记录（可以反复运行，不会重复）。
+后端运行时它持有写锁，命令行导入会直接退出（后端启动时会自己补导入）。
+
+只读打开（read_only=True）不拿锁、不截断任何文件，只映射各列都写完整的行。
+"""
+import os, sys, json, threading, argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+STORE_VERSION = 1
+
+NUMERIC_COLUMNS = {
+    "ts": "<f8",
+    "keystrokes_per_min": "<f4",
+    "mouse_px_per_min": "<f4",
+    "pred_focus": "<f4",
+}
+DICT_COLUMNS = ("app", "title", "tags")
+CODE_DTYPE = "<i4"
+
+
+def ts_to_epoch(ts: str) -> float:
+    return datetime.fromisoformat(ts).timestamp()
+
+
+def epoch_to_ts(value: float) -> str:
+    return datetime.fromtimestamp(float(value)).isoformat()
+
+
+def _to_epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return ts_to_epoch(value)
+    return float(value)
+
+
+def records_to_arrays(records) -> dict:
+    """没有列式存储时的兜底：把记录转成和 columns() 同名的数组（字符串列为 object 数组）。"""
+    rows = [r for r in records if r.get("ts")]
+    out = {
+        "ts": np.array([ts_to_epoch(r["ts"]) for r in rows], dtype=np.float64),
+    }
+    for c in ("keystrokes_per_min", "mouse_px_per_min", "pred_focus"):
+        out[c] = np.array([float(r.get(c) or 0.0) for r in rows], dtype=np.float32)
+    for c in DICT_COLUMNS:
+        out[c] = np.array([r.get(c, "") for r in rows], dtype=object)
+    return out
+
+
+class StoreLockedError(RuntimeError):
+    """另一个进程已经以写入模式打开了同一个存储。"""
+
+
+def _lock_file(path):
+    """对 path 加非阻塞的排他锁，返回需要一直持有的文件对象；进程退出时系统自动释放。"""
+    f = open(path, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise StoreLockedError(f"Activity store is already open for writing: {path.parent}")
+    return f
+
+
+class ColumnarActivityStore:
+    def __init__(self, root, read_only: bool = False):
+        self.root = Path(root)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._vocab = {c: [] for c in DICT_COLUMNS}   # code -> string
+        self._index = {c: {} for c in DICT_COLUMNS}   # string -> code
+        if read_only:
+            if (self.root / "meta.json").exists():
+                self._write_meta()  # 已存在时只检查版本
+            # 先数行再读字典：写入者总是先写字典再写列，数到的行里的编码一定能解码
+            self._rows = self._count_rows()
+            for c in DICT_COLUMNS:
+                self._load_dict(c)
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock_file = _lock_file(self.root / "writer.lock")
+        try:
+            self._write_meta()
+            for c in DICT_COLUMNS:
+                self._load_dict(c)
+            self._rows = self._repair()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """释放写锁（只读模式下什么也不做）。"""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- 文件布局 ----------
+    def _col_path(self, name) -> Path:
+        return self.root / f"{name}.bin"
+
+    def _dict_path(self, name) -> Path:
+        return self.root / f"{name}.dict"
+
+    @staticmethod
+    def _dtype(name):
+        return np.dtype(NUMERIC_COLUMNS.get(name, CODE_DTYPE))
+
+    @property
+    def column_names(self):
+        return list(NUMERIC_COLUMNS) + list(DICT_COLUMNS)
+
+    def _write_meta(self):
+        meta_path = self.root / "meta.json"
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported activity store version: {meta.get('version')}")
+            return
+        meta = {
+            "version": STORE_VERSION,
+            "columns": {c: self._dtype(c).str for c in self.column_names},
+            "dict_columns": list(DICT_COLUMNS),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=1)
+
+    def _load_dict(self, name):
+        path = self._dict_path(name)
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        good = data.rfind(b"\n") + 1
+        if good != len(data) and not self.read_only:  # 写到一半的行（进程被杀）：截掉
+            with open(path, "r+b") as f:
+                f.truncate(good)
+        for line in data[:good].decode("utf-8").splitlines():
+            s = json.loads(line)
+            self._index[name][s] = len(self._vocab[name])
+            self._vocab[name].append(s)
+
+    def _count_rows(self) -> int:
+        """各列都写完整的行数（最短的那一列）。"""
+        counts = []
+        for c in self.column_names:
+            path = self._col_path(c)
+            size = path.stat().st_size if path.exists() else 0
+            counts.append(size // self._dtype(c).itemsize)
+        return min(counts) if counts else 0
+
+    def _repair(self) -> int:
+        """进程中途退出时各列长度可能不一致：截断到最短的那一列（只在持有写锁时调用）。"""
+        rows = self._count_rows()
+        for c in self.column_names:
+            path = self._col_path(c)
+            want = rows * self._dtype(c).itemsize
+            if path.exists() and path.stat().st_size != want:
+                with open(path, "r+b") as f:
+                    f.truncate(want)
+        return rows
+
+    def __len__(self):
+        return self._rows
+
+    def _ts_at(self, row):
+        dt = self._dtype("ts")
+        with open(self._col_path("ts"), "rb") as f:
+            f.seek(row * dt.itemsize)
+            return float(np.frombuffer(f.read(dt.itemsize), dtype=dt)[0])
+
+    def first_epoch(self):
+        """第一行的 ts（epoch 秒）；空存储返回 None。"""
+        return self._ts_at(0) if self._rows else None
+
+    def last_epoch(self):
+        """最后一行的 ts（epoch 秒）；空存储返回 None。"""
+        return self._ts_at(self._rows - 1) if self._rows else None
+
+    # ---------- 写入 ----------
+    def _check_writable(self):
+        if self.read_only:
+            raise StoreLockedError("Activity store was opened read-only")
+
+    def _encode(self, name, value, new_strings):
+        """new_strings[name]：本批新出现的 {字符串: 编码}，字典文件写成功后才并入 _vocab / _index。"""
+        value = "" if value is None else str(value)
+        code = self._index[name].get(value)
+        if code is None:
+            pending = new_strings[name]
+            code = pending.get(value)
+            if code is None:
+                code = pending[value] = len(self._vocab[name]) + len(pending)
+        return code
+
+    def _write_dicts(self, new_strings):
+        """追加新字符串到 .dict；任何一个写失败时把已写的字典截回原长度再抛出。"""
+        written = []  # [(path, 写之前的大小)]
+        try:
+            for c in DICT_COLUMNS:
+                if new_strings[c]:
+                    path = self._dict_path(c)
+                    written.append((path, path.stat().st_size if path.exists() else 0))
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in new_strings[c]))
+        except Exception:
+            for path, size in written:
+                try:
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+                except OSError:
+                    pass
+            raise
+        for c in DICT_COLUMNS:
+            for value, code in new_strings[c].items():  # 按编码顺序插入
+                self._index[c][value] = code
+                self._vocab[c].append(value)
+
+    def append(self, entries) -> int:
+        """追加一批 tick 记录（没有 ts 的标记行会被跳过），返回写入行数。"""
+        self._check_writable()
+        rows = [e for e in entries if e.get("ts")]
+        if not rows:
+            return 0
+        with self._lock:
+            new_strings = {c: {} for c in DICT_COLUMNS}
+            cols = {
+                "ts": np.fromiter((ts_to_epoch(e["ts"]) for e in rows), dtype=np.float64, count=len(rows)),
+            }
+            for c in ("keystrokes_per_min", "mouse_px_per_min", "pred_focus"):
+                cols[c] = np.fromiter((float(e.get(c) or 0.0) for e in rows), dtype=np.float64, count=len(rows))
+            for c in DICT_COLUMNS:
+                cols[c] = np.fromiter((self._encode(c, e.get(c), new_strings) for e in rows),
+                                      dtype=np.int64, count=len(rows))
+
+            # 先写字典再写列：列里出现的编码一定能在字典里找到
+            self._write_dicts(new_strings)
+            for c in self.column_names:
+                with open(self._col_path(c), "ab") as f:
+                    f.write(cols[c].astype(self._dtype(c)).tobytes())
+            self._rows += len(rows)
+        return len(rows)
+
+    def clear(self):
+        self._check_writable()
+        with self._lock:
+            for c in self.column_names:
+                self._col_path(c).unlink(missing_ok=True)
+            for c in DICT_COLUMNS:
+                self._dict_path(c).unlink(missing_ok=True)
+                self._vocab[c] = []
+                self._index[c] = {}
+            self._rows = 0
+
+    # ---------- 读取 ----------
+    def columns(self, mmap: bool = True) -> dict:
+        """返回 {列名: ndarray}；mmap=True 时是只读 np.memmap（不拷贝）。"""
+        rows = self._rows
+        out = {}
+        for c in self.column_names:
+            dt = self._dtype(c)
+            path = self._col_path(c)
+            if rows == 0 or not path.exists():
+                out[c] = np.empty(0, dtype=dt)
+            elif mmap:
+                out[c] = np.memmap(path, dtype=dt, mode="r", shape=(rows,))
+            else:
+                out[c] = np.fromfile(path, dtype=dt, count=rows)
+        return out
+
+    def time_range(self, start=None, end=None, decode: bool = True) -> dict:
+        """
+        [start, end] 内的各列切片。ts 列按追加顺序单调递增，直接二分查找，
+        数值列是 mmap 上的视图（不拷贝）；decode=True 时字符串列解码成 object 数组。
+        """
+        cols = self.columns()
+        ts = cols["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, _to_epoch(start), side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _to_epoch(end), side="right"))
+        out = {c: v[lo:hi] for c, v in cols.items()}
+        if decode:
+            for c in DICT_COLUMNS:
+                out[c] = self.decode(c, out[c])
+        return out
+
+    def vocabulary(self, name) -> list:
+        return list(self._vocab[name])
+
+    def decode(self, name, codes) -> np.ndarray:
+        vocab = np.asarray(self._vocab[name], dtype=object)
+        return vocab[np.asarray(codes)]
+
+    def to_records(self, cols=None) -> list:
+        """把列（默认全部）还原成和 JSONL 相同结构的 dict 列表。"""
+        cols = self.columns() if cols is None else cols
+        decoded = {c: self.decode(c, cols[c]) for c in DICT_COLUMNS}
+        out = []
+        for i in range(len(cols["ts"])):
+            out.append({
+                "ts": epoch_to_ts(cols["ts"][i]),
+                "app": decoded["app"][i],
+                "title": decoded["title"][i],
+                "keystrokes_per_min": float(cols["keystrokes_per_min"][i]),
+                "mouse_px_per_min": float(cols["mouse_px_per_min"][i]),
+                "tags": decoded["tags"][i],
+                "pred_focus": float(cols["pred_focus"][i]),
+            })
+        return out
+
+
+def import_jsonl(store: ColumnarActivityStore, records, batch_size: int = 4096, after=None) -> int:
+    """把一串 JSONL 记录（dict）按批导入列式存储；after（epoch 秒）之前及同一时刻的记录跳过。"""
+    total = 0
+    batch = []
+    for rec in records:
+        if after is not None and rec.get("ts") and ts_to_epoch(rec["ts"]) <= after:
+            continue
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            total += store.append(batch)
+            batch = []
+    total += store.append(batch)
+    return total
+
+
+def catch_up(store: ColumnarActivityStore, log_path) -> int:
+    """从日志（含归档段）导入存储里最后一条之后的记录；命令行和后端启动时共用。"""
+    from activity_log import iter_records
+    after = store.last_epoch()
+    start = epoch_to_ts(after) if after is not None else None
+    return import_jsonl(store, iter_records(log_path, start=start), after=after)
+
+
+def _iter_jsonl_file(path):
+    import gzip, io
+    opener = (lambda p: io.TextIOWrapper(gzip.open(p, "rb"), encoding="utf-8")) \
+        if str(path).endswith(".gz") else (lambda p: open(p, "r", encoding="utf-8"))
+    with opener(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+if __name__ == "__main__":
+    BASE_DIR = Path(__file__).resolve().parent
+    ap = argparse.ArgumentParser(description="Import JSONL activity logs into the columnar store")
+    ap.add_argument("files", nargs="*", help="JSONL(.gz) 文件；不填则导入 activity_log_focus.jsonl 及全部归档段")
+    ap.add_argument("--store", default=str(BASE_DIR / "activity_columns"))
+    ap.add_argument("--rebuild", action="store_true", help="导入前清空已有数据")
+    args = ap.parse_args()
+
+    try:
+        store = ColumnarActivityStore(args.store)
+    except StoreLockedError as e:
+        print(f"{e}. Is the backend running? It imports new log records by itself on startup.")
+        sys.exit(1)
+    if args.rebuild:
+        store.clear()
+    # 增量导入：已有的行不再追加（ts 列必须保持单调）
+    after = store.last_epoch()
+    if after is not None:
+        print(f"Store has {len(store)} rows up to {epoch_to_ts(after)}; importing newer records only "
+              f"(use --rebuild to re-import everything)")
+    if args.files:
+        n = sum(import_jsonl(store, _iter_jsonl_file(p), after=after) for p in args.files)
+    else:
+        n = catch_up(store, BASE_DIR / "activity_log_focus.jsonl")
+    print(f"Imported {n} records -> {args.store} ({len(store)} rows total)")
+    store.close()
+    sys.exit(0)
@@ -0,0 +1,243 @@
+# backend/embedding_cache.py
+import os, re, hashlib, threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    SBERT 向量的 LRU 缓存，key 为送入 encode 的完整文本。
+    同一个窗口标题反复出现时，只需一次字典查找而不是一次 MiniLM 前向计算。
+    可选地持久化到 .npz，下次启动时直接预热。
+    """
+
+    def __init__(self, encoder, maxsize: int = 4096, path=None, model_name: str = "", store=None):
+        self._encoder = encoder
+        self.maxsize = max(1, int(maxsize))
+        self.path = Path(path) if path else None
+        self.model_name = model_name or ""
+        # 可选的只读 EmbeddingStore（训练脚本写入）：LRU 未命中时先查它，再调用 encoder
+        self.store = store if store is not None and store.model_name == self.model_name else None
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        if self.path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, text: str):
+        return text in self._data
+
+    # ---------- 查询 ----------
+    def get(self, text: str):
+        with self._lock:
+            emb = self._data.get(text)
+            if emb is not None:
+                self._data.move_to_end(text)
+            return emb
+
+    def put(self, text: str, emb: np.ndarray):
+        emb = np.asarray(emb, dtype=np.float32)
+        emb.setflags(write=False)  # 缓存里的向量被多次复用，禁止原地修改
+        with self._lock:
+            self._data[text] = emb
+            self._data.move_to_end(text)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def encode(self, text: str) -> np.ndarray:
+        """返回 text 的向量（1D）；未命中时调用 encoder 并写入缓存。"""
+        emb = self.get(text)
+        if emb is not None:
+            self.hits += 1
+            return emb
+        self.misses += 1
+        emb = self.store.get(text) if self.store is not None else None
+        if emb is not None:
+            self.store_hits += 1
+        else:
+            emb = self._encoder([text], convert_to_numpy=True)[0]
+        self.put(text, emb)
+        return self._data.get(text, emb)
+
+    def encode_many(self, texts) -> np.ndarray:
+        """批量版 encode：未命中的文本去重后一次性送入 encoder，返回 (n, dim)。"""
+        out = [self.get(t) for t in texts]
+        missing = list(dict.fromkeys(t for t, e in zip(texts, out) if e is None))
+        self.hits += len(texts) - sum(e is None for e in out)
+        if missing:
+            self.misses += len(missing)
+            fresh = {}
+            if self.store is not None:
+                for t in missing:
+                    e = self.store.get(t)
+                    if e is not None:
+                        fresh[t] = e
+                self.store_hits += len(fresh)
+                missing = [t for t in missing if t not in fresh]
+            if missing:
+                fresh.update(zip(missing, self._encoder(missing, convert_to_numpy=True)))
+            for t, e in fresh.items():
+                self.put(t, e)
+            out = [e if e is not None else fresh[t] for t, e in zip(texts, out)]
+        return np.vstack(out) if out else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "hit_rate": self.hits / total if total else 0.0,
+            "store_hits": self.store_hits,
+        }
+
+    # ---------- 持久化 ----------
+    def load(self) -> int:
+        """从 path 读取缓存；文件缺失、损坏或模型名不一致时忽略。返回载入条数。"""
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                if str(npz["model"]) != self.model_name:
+                    return 0
+                texts = npz["texts"].tolist()
+                embs = npz["embs"]
+        except Exception as e:
+            print("Embedding cache load failed:", e)
+            return 0
+        # 文件按 LRU 顺序保存（旧 → 新），只保留最新的 maxsize 条
+        for text, emb in list(zip(texts, embs))[-self.maxsize:]:
+            self.put(text, emb)
+        return len(self._data)
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            texts = list(self._data.keys())
+            embs = list(self._data.values())
+        if not texts:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, texts=np.array(texts, dtype=str), embs=np.vstack(embs),
+                         model=np.array(self.model_name))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Embedding cache save failed:", e)
+
+
+def text_key(text: str) -> bytes:
+    """EmbeddingStore 的 key：文本 UTF-8 的 SHA-256 前 16 字节。"""
+    return hashlib.sha256(text.encode("utf-8")).digest()[:16]
+
+
+class EmbeddingStore:
+    """
+    持久化的 SBERT 向量表，不限大小：每个模型一个 <dir>/<模型名>.npz，
+    行按文本 hash（text_key）索引，不保存原文。
+
+    train_focus_regressor_sbert.py 用它做去重 + 增量编码（重跑或 CSV 追加数据时
+    只编码新文本）；后端的 EmbeddingCache(store=...) 未命中时也会先查这里。
+    """
+
+    def __init__(self, directory, model_name: str):
+        self.directory = Path(directory)
+        self.model_name = model_name
+        safe = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        self.path = self.directory / f"{safe}.npz"
+        self._index = {}   # text_key -> 行号
+        self._embs = None  # (n, dim) float32
+        self._pending = []  # 还没 save() 的新向量
+        self.load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, text: str):
+        return text_key(text) in self._index
+
+    def load(self) -> int:
+        """读取 path；文件缺失、损坏或模型名不一致时为空表。返回条数。"""
+        self._index, self._embs, self._pending = {}, None, []
+        if not self.path.exists():
+            return 0
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                if str(npz["model"]) != self.model_name:
+                    return 0
+                keys = npz["keys"]
+                embs = npz["embs"]
+        except Exception as e:
+            print("Embedding store load failed:", e)
+            return 0
+        embs.setflags(write=False)
+        self._embs = embs
+        raw = keys.tobytes()
+        self._index = {raw[i * 16:(i + 1) * 16]: i for i in range(len(keys))}
+        return len(self._index)
+
+    def _rows(self):
+        if self._pending:
+            parts = ([self._embs] if self._embs is not None else []) + [np.vstack(self._pending)]
+            self._embs = np.vstack(parts).astype(np.float32, copy=False)
+            self._embs.setflags(write=False)
+            self._pending = []
+        return self._embs
+
+    def get(self, text: str):
+        i = self._index.get(text_key(text))
+        return None if i is None else self._rows()[i]
+
+    def add(self, texts, embs):
+        embs = np.asarray(embs, dtype=np.float32).reshape(len(texts), -1)
+        start = len(self._index)
+        new = []
+        for t, e in zip(texts, embs):
+            k = text_key(t)
+            if k not in self._index:
+                self._index[k] = start + len(new)
+                new.append(e)
+        if new:
+            self._pending.append(np.vstack(new))
+        return len(new)
+
+    def encode_many(self, texts, encoder, batch_size: int = 256) -> np.ndarray:
+        """
+        返回 texts 的 (n, dim) 向量：先去重，表里没有的文本按 batch_size 分批送入
+        encoder(list) 并写入表，最后按下标散回原顺序。
+        """
+        texts = list(texts)
+        unique = list(dict.fromkeys(texts))
+        missing = [t for t in unique if text_key(t) not in self._index]
+        for i in range(0, len(missing), batch_size):
+            chunk = missing[i:i + batch_size]
+            self.add(chunk, encoder(chunk))
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        rows = np.fromiter((self._index[text_key(t)] for t in texts), dtype=np.int64, count=len(texts))
+        return self._rows()[rows]
+
+    def save(self):
+        keys = list(self._index.keys())
+        if not keys:
+            return
+        embs = self._rows()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                # (n, 16) uint8 而不是 S16：S 类型会截掉 hash 末尾的 \x00
+                np.savez(f, keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16),
+                         embs=embs, model=np.array(self.model_name))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Embedding store save failed:", e)
@@ -0,0 +1,158 @@
+# backend/focus_engine.py
+"""
+专注度推理引擎：SBERT + LightGBM 回归器（pred_focus）和 AI Part 的集成分类器。
+run.py 的后端进程、inference_service.py 的常驻服务都用它加载模型，
+保证同一套模型 / 同一套 tags 规则只有一份代码。
+"""
+import sys
+from pathlib import Path
+
+# Support PyInstaller bundled path
+if getattr(sys, 'frozen', False):
+    BASE_DIR = Path(sys._MEIPASS) / "backend"
+    AI_DIR = Path(sys._MEIPASS) / "AI Part"
+else:
+    BASE_DIR = Path(__file__).resolve().parent
+    AI_DIR = (BASE_DIR / ".." / "AI Part").resolve()
+BUNDLE_PATH = BASE_DIR / "focus_regressor_sbert.pkl"
+EMBED_STORE_DIR = BASE_DIR / "embedding_store"  # train_focus_regressor_sbert.py 写入的向量表
+
+# === tags 推断 ===
+KEYWORDS = {
+    "study": ["docs", "notion", "overleaf", "report", "homework", "lecture", "pdf",
+              "vscode", "pycharm", "jupyter", "word", "google docs"],
+    "entertainment": ["youtube", "netflix", "twitch", "spotify", "music", "reddit",
+                      "weibo", "bilibili"],
+    "meeting": ["zoom", "teams", "meet", "slack"],
+    "shopping": ["amazon", "bestbuy", "ebay", "cart", "checkout"],
+    "email": ["gmail", "outlook", "inbox", "compose"]
+}
+
+def infer_tags(app, title):
+    t = f"{app} {title}".lower()
+    tags = [tag for tag, kws in KEYWORDS.items() if any(k in t for k in kws)]
+    if not tags:
+        tags.append("browsing")
+    return ", ".join(sorted(set(tags + ["behavior"])))
+
+def embed_text(app, title, tags):
+    return f"{app} | {title} | {tags}"
+
+
+# === 模型加载 ===
+def load_ai_module(ai_dir=AI_DIR):
+    """导入 AI Part/AI.py。focus_model.pkl 里的类是以 __main__ 为模块名 pickle 的，需要同时挂到 __main__。"""
+    if "AI" in sys.modules and hasattr(sys.modules["AI"], "FocusClassifier"):
+        AI = sys.modules["AI"]
+    else:
+        if str(ai_dir) not in sys.path:
+            sys.path.append(str(ai_dir))
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("AI", str(Path(ai_dir) / "AI.py"))
+        AI = importlib.util.module_from_spec(spec)
+        sys.modules["AI"] = AI
+        spec.loader.exec_module(AI)
+    sys.modules["__main__"] = AI
+    return AI
+
+
+def default_model_path(ai_dir=AI_DIR) -> Path:
+    """优先用 export_models.py 导出的 focus_model.npz（纯 NumPy 推理，不 import torch），没有时回退到 pkl。"""
+    npz = Path(ai_dir) / "focus_model.npz"
+    return npz if npz.exists() else Path(ai_dir) / "focus_model.pkl"
+
+
+def load_classifier(ai_dir=AI_DIR, model_path=None):
+    AI = load_ai_module(ai_dir)
+    model = AI.FocusClassifier(use_gpu=False)
+    model.load_model(str(model_path or default_model_path(ai_dir)))
+    return model
+
+
+class FocusEngine:
+    """
+    一次性加载全部模型，提供批量接口：
+
+        engine = FocusEngine()
+        engine.predict([{"app": ..., "title": ..., "keystrokes_per_min": ..., "mouse_px_per_min": ...}])
+
+    load_regressor=False 时只加载分类器（输入记录必须自带 pred_focus，例如 process_file.py 的数据）。
+    """
+
+    def __init__(self, bundle_path=BUNDLE_PATH, ai_dir=AI_DIR, load_regressor: bool = True,
+                 load_classifier_model: bool = True, embed_cache_path=None, embed_cache_size: int = 4096,
+                 embed_store_dir=EMBED_STORE_DIR):
+        self.reg = self.scaler = self.sbert = self.lean_reg = self.emb_cache = None
+        self.sbert_model_name = None
+        self.classifier = None
+
+        if load_regressor:
+            import joblib
+            from sentence_transformers import SentenceTransformer
+            from embedding_cache import EmbeddingCache, EmbeddingStore
+            from lean_regressor import LeanRegressor
+
+            bundle = joblib.load(bundle_path)
+            self.reg = bundle["regressor"]
+            self.scaler = bundle["numeric_scaler"]
+            self.sbert_model_name = bundle["sbert_model_name"]
+            self.sbert = SentenceTransformer(self.sbert_model_name)
+            # 单行推理走 Booster + 预分配行，省掉每个 tick 的 DataFrame 和 386 个列名
+            self.lean_reg = LeanRegressor(self.reg, self.scaler)
+            # 相同窗口文本只编码一次（命中时跳过 MiniLM 前向计算）；训练时编码过的文本直接查向量表
+            store = EmbeddingStore(embed_store_dir, self.sbert_model_name) if embed_store_dir else None
+            self.emb_cache = EmbeddingCache(self.sbert.encode, maxsize=embed_cache_size,
+                                            path=embed_cache_path, model_name=self.sbert_model_name,
+                                            store=store if store is not None and len(store) else None)
+
+        if load_classifier_model:
+            self.classifier = load_classifier(ai_dir)
+
+    @property
+    def models(self) -> list:
+        out = []
+        if self.lean_reg is not None:
+            out.append(f"regressor+{self.sbert_model_name}")
+        if self.classifier is not None:
+            out.append("classifier")
+        return out
+
+    # ---------- 批量接口 ----------
+    def embed(self, texts):
+        if self.emb_cache is None:
+            raise RuntimeError("SBERT is not loaded")
+        return self.emb_cache.encode_many(list(texts))
+
+    def score(self, records):
+        """补全 tags，并对没有 pred_focus 的记录批量预测（一次 encode + 一次 Booster 调用）。"""
+        for r in records:
+            if not r.get("tags"):
+                r["tags"] = infer_tags(r.get("app", ""), r.get("title", ""))
+        todo = [r for r in records if r.get("pred_focus") is None]
+        if todo:
+            if self.lean_reg is None:
+                raise RuntimeError("Regressor is not loaded; records must include pred_focus")
+            embs = self.embed([embed_text(r.get("app", ""), r.get("title", ""), r["tags"]) for r in todo])
+            numeric = [(float(r.get("keystrokes_per_min") or 0.0), float(r.get("mouse_px_per_min") or 0.0))
+                       for r in todo]
+            scores = self.lean_reg.predict_batch(embs, numeric)
+            for r, s in zip(todo, scores):
+                r["pred_focus"] = round(max(0.0, min(100.0, float(s))), 2)
+        return records
+
+    def classify(self, records):
+        """对每条记录给出 monitor_activity 同格式的结果（没有分类器时为 None），整批只调一次模型。"""
+        if self.classifier is None:
+            return [None] * len(records)
+        return self.classifier.monitor_batch(records)
+
+    def predict(self, records) -> list:
+        records = [dict(r) for r in records]
+        self.score(records)
+        out = []
+        for r, c in zip(records, self.classify(records)):
+            res = {"score": r["pred_focus"], "tags": r["tags"]}
+            if c is not None:
+                res.update(c)
+            out.append(res)
+        return out
@@ -0,0 +1,76 @@
+# backend/inference_client.py
+import json, socket, threading, itertools
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class ServiceError(RuntimeError):
+    """推理服务返回 ok=false。"""
+
+
+class InferenceClient:
+    """
+    inference_service.py 的轻量客户端（只依赖标准库）。一条 TCP 连接，
+    每个请求一行 JSON，收到同 id 的一行响应后返回：
+
+        client = InferenceClient()            # 127.0.0.1:8765
+        client.predict([{"app": "Code.exe", "title": "run.py", "keystrokes_per_min": 80,
+                         "mouse_px_per_min": 2000}])
+        -> [{"score": 71.3, "tags": "behavior, browsing", "status": "focused", "message": ..., ...}]
+
+    同一个实例可以被多个线程共用（请求之间加锁串行）；需要并发时每个线程各建一个实例。
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 30.0):
+        self.host, self.port = host, int(port)
+        self._sock = socket.create_connection((host, self.port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._rfile = self._sock.makefile("rb")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_address(cls, address: str, **kwargs):
+        """"host:port" 或 "port"。"""
+        host, _, port = address.rpartition(":")
+        return cls(host or DEFAULT_HOST, int(port), **kwargs)
+
+    def request(self, op: str, **payload) -> dict:
+        msg = {"id": next(self._ids), "op": op}
+        msg.update(payload)
+        data = (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._sock.sendall(data)
+            line = self._rfile.readline()
+        if not line:
+            raise ConnectionError("Inference service closed the connection")
+        resp = json.loads(line)
+        if not resp.get("ok"):
+            raise ServiceError(resp.get("error", "unknown error"))
+        return resp
+
+    def ping(self) -> dict:
+        return self.request("ping")
+
+    def predict(self, records) -> list:
+        """records: tick 记录（app / title / keystrokes_per_min / mouse_px_per_min，可带 tags / pred_focus）。"""
+        return self.request("predict", records=list(records))["results"]
+
+    def embed(self, texts):
+        """SBERT 向量，返回 (n, dim) 的 float32 数组。"""
+        import numpy as np
+        return np.asarray(self.request("embed", texts=list(texts))["embeddings"], dtype=np.float32)
+
+    def close(self):
+        try:
+            self._rfile.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,253 @@
+# backend/inference_service.py
+"""
+常驻本地推理服务：一次加载 SBERT + 回归器 + 集成分类器，供 run.py 后端、
+AI Part/process_file.py 和训练脚本共用，不再各自加载 focus_model.pkl。
+
+协议：TCP（默认 127.0.0.1:8765），每行一个 JSON 请求 / 响应，响应带回请求的 id：
+
+    {"id": 1, "op": "ping"}
+    {"id": 2, "op": "predict", "records": [{"app": ..., "title": ..., "keystrokes_per_min": ..., "mouse_px_per_min": ...}]}
+    {"id": 3, "op": "embed", "texts": ["..."]}
+
+    -> {"id": 2, "ok": true, "results": [...]}
+    -> {"id": 2, "ok": false, "error": "..."}
+
+模型计算放在单独的工作线程里（模型不是线程安全的），事件循环只负责收发。
+
+多客户端时 predict 请求会被合并（micro-batching）：第一个请求到达后最多再等
+--max-wait-ms 毫秒或凑够 --max-batch 条记录，然后整批做一次 SBERT encode
+和一次分类器 batch 调用，再按请求拆回结果。等待越久批越大、吞吐越高，单请求延迟也越高；
+默认 --max-wait-ms 0：只合并模型忙时已经排队的请求，--no-batching 关闭合并。
+
+    python inference_service.py [--host 127.0.0.1] [--port 8765] [--no-regressor]
+                                [--max-batch 256] [--max-wait-ms 0] [--no-batching]
+"""
+import sys, json, time, asyncio, argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from inference_client import DEFAULT_HOST, DEFAULT_PORT
+
+MAX_LINE_BYTES = 16 * 1024 * 1024  # 单个请求最大 16 MB（大批量 predict）
+DEFAULT_MAX_BATCH = 256     # 一批最多多少条记录
+DEFAULT_MAX_WAIT_MS = 0.0   # 第一个请求最多等多久再开跑（0：模型忙时排队的请求自然成批）
+
+
+class MicroBatcher:
+    """
+    把并发的 predict 请求合并成一次模型调用。submit() 返回该请求自己的那一段结果。
+    单个请求本身就超过 max_items 时单独成批，不拆开。
+    """
+
+    def __init__(self, fn, executor, max_items: int = DEFAULT_MAX_BATCH, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.fn = fn
+        self.executor = executor
+        self.max_items = max(1, int(max_items))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._pending = []          # [(records, future)]
+        self._pending_records = 0
+        self._nonempty = self._full = None  # 在 start() 里、事件循环内创建
+        self._task = None
+        # 统计
+        self.batches = 0
+        self.batched_requests = 0
+        self.batched_records = 0
+
+    def start(self):
+        self._nonempty = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, records: list) -> list:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((records, fut))
+        self._pending_records += len(records)
+        self._nonempty.set()
+        if self._pending_records >= self.max_items:
+            self._full.set()
+        return await fut
+
+    def _take(self):
+        batch, n = [], 0
+        while self._pending and (not batch or n + len(self._pending[0][0]) <= self.max_items):
+            records, fut = self._pending.pop(0)
+            batch.append((records, fut))
+            n += len(records)
+        self._pending_records -= n
+        if not self._pending:
+            self._nonempty.clear()
+        if self._pending_records < self.max_items:
+            self._full.clear()
+        return batch, n
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._nonempty.wait()
+            if self.max_wait > 0 and not self._full.is_set():
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            batch, n = self._take()
+            if not batch:
+                continue
+            # 模型跑这一批期间，新请求继续在 _pending 里排队，下一轮自然成批
+            records = [r for recs, _ in batch for r in recs]
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, records)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._resolve(batch[0][1], exc=e)
+                else:
+                    # 合并批失败时逐个请求重跑，坏请求不拖累同批的其他客户端
+                    for recs, fut in batch:
+                        try:
+                            self._resolve(fut, await loop.run_in_executor(self.executor, self.fn, recs))
+                        except Exception as e1:
+                            self._resolve(fut, exc=e1)
+                continue
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self.batched_records += n
+            start = 0
+            for recs, fut in batch:
+                self._resolve(fut, results[start:start + len(recs)])
+                start += len(recs)
+
+    @staticmethod
+    def _resolve(fut, result=None, exc=None):
+        if fut.done():  # 客户端已断开
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_items,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "mean_requests_per_batch": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "mean_records_per_batch": round(self.batched_records / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class InferenceService:
+    def __init__(self, engine, batching: bool = True, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.engine = engine
+        # 所有模型调用都在这一个线程里串行执行
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FoxInference")
+        self.batcher = MicroBatcher(engine.predict, self._executor, max_batch, max_wait_ms) if batching else None
+        self.requests = 0
+        self.records = 0
+        self.started = time.time()
+
+    # ---------- 请求处理 ----------
+    def _handle_sync(self, op: str, msg: dict) -> dict:
+        if op == "predict":
+            records = msg.get("records") or []
+            self.records += len(records)
+            return {"results": self.engine.predict(records)}
+        if op == "embed":
+            return {"embeddings": self.engine.embed(msg.get("texts") or []).tolist()}
+        raise ValueError(f"Unknown op: {op}")
+
+    async def handle(self, msg: dict) -> dict:
+        op = msg.get("op")
+        if op == "ping":
+            return {"models": self.engine.models, "requests": self.requests, "records": self.records,
+                    "uptime": round(time.time() - self.started, 1),
+                    "batching": self.batcher.stats() if self.batcher is not None else None}
+        if op == "predict" and self.batcher is not None:
+            records = msg.get("records") or []
+            self.records += len(records)
+            return {"results": await self.batcher.submit(records)}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._handle_sync, op, msg)
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.requests += 1
+                msg_id = None
+                try:
+                    msg = json.loads(line)
+                    msg_id = msg.get("id")
+                    resp = await self.handle(msg)
+                    resp.update({"id": msg_id, "ok": True})
+                except Exception as e:
+                    resp = {"id": msg_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+                writer.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None):
+        server = await asyncio.start_server(self._on_client, host, port, limit=MAX_LINE_BYTES)
+        addr = server.sockets[0].getsockname()
+        mode = (f"batching ≤{self.batcher.max_items} records / {self.batcher.max_wait * 1000:g} ms"
+                if self.batcher is not None else "no batching")
+        print(f"🦊 Inference service listening on {addr[0]}:{addr[1]} ({', '.join(self.engine.models)}; {mode})")
+        if self.batcher is not None:
+            self.batcher.start()
+        if ready is not None:
+            ready(addr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.batcher is not None:
+                await self.batcher.stop()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Long-lived local focus inference service")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--no-regressor", action="store_true",
+                    help="只加载分类器（不加载 SBERT / LightGBM），请求必须自带 pred_focus")
+    ap.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="合并批的记录数上限")
+    ap.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                    help="第一个请求最多等多久凑批（0 = 只合并已排队的请求）")
+    ap.add_argument("--no-batching", action="store_true", help="每个请求单独跑模型")
+    args = ap.parse_args()
+
+    from focus_engine import FocusEngine
+    t0 = time.perf_counter()
+    engine = FocusEngine(load_regressor=not args.no_regressor)
+    print(f"Models loaded in {time.perf_counter() - t0:.1f}s")
+
+    service = InferenceService(engine, batching=not args.no_batching,
+                               max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        print(f"Served {service.requests} requests / {service.records} records")
+        if service.batcher is not None:
+            print("Batching:", service.batcher.stats())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# backend/inference_worker.py
+import threading
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+
+class InferenceWorker(QObject):
+    """
+    后台推理线程：SBERT 编码、回归、集成分类和写日志都在这里完成，
+    结果通过信号（跨线程自动排队）送回 GUI 线程，避免阻塞桌宠动画。
+
+    compute_fn() 返回 dict：
+        {"score": float, "message": str | None, "alert": bool, ...}
+    """
+    scored = Signal(float)     # -> FloatingPet.update_by_score
+    message = Signal(str)      # -> FloatingPet.update_message
+    alert = Signal()           # -> FloatingPet.play_alert_sound
+    failed = Signal(str)
+
+    _trigger = Signal()
+
+    def __init__(self, compute_fn):
+        super().__init__()
+        self._compute_fn = compute_fn
+        self._busy = threading.Event()
+        self.dropped = 0
+
+        self._thread = QThread()
+        self._thread.setObjectName("FoxInferenceThread")
+        self.moveToThread(self._thread)
+        self._trigger.connect(self._run_once)
+        self._thread.start()
+
+    def request_tick(self) -> bool:
+        """
+        由 GUI 线程的 QTimer 调用。上一次 tick 还没跑完时直接丢弃本次请求
+        （不排队），返回 False。
+        """
+        if self._busy.is_set():
+            self.dropped += 1
+            return False
+        self._busy.set()
+        self._trigger.emit()
+        return True
+
+    @Slot()
+    def _run_once(self):
+        try:
+            result = self._compute_fn()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            self._busy.clear()
+
+        if result.get("message"):
+            self.message.emit(result["message"])
+            if result.get("alert"):
+                self.alert.emit()
+        self.scored.emit(result["score"])
+
+    def stop(self, timeout_ms: int = 10000):
+        """等待正在进行的 tick 结束后退出线程。"""
+        self._thread.quit()
+        self._thread.wait(timeout_ms)
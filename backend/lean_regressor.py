@@ -0,0 +1,49 @@
+# backend/lean_regressor.py
+import numpy as np
+
+
+class LeanRegressor:
+    """
+    每个 tick 只预测一行：绕过 LGBMRegressor.predict 的 pandas/特征名校验，
+    直接调用底层 Booster，并复用一块预分配的 NumPy 行。
+    StandardScaler 的变换也内联成两次减除法。
+
+    注意：内部行缓冲是共享的，一个实例只能在一个线程里使用（推理线程）。
+    """
+
+    def __init__(self, reg, scaler):
+        self.booster = getattr(reg, "booster_", reg)
+        self.n_features = self.booster.num_feature()
+
+        n_num = len(scaler.scale_ if scaler.scale_ is not None else scaler.mean_)
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None else None
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else None
+        self._mean = np.zeros(n_num) if mean is None else np.asarray(mean, dtype=np.float64)
+        self._scale = np.ones(n_num) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        self.emb_dim = self.n_features - n_num
+        self._row = np.zeros((1, self.n_features), dtype=np.float64)
+
+    def fill_row(self, emb, numeric):
+        """把句向量和标准化后的键鼠特征写进预分配行（分阶段计时时单独调用）。"""
+        row = self._row
+        row[0, :self.emb_dim] = emb
+        num = row[0, self.emb_dim:]
+        num[:] = numeric
+        num -= self._mean
+        num /= self._scale
+        return row
+
+    def predict_row(self) -> float:
+        return float(self.booster.predict(self._row)[0])
+
+    def predict(self, emb, numeric) -> float:
+        """emb: 1D 句向量；numeric: [ks_per_min, mouse_px_per_min]（未标准化）。"""
+        self.fill_row(emb, numeric)
+        return self.predict_row()
+
+    def predict_batch(self, embs, numeric) -> np.ndarray:
+        """embs: (n, emb_dim)；numeric: (n, 2) 未标准化。一次 Booster 调用预测 n 行（不共享缓冲，线程安全）。"""
+        embs = np.asarray(embs, dtype=np.float64)
+        num = (np.asarray(numeric, dtype=np.float64).reshape(len(embs), -1) - self._mean) / self._scale
+        return self.booster.predict(np.hstack([embs, num]))
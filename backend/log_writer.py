@@ -0,0 +1,252 @@
+# backend/log_writer.py
+import os, json, threading
+from pathlib import Path
+
+from activity_log import (SegmentManifest, archive_dir_for, archive_segment, scan_range,
+                          hour_key, load_hour_index, save_hour_index, build_hour_index)
+
+# fsync 策略
+FSYNC_NEVER = "never"    # 只 flush 到系统缓存，由 OS 决定何时落盘
+FSYNC_CLOSE = "close"    # 关闭时 fsync 一次（默认）
+FSYNC_ALWAYS = "always"  # 每次批量写入后都 fsync（最稳，但最费 I/O）
+
+MAX_BACKLOG = 10_000     # 写盘持续失败时最多积压多少条（约 14 小时的 tick），超出丢最旧的
+
+
+class BufferedLogWriter:
+    """
+    长期持有文件句柄的 JSONL 日志写入器。
+    tick 只把 entry 放进内存缓冲（不做序列化、不碰磁盘），
+    后台线程按时间间隔或缓冲条数批量序列化并一次性写入。
+
+    add_listener(fn) 注册的回调会在每批写盘成功后（后台线程里）收到这批 entry，
+    用来同步列式存储等派生数据。
+
+    可选按大小（rotate_bytes）或按天（rotate_daily）轮转：当前段被 gzip 压缩进
+    activity_archive/ 并登记到 manifest（见 activity_log.py），然后从空文件继续写。
+
+    写入时顺带维护当前段的小时索引（hour -> 字节偏移，见 activity_log.query）。
+
+    写盘失败（磁盘满、文件被锁）时没写出去的 entry 放回缓冲下次重试，
+    积压超过 max_backlog 条时丢掉最旧的并计入 dropped。
+    """
+
+    def __init__(self, path, flush_interval: float = 60.0, max_buffer: int = 64,
+                 fsync: str = FSYNC_CLOSE, rotate_bytes=None, rotate_daily: bool = False,
+                 max_backlog: int = MAX_BACKLOG):
+        if fsync not in (FSYNC_NEVER, FSYNC_CLOSE, FSYNC_ALWAYS):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = Path(path)
+        self.flush_interval = float(flush_interval)
+        self.max_buffer = max(1, int(max_buffer))
+        self.fsync = fsync
+        self.rotate_bytes = int(rotate_bytes) if rotate_bytes else None
+        self.rotate_daily = bool(rotate_daily)
+        self.max_backlog = max(self.max_buffer, int(max_backlog))
+
+        self._buf = []
+        self._listeners = []
+        self._lock = threading.Lock()     # 保护 _buf
+        self._io_lock = threading.Lock()  # 保护文件句柄
+        self._wake = threading.Event()
+        self._closed = False
+        self._f = open(self.path, "a", encoding="utf-8", newline="\n", buffering=1 << 16)
+
+        self.records = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.dropped = 0         # 积压超过 max_backlog 被丢弃的条数
+        self.write_errors = 0    # 连续失败的 flush 次数（成功后清零）
+
+        # 当前段的时间范围和大小（只读首尾，不整份扫描）
+        self._manifest = None
+        self._seg_start, self._seg_end = None, None
+        self._seg_bytes = self.path.stat().st_size
+        if self.rotate_bytes or self.rotate_daily:
+            self._manifest = SegmentManifest(archive_dir_for(self.path))
+            self._seg_start, self._seg_end = scan_range(self.path)
+
+        # 小时索引：启动后在后台线程里补全（见 _ensure_index）
+        self._hours = {}
+        self._hours_dirty = False
+        self._index_ready = False
+
+        self._thread = threading.Thread(target=self._loop, name="FoxLogWriter", daemon=True)
+        self._thread.start()
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def write(self, entry: dict):
+        """放入缓冲；缓冲满时唤醒后台线程立即写盘。"""
+        with self._lock:
+            self._buf.append(entry)
+            full = len(self._buf) >= self.max_buffer
+        if full:
+            self._wake.set()
+
+    def _ensure_index(self):
+        """加载 .idx.json 并从它记录的位置扫描到文件末尾（调用方持有 _io_lock）。"""
+        if self._index_ready:
+            return
+        self._index_ready = True
+        try:
+            size, hours = load_hour_index(self.path)
+            if size > self._seg_bytes:  # 索引比文件新（文件被截断/替换过），重建
+                size, hours = 0, {}
+            if size < self._seg_bytes:
+                size, hours = build_hour_index(self.path, size, hours)
+            self._hours = hours
+            self._hours_dirty = True
+        except Exception as e:
+            print("hour index build failed:", e)
+
+    def _save_index(self):
+        if not self._hours_dirty:
+            return
+        try:
+            save_hour_index(self.path, self._seg_bytes, self._hours)
+            self._hours_dirty = False
+        except Exception as e:
+            print("hour index save failed:", e)
+
+    def _loop(self):
+        with self._io_lock:
+            self._ensure_index()
+            self._save_index()
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._closed:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._buf = self._buf, []
+        if not batch:
+            return
+        with self._io_lock:
+            self._ensure_index()
+            written = 0
+            try:
+                pending = []  # [(entry, line, nbytes)]，写盘成功后才计入索引
+                for entry in batch:
+                    line = json.dumps(entry, ensure_ascii=False) + "\n"
+                    nbytes = len(line.encode("utf-8"))
+                    if self._needs_rotation(entry, nbytes, pending):
+                        self._write(pending)
+                        written += len(pending)
+                        pending = []
+                        self._rotate()
+                    pending.append((entry, line, nbytes))
+                self._write(pending)
+                written += len(pending)
+                self._save_index()
+            except Exception as e:
+                self._requeue(batch[written:], e)
+                if written:
+                    self._done(batch[:written])
+                return
+        if self.write_errors:
+            print(f"log write recovered after {self.write_errors} failed flushes")
+            self.write_errors = 0
+        self._done(batch)
+
+    def _requeue(self, entries, error):
+        """没写出去的放回缓冲开头下次再试；积压超过 max_backlog 时丢最旧的。"""
+        self.write_errors += 1
+        with self._lock:
+            self._buf[:0] = entries
+            over = len(self._buf) - self.max_backlog
+            if over > 0:
+                del self._buf[:over]
+                self.dropped += over
+        # 持续失败时不要每次 flush 都刷屏
+        if self.write_errors == 1 or self.write_errors % 100 == 0:
+            print(f"log write error ({self.write_errors} in a row, {self.dropped} entries dropped):", error)
+
+    def _done(self, entries):
+        self.records += len(entries)
+        self.flushes += 1
+        for fn in self._listeners:
+            try:
+                fn(entries)
+            except Exception as e:
+                print("log listener error:", e)
+
+    def _write(self, pending):
+        """写出 [(entry, line, nbytes)]；成功后才更新段范围和小时索引。"""
+        if not pending:
+            return
+        self._f.write("".join(line for _, line, _ in pending))
+        self._f.flush()
+        if self.fsync == FSYNC_ALWAYS:
+            os.fsync(self._f.fileno())
+        for entry, _, nbytes in pending:
+            self._track(entry, nbytes)
+
+    # ---------- 轮转 ----------
+    def _track(self, entry, nbytes):
+        ts = entry.get("ts")
+        if ts and hour_key(ts) not in self._hours:
+            self._hours[hour_key(ts)] = self._seg_bytes  # 该行写入前的偏移
+            self._hours_dirty = True
+        self._seg_bytes += nbytes
+        if ts:
+            if self._seg_start is None:
+                self._seg_start = ts
+            self._seg_end = ts
+
+    def _needs_rotation(self, entry, nbytes, pending=()) -> bool:
+        """pending：本批里已排队、还没写出（也没计入 _seg_bytes / _seg_start）的行。"""
+        if self._manifest is None:
+            return False
+        seg_bytes = self._seg_bytes + sum(n for _, _, n in pending)
+        if seg_bytes == 0:
+            return False
+        if self.rotate_bytes and seg_bytes + nbytes > self.rotate_bytes:
+            return True
+        seg_start = self._seg_start or next((e["ts"] for e, _, _ in pending if e.get("ts")), None)
+        if self.rotate_daily and seg_start:
+            # session_start 标记行也算：新的一天的 session 从新段开始
+            ts = entry.get("ts") or entry.get("session_start")
+            if ts and ts[:10] != seg_start[:10]:
+                return True
+        return False
+
+    def _rotate(self):
+        self._f.flush()
+        if self.fsync != FSYNC_NEVER:
+            os.fsync(self._f.fileno())
+        self._f.close()
+        try:
+            archive_segment(self.path, self._manifest, self._seg_start, self._seg_end, self._hours)
+        except Exception as e:
+            # 归档失败时不丢数据：继续往当前段追加，本次运行不再尝试轮转
+            print("log rotation failed:", e)
+            self._manifest = None
+            self._f = open(self.path, "a", encoding="utf-8", newline="\n", buffering=1 << 16)
+            return
+        self._f = open(self.path, "w", encoding="utf-8", newline="\n", buffering=1 << 16)
+        self._seg_start, self._seg_end = None, None
+        self._seg_bytes = 0
+        self._hours = {}
+        self._hours_dirty = True
+        self.rotations += 1
+
+    def close(self):
+        """停止后台线程，写出剩余缓冲并关闭文件（cleanup 时调用）。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._io_lock:
+            try:
+                if self.fsync != FSYNC_NEVER:
+                    self._f.flush()
+                    os.fsync(self._f.fileno())
+            except Exception as e:
+                print("log fsync error:", e)
+            self._f.close()
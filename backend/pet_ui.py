@@ -1,7 +1,8 @@
 # backend/pet_ui.py
 import os, math, time, threading, sys
+from contextlib import nullcontext
 from pathlib import Path
-from PySide6.QtWidgets import QWidget, QLabel, QMenu, QProgressBar, QApplication
+from PySide6.QtWidgets import QWidget, QLabel, QMenu, QProgressBar, QApplication, QMessageBox
 from PySide6.QtGui import QPixmap, QAction, QPainter, QPainterPath, QFont, QFontMetrics, QColor, QBrush, QPen
 from PySide6.QtCore import Qt, QPoint, QTimer, QRect
 
@@ -256,6 +257,16 @@ class FloatingPet(QWidget):
         # 右键菜单
         self.setContextMenuPolicy(Qt.DefaultContextMenu)
 
+        # tick 分阶段计时（由 run.py 通过 set_tick_timer 注入，见 tick_timing.py）
+        self._tick_timer = None
+
+    def set_tick_timer(self, timer):
+        """注入 StageTimer：记录 pet 阶段耗时，并在右键菜单里显示 Debug 项。"""
+        self._tick_timer = timer
+
+    def _stage(self, name: str):
+        return self._tick_timer.stage(name) if self._tick_timer is not None else nullcontext()
+
     # ---------- 样式 ----------
     def _bar_style(self, color_hex: str) -> str:
         return f"""
@@ -345,12 +356,13 @@ class FloatingPet(QWidget):
 
     # ---------- 分数更新 ----------
     def update_by_score(self, new_score: float):
-        new_score = max(0.0, min(100.0, float(new_score)))
-        current = self._display_score
-        if not self._anim_timer.isActive():
-            current = float(self.progress.value())
-            self._display_score = current
-        self._start_anim(current, new_score)
+        with self._stage("pet"):
+            new_score = max(0.0, min(100.0, float(new_score)))
+            current = self._display_score
+            if not self._anim_timer.isActive():
+                current = float(self.progress.value())
+                self._display_score = current
+            self._start_anim(current, new_score)
 
     def _start_anim(self, from_score: float, to_score: float):
         self._anim_from = from_score
@@ -427,10 +439,34 @@ class FloatingPet(QWidget):
         act_close.triggered.connect(do_close)
         menu.addAction(act_toggle_progress)
         menu.addAction(act_always_on_top)
+        if self._tick_timer is not None:
+            self._add_debug_menu(menu)
         menu.addSeparator()
         menu.addAction(act_close)
         menu.exec(event.globalPos())
 
+    def _add_debug_menu(self, menu):
+        timer = self._tick_timer
+        debug = menu.addMenu("Debug")
+        act_timing = QAction("Tick Timing ✓" if timer.enabled else "Tick Timing", self)
+        act_show = QAction("Show Tick Timing…", self)
+        act_reset = QAction("Reset Tick Timing", self)
+
+        def show_timing():
+            text = timer.report()
+            box = QMessageBox(self)
+            box.setWindowTitle("Tick Timing")
+            box.setText(text)
+            box.setFont(QFont("Consolas", 9))
+            box.exec()
+
+        act_timing.triggered.connect(lambda: timer.set_enabled(not timer.enabled))
+        act_show.triggered.connect(show_timing)
+        act_reset.triggered.connect(timer.reset)
+        debug.addAction(act_timing)
+        debug.addAction(act_show)
+        debug.addAction(act_reset)
+
     # ---------- 新增：更新说话气泡 ----------
     def update_message(self, text: str):
         """显示 AI 生成的提醒文字"""
@@ -0,0 +1,119 @@
+# backend/ready_reporter.py
+import os, json, socket, threading
+from pathlib import Path
+
+READY_PORT_ENV = "FOXMATE_READY_PORT"  # 前端 QTcpServer 监听的本地端口
+READY_FLAG_ENV = "FOXMATE_READY_FLAG"  # 旧的 flag 文件（兜底，仍然在 ready 时写）
+PARKED_ENV = "FOXMATE_PARKED"          # =1：预热模式，加载完模型后等待前端的 start 命令
+
+# 启动阶段 -> 进度百分比（前端 LaunchingPage 按它显示进度）
+STAGES = {
+    "starting": 5,
+    "models_loaded": 60,
+    "parked": 60,          # 预热模式：模型已加载，等待 {"cmd": "start"}
+    "session_opened": 70,
+    "listeners_started": 80,
+    "pet_shown": 90,
+    "ready": 100,  # 第一个 tick 完成
+}
+
+
+class ReadyReporter:
+    """
+    后端 -> 前端的启动进度通道：连接 127.0.0.1:$FOXMATE_READY_PORT，
+    每个阶段发一行 JSON：
+
+        {"stage": "models_loaded", "progress": 60, "message": "..."}
+        {"stage": "error", "message": "..."}
+
+    没有设置端口（直接运行 run.py）时所有调用都是空操作；
+    连接失败也只打印一次，不影响后端运行。
+
+    同一条连接也用来接收前端的命令（预热模式下的 start / quit），见 wait_command。
+    """
+
+    def __init__(self, port=None, flag_path=None):
+        if port is None:
+            port = os.environ.get(READY_PORT_ENV)
+        if flag_path is None:
+            flag_path = os.environ.get(READY_FLAG_ENV)
+        self.port = int(port) if port else None
+        self.flag_path = Path(flag_path) if flag_path else None
+        self.done = False
+        self.parked = os.environ.get(PARKED_ENV, "").strip() == "1"
+        self._sock = None
+        self._rbuf = b""
+        self._lock = threading.Lock()
+        if self.port:
+            try:
+                self._sock = socket.create_connection(("127.0.0.1", self.port), timeout=2.0)
+                self._sock.settimeout(None)
+            except OSError as e:
+                print("Ready channel unavailable:", e)
+                self._sock = None
+
+    def send(self, msg: dict):
+        if self._sock is None:
+            return
+        data = (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                self._sock.sendall(data)
+            except OSError as e:
+                print("Ready channel closed:", e)
+                self._close_sock()
+
+    def stage(self, name: str, message: str = ""):
+        self.send({"stage": name, "progress": STAGES.get(name), "message": message})
+
+    def ready(self):
+        """第一个 tick 完成：通知前端交接，并写兜底的 flag 文件（只执行一次）。"""
+        if self.done:
+            return
+        self.done = True
+        self.stage("ready")
+        if self.flag_path is not None:
+            try:
+                self.flag_path.write_text("ready", encoding="utf-8")
+            except OSError as e:
+                print("Ready flag write failed:", e)
+
+    def wait_command(self) -> str:
+        """
+        阻塞读取前端发来的下一条命令（{"cmd": "start"} / {"cmd": "quit"}）。
+        没有连接时：预热模式返回 "quit"（没有明确的 start 绝不开始监控），否则返回 "start"；
+        连接断开（前端已退出）视为 "quit"。
+        """
+        if self._sock is None:
+            return "quit" if self.parked else "start"
+        while True:
+            while b"\n" in self._rbuf:
+                line, self._rbuf = self._rbuf.split(b"\n", 1)
+                try:
+                    cmd = json.loads(line.decode("utf-8")).get("cmd")
+                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                    continue
+                if cmd:
+                    return cmd
+            try:
+                chunk = self._sock.recv(4096)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                return "quit"
+            self._rbuf += chunk
+
+    def fail(self, message: str):
+        self.send({"stage": "error", "message": message})
+
+    def _close_sock(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        self._sock = None
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._close_sock()
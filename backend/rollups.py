@@ -0,0 +1,367 @@
+# backend/rollups.py
+"""
+专注度的增量预聚合（按分钟 / 小时 / 天）。
+
+每个桶记录 count、sum、sum of squares、min、max，以及按 app / tag 累计的秒数，
+tick 到来时 O(1) 更新。持久化按天分文件：
+
+    focus_rollups/2025-10-21.json
+        {"last_ts": ..., "day": [...], "hours": {"09": [...]}, "minutes": {"09:15": [...]}}
+
+周 / 月视图只读 7 / 30 个小文件，和 tick 数量无关。
+
+从已有日志重建：
+    python rollups.py --rebuild
+只补建日志里有、但还没有聚合文件的天（不碰今天）：
+    python rollups.py --backfill
+"""
+import os, sys, json, math, threading, argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+TICK_SECONDS = 5.0     # 正常 tick 间隔
+MAX_GAP_SECONDS = 30.0 # 两条记录间隔超过它（暂停 / 休眠）时，只按一个 tick 计时
+
+
+def split_tags(tags: str):
+    return [t.strip() for t in (tags or "").split(",") if t.strip()]
+
+
+class Bucket:
+    __slots__ = ("count", "sum", "sumsq", "min", "max", "apps", "tags")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min = None
+        self.max = None
+        self.apps = {}  # app -> 秒
+        self.tags = {}  # tag -> 秒
+
+    def add(self, score: float, app: str = None, tags=(), seconds: float = TICK_SECONDS):
+        self.count += 1
+        self.sum += score
+        self.sumsq += score * score
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        if app:
+            self.apps[app] = self.apps.get(app, 0.0) + seconds
+        for tag in tags:
+            self.tags[tag] = self.tags.get(tag, 0.0) + seconds
+
+    def merge(self, other: "Bucket"):
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for k, v in other.apps.items():
+            self.apps[k] = self.apps.get(k, 0.0) + v
+        for k, v in other.tags.items():
+            self.tags[k] = self.tags.get(k, 0.0) + v
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return 0.0
+        var = self.sumsq / self.count - self.mean ** 2
+        return math.sqrt(var) if var > 0 else 0.0
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.apps.values())
+
+    def to_list(self):
+        r = lambda v: round(v, 3)
+        return [self.count, r(self.sum), r(self.sumsq), self.min, self.max,
+                {k: r(v) for k, v in self.apps.items()},
+                {k: r(v) for k, v in self.tags.items()}]
+
+    @classmethod
+    def from_list(cls, data):
+        b = cls()
+        b.count, b.sum, b.sumsq, b.min, b.max, b.apps, b.tags = data
+        return b
+
+
+class DayRollup:
+    """一天内的 day / hour / minute 桶。"""
+
+    def __init__(self, day: str):
+        self.date = day
+        self.day = Bucket()
+        self.hours = {}    # "HH" -> Bucket
+        self.minutes = {}  # "HH:MM" -> Bucket
+        self.last_ts = None
+
+    def add(self, ts: str, score: float, app: str, tags, seconds: float):
+        hh, mm = ts[11:13], ts[11:16]
+        self.day.add(score, app, tags, seconds)
+        self.hours.setdefault(hh, Bucket()).add(score, app, tags, seconds)
+        self.minutes.setdefault(mm, Bucket()).add(score, app, tags, seconds)
+        self.last_ts = ts
+
+    def to_json(self):
+        return {
+            "last_ts": self.last_ts,
+            "day": self.day.to_list(),
+            "hours": {k: b.to_list() for k, b in self.hours.items()},
+            "minutes": {k: b.to_list() for k, b in self.minutes.items()},
+        }
+
+    @classmethod
+    def from_json(cls, day: str, data):
+        r = cls(day)
+        r.last_ts = data.get("last_ts")
+        r.day = Bucket.from_list(data["day"])
+        r.hours = {k: Bucket.from_list(v) for k, v in data.get("hours", {}).items()}
+        r.minutes = {k: Bucket.from_list(v) for k, v in data.get("minutes", {}).items()}
+        return r
+
+
+def _tick_seconds(prev_ts, ts):
+    if not prev_ts:
+        return TICK_SECONDS
+    try:
+        gap = (datetime.fromisoformat(ts) - datetime.fromisoformat(prev_ts)).total_seconds()
+    except ValueError:
+        return TICK_SECONDS
+    return gap if 0 < gap <= MAX_GAP_SECONDS else TICK_SECONDS
+
+
+def _add_entry(r: DayRollup, entry: dict) -> bool:
+    """把一条记录加进当天的桶；已经聚合过（ts 不晚于 last_ts）或没有分数时返回 False。"""
+    ts = entry.get("ts")
+    if not ts or entry.get("pred_focus") is None:
+        return False
+    if r.last_ts and ts <= r.last_ts:
+        return False  # 已经聚合过（重放 / 重启后重复写入）
+    seconds = _tick_seconds(r.last_ts, ts)
+    r.add(ts, float(entry["pred_focus"]), entry.get("app"), split_tags(entry.get("tags")), seconds)
+    return True
+
+
+class FocusRollups:
+    """
+    增量聚合器。root 为 None 时只在内存里（例如当前 session 的统计）；
+    否则按天读写 root/YYYY-MM-DD.json，只改写有变化的那几天。
+    给了 log_path 时，某天第一次用到却还没有文件（例如升级后第一次启动的今天），
+    先从日志补上这一天已经记下的记录，不会只剩启动之后的 tick。
+    """
+
+    def __init__(self, root=None, log_path=None):
+        self.root = Path(root) if root else None
+        self.log_path = log_path
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+        self._days = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def _path(self, day: str) -> Path:
+        return self.root / f"{day}.json"
+
+    def _get_day(self, day: str) -> DayRollup:
+        r = self._days.get(day)
+        if r is None:
+            if self.root is not None:
+                r = load_day(self.root, day)
+                if r is None and self.log_path is not None:
+                    r = self._day_from_log(day)
+            r = self._days[day] = r or DayRollup(day)
+        return r
+
+    def _day_from_log(self, day: str) -> DayRollup:
+        from activity_log import iter_records
+        r = DayRollup(day)
+        try:
+            for rec in iter_records(self.log_path, start=day, end=f"{day}T23:59:59.999999"):
+                _add_entry(r, rec)
+        except Exception as e:
+            print(f"rollup log read failed ({day}):", e)
+        if r.last_ts:
+            self._dirty.add(day)
+        return r
+
+    # ---------- 写入 ----------
+    def add(self, entry: dict):
+        ts = entry.get("ts")
+        if not ts or entry.get("pred_focus") is None:
+            return
+        day = ts[:10]
+        with self._lock:
+            if _add_entry(self._get_day(day), entry):
+                self._dirty.add(day)
+
+    def add_many(self, entries):
+        for e in entries:
+            self.add(e)
+
+    def save(self):
+        """只写有变化的天；不再变化的旧天从内存中释放。"""
+        if self.root is None:
+            return
+        with self._lock:
+            dirty = {d: self._days[d].to_json() for d in self._dirty}
+            self._dirty.clear()
+            latest = max(self._days) if self._days else None
+            for d in list(self._days):
+                if d != latest and d not in dirty:
+                    del self._days[d]
+        for day, data in dirty.items():
+            path = self._path(day)
+            # 临时文件名带 pid：后端和前端（补建历史）可能同时写同一个目录
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp, path)
+            except Exception as e:
+                print("rollup save failed:", e)
+
+    # ---------- 查询 ----------
+    def days(self, start_day: str = None, end_day: str = None) -> dict:
+        """{day: DayRollup}；内存里有的直接用，其余从文件读。"""
+        with self._lock:
+            mem = {d: r for d, r in self._days.items()
+                   if (start_day is None or d >= start_day) and (end_day is None or d <= end_day)}
+        out = dict(load_days(self.root, start_day, end_day)) if self.root is not None else {}
+        out.update(mem)
+        return dict(sorted(out.items()))
+
+    def series(self, granularity: str = "minute", start_day: str = None, end_day: str = None):
+        """[(key, Bucket)]，key 为 'YYYY-MM-DD' / 'YYYY-MM-DDTHH' / 'YYYY-MM-DDTHH:MM'。"""
+        out = []
+        for day, r in self.days(start_day, end_day).items():
+            if granularity == "day":
+                out.append((day, r.day))
+            elif granularity == "hour":
+                out.extend((f"{day}T{k}", b) for k, b in sorted(r.hours.items()))
+            elif granularity == "minute":
+                out.extend((f"{day}T{k}", b) for k, b in sorted(r.minutes.items()))
+            else:
+                raise ValueError(f"Unknown granularity: {granularity}")
+        return out
+
+    def summary(self, start_day: str = None, end_day: str = None) -> Bucket:
+        total = Bucket()
+        for r in self.days(start_day, end_day).values():
+            total.merge(r.day)
+        return total
+
+
+def load_day(root, day: str):
+    path = Path(root) / f"{day}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return DayRollup.from_json(day, json.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"rollup load failed ({path.name}):", e)
+        return None
+
+
+def load_days(root, start_day: str = None, end_day: str = None) -> dict:
+    """读取 [start_day, end_day] 内的天文件（按文件名筛选，不碰范围外的文件）。"""
+    root = Path(root)
+    if not root.exists():
+        return {}
+    if start_day and end_day:
+        d0 = datetime.fromisoformat(start_day).date()
+        d1 = datetime.fromisoformat(end_day).date()
+        names = [(d0 + timedelta(days=i)).isoformat() for i in range((d1 - d0).days + 1)]
+    else:
+        names = sorted(p.stem for p in root.glob("????-??-??.json"))
+        names = [d for d in names if (start_day is None or d >= start_day) and (end_day is None or d <= end_day)]
+    out = {}
+    for day in names:
+        r = load_day(root, day)
+        if r is not None:
+            out[day] = r
+    return out
+
+
+def rebuild(root, records) -> int:
+    """清空 root 并用完整日志重建所有桶。"""
+    root = Path(root)
+    if root.exists():
+        for p in root.glob("????-??-??.json"):
+            p.unlink()
+    rollups = FocusRollups(root)
+    n = 0
+    for rec in records:
+        rollups.add(rec)
+        n += 1
+    rollups.save()
+    return n
+
+
+def missing_days(root, log_path, skip=()) -> list:
+    """日志里有记录、但 root 下还没有聚合文件的天（排除 skip），按日期排序。"""
+    from activity_log import logged_days
+    root = Path(root)
+    existing = {p.stem for p in root.glob("????-??-??.json")} if root.exists() else set()
+    return sorted(logged_days(log_path) - existing - set(skip))
+
+
+def backfill(root, log_path, days, should_stop=None) -> int:
+    """
+    从日志（含归档段）补建 days 这些天的聚合文件，只写这些天；返回处理的记录数。
+    连续的天合成一次范围读取，借小时索引直接 seek。正在写日志的今天不要传进来。
+    """
+    from activity_log import iter_records
+    days = sorted(set(days))
+    if not days:
+        return 0
+    wanted = set(days)
+    runs, first = [], days[0]
+    for prev, cur in zip(days, days[1:] + [None]):
+        if cur is None or date.fromisoformat(cur) - date.fromisoformat(prev) > timedelta(days=1):
+            runs.append((first, prev))
+            first = cur
+    rollups = FocusRollups(root)
+    n = 0
+    for start, end in runs:
+        for rec in iter_records(log_path, start=start, end=f"{end}T23:59:59.999999"):
+            if n % 1000 == 0 and should_stop is not None and should_stop():
+                return n  # 这一段不保存：写了半天的文件会被当成已经补建过
+            if rec["ts"][:10] in wanted:
+                rollups.add(rec)
+                n += 1
+        rollups.save()  # 每段写一次，旧天随即从内存释放
+    return n
+
+
+if __name__ == "__main__":
+    from activity_log import iter_records
+
+    BASE_DIR = Path(__file__).resolve().parent
+    ap = argparse.ArgumentParser(description="Rebuild focus rollups from the activity log")
+    ap.add_argument("--root", default=str(BASE_DIR / "focus_rollups"))
+    ap.add_argument("--log", default=str(BASE_DIR / "activity_log_focus.jsonl"))
+    ap.add_argument("--rebuild", action="store_true", help="清空后从日志（含归档段）重建")
+    ap.add_argument("--backfill", action="store_true", help="只补建缺少聚合文件的天（不含今天）")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        n = rebuild(args.root, iter_records(args.log))
+        print(f"Rebuilt rollups from {n} records -> {args.root}")
+    elif args.backfill:
+        todo = missing_days(args.root, args.log, skip=[date.today().isoformat()])
+        n = backfill(args.root, args.log, todo)
+        print(f"Backfilled {len(todo)} days from {n} records -> {args.root}")
+    days = load_days(args.root)
+    for day, r in list(days.items())[-7:]:
+        top = sorted(r.day.apps.items(), key=lambda kv: -kv[1])[:3]
+        print(f"{day}: n={r.day.count:5d} avg={r.day.mean:5.1f} min={r.day.min} max={r.day.max} "
+              f"top={[(a, round(s / 60)) for a, s in top]}")
+    sys.exit(0)
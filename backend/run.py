@@ -1,27 +1,21 @@
 # backend/run.py
+# 导入本模块只定义常量和函数（前端进程 / launcher 也会 import 它）；
+# 模型、日志写入器和键鼠监听分别由 init_models() / init_session() / start_listeners()
+# 在 --backend 进程里显式初始化（见 _run）。
 import sys, os, time, math, threading, json
 from collections import deque
 from datetime import datetime
 from pathlib import Path
 from io import BytesIO
 
-import psutil, joblib
+import psutil
 import win32gui, win32process
-from pynput import keyboard, mouse
-from sentence_transformers import SentenceTransformer
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QTimer
-
-import numpy as np, pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from PIL import Image, ImageTk
-import tkinter as tk
-from tkinter import ttk
-
-# === UI ===
-from pet_ui import FloatingPet
+
+from log_writer import BufferedLogWriter, FSYNC_CLOSE
+from rollups import FocusRollups
+from tick_timing import StageTimer
+from ready_reporter import ReadyReporter
+from focus_engine import infer_tags, embed_text
 
 # === 路径与模型 ===
 # Support PyInstaller bundled path
@@ -30,47 +24,122 @@ if getattr(sys, 'frozen', False):
     BASE_DIR = Path(sys._MEIPASS) / "backend"
 else:
     # Running as script
-BASE_DIR = Path(__file__).resolve().parent
+    BASE_DIR = Path(__file__).resolve().parent
 BUNDLE_PATH = BASE_DIR / "focus_regressor_sbert.pkl"
 LOG_PATH = BASE_DIR / "activity_log_focus.jsonl"
+COLUMN_STORE_DIR = BASE_DIR / "activity_columns"  # 列式副本（python columnar_store.py 导入旧日志）
+ROLLUP_DIR = BASE_DIR / "focus_rollups"           # 按天的分钟/小时/天聚合（python rollups.py --rebuild）
+ROLLUP_SAVE_INTERVAL = 300.0                      # 秒：聚合文件最多多久落盘一次
+EMBED_CACHE_PATH = BASE_DIR / "embedding_cache.npz"
+EMBED_CACHE_SIZE = 4096  # LRU 上限（条），每条 384 维 float32 ≈ 1.5 KB
 
-# === 专注度阈值配置 ===
-FOCUS_THRESHOLD = 40.0  # 专注度低于此值时触发语音提醒（可调整）
-
-# === 加载回归模型 ===
-bundle = joblib.load(BUNDLE_PATH)
-reg = bundle["regressor"]
-scaler = bundle["numeric_scaler"]
-sbert = SentenceTransformer(bundle["sbert_model_name"])
-
-# === 加载 AI 模型 ===
 # Support PyInstaller bundled path
 if getattr(sys, 'frozen', False):
     # Running as compiled executable
     AI_DIR = Path(sys._MEIPASS) / "AI Part"
 else:
     # Running as script
-AI_DIR = (BASE_DIR / ".." / "AI Part").resolve()
-sys.path.append(str(AI_DIR))
-import importlib.util
-spec = importlib.util.spec_from_file_location("AI", str(AI_DIR / "AI.py"))
-AI = importlib.util.module_from_spec(spec)
-sys.modules["AI"] = AI
-sys.modules["__main__"] = AI
-spec.loader.exec_module(AI)
-
-FocusClassifier = AI.FocusClassifier
-ai_model = FocusClassifier(use_gpu=False)
-ai_model.load_model(str(AI_DIR / "focus_model.pkl"))
-
-# === 记录 session start ===
-SESSION_START = datetime.now().isoformat()
-SESSION_SCORES = []  # ✅ 实时缓存每次 tick 的 focus score
-try:
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps({"session_start": SESSION_START}, ensure_ascii=False) + "\n")
-except Exception as e:
-    print("Session start log failed:", e)
+    AI_DIR = (BASE_DIR / ".." / "AI Part").resolve()
+
+# === 日志写入配置 ===
+LOG_FLUSH_INTERVAL = 60.0   # 秒：后台线程最长多久写一次盘
+LOG_FLUSH_SIZE = 64         # 条：缓冲达到该条数时立即写盘
+LOG_FSYNC = FSYNC_CLOSE     # never / close / always
+LOG_ROTATE_BYTES = 4 * 1024 * 1024  # 当前段超过 4 MB 时压缩归档
+LOG_ROTATE_DAILY = True             # 跨天时也归档（每段最多一天）
+
+# === tick 分阶段计时（FOXMATE_TICK_TIMING=1 开启，也可在桌宠右键 Debug 菜单里切换）===
+tick_timer = StageTimer(window=720)  # 最近 720 个 tick ≈ 1 小时
+
+# === 专注度阈值配置 ===
+FOCUS_THRESHOLD = 40.0  # 专注度低于此值时触发语音提醒（可调整）
+
+# 常驻推理服务地址（可选，见 inference_service.py）；为空时在本进程加载模型
+INFERENCE_SERVICE = os.environ.get("FOXMATE_INFERENCE_SERVICE", "").strip()
+
+# 以下全局对象由 init_* 填充
+engine = None
+reg = scaler = sbert = lean_reg = emb_cache = None
+ai_model = None
+remote = None  # InferenceClient（使用推理服务时）
+SESSION_START = None
+session_rollup = log_writer = column_store = rollups = None
+_listeners = None
+_last_rollup_save = 0.0
+ready_reporter = None  # 启动进度通道（_run 里创建，见 ready_reporter.py）
+
+
+# === 加载模型 ===
+def init_models():
+    """
+    加载 SBERT + LightGBM 回归器和 AI 集成模型（只加载一次，见 focus_engine.py）。
+    设置了 FOXMATE_INFERENCE_SERVICE=host:port 且服务可用时，不在本进程加载模型，
+    改为把每个 tick 发给常驻推理服务（inference_service.py）。
+    """
+    global engine, reg, scaler, sbert, lean_reg, emb_cache, ai_model, remote
+    if engine is not None or remote is not None:
+        return
+
+    if INFERENCE_SERVICE:
+        from inference_client import InferenceClient
+        try:
+            client = InferenceClient.from_address(INFERENCE_SERVICE)
+            print("Using inference service:", INFERENCE_SERVICE, client.ping().get("models"))
+            remote = client
+            return
+        except OSError as e:
+            print(f"Inference service {INFERENCE_SERVICE} unavailable ({e}), loading models locally")
+
+    from focus_engine import FocusEngine
+    engine = FocusEngine(BUNDLE_PATH, AI_DIR, embed_cache_path=EMBED_CACHE_PATH,
+                         embed_cache_size=EMBED_CACHE_SIZE)
+    reg, scaler, sbert = engine.reg, engine.scaler, engine.sbert
+    lean_reg, emb_cache, ai_model = engine.lean_reg, engine.emb_cache, engine.classifier
+
+
+# === 日志 / 聚合 ===
+def init_session():
+    """打开日志写入器、列式存储和聚合，并记录 session start。"""
+    global SESSION_START, session_rollup, log_writer, column_store, rollups
+    if log_writer is not None:
+        return
+
+    from columnar_store import ColumnarActivityStore, catch_up
+
+    # === 记录 session start ===
+    SESSION_START = datetime.now().isoformat()
+    # ✅ 本次 session 的增量聚合（只在内存里），代替无限增长的分数列表
+    session_rollup = FocusRollups()
+    # 长期持有的缓冲写入器：tick 只入队，批量写盘在后台线程完成
+    log_writer = BufferedLogWriter(LOG_PATH, flush_interval=LOG_FLUSH_INTERVAL,
+                                   max_buffer=LOG_FLUSH_SIZE, fsync=LOG_FSYNC,
+                                   rotate_bytes=LOG_ROTATE_BYTES, rotate_daily=LOG_ROTATE_DAILY)
+    log_writer.write({"session_start": SESSION_START})
+    # 每批日志写盘后同步追加到列式存储（在写日志的后台线程中完成）；
+    # 先补导入上次退出后、或存储创建前就已经在日志里的记录
+    try:
+        column_store = ColumnarActivityStore(COLUMN_STORE_DIR)
+        n = catch_up(column_store, LOG_PATH)
+        if n:
+            print(f"Columnar store: imported {n} earlier log records")
+        log_writer.add_listener(column_store.append)
+    except Exception as e:
+        if column_store is not None:
+            column_store.close()  # 补导入失败：释放写锁，命令行导入仍可用
+        column_store = None
+        print("Columnar store disabled:", e)
+
+    # 持久化的分钟/小时/天聚合，同样随日志批量更新；还没有文件的天先从日志补齐
+    rollups = FocusRollups(ROLLUP_DIR, log_path=LOG_PATH)
+    log_writer.add_listener(_sync_rollups)
+
+
+def _sync_rollups(batch):
+    global _last_rollup_save
+    rollups.add_many(batch)
+    if time.time() - _last_rollup_save >= ROLLUP_SAVE_INTERVAL:
+        rollups.save()
+        _last_rollup_save = time.time()
 
 # === 声音提醒 ===
 # 每次专注度低于阈值时播放声音效果
@@ -117,8 +186,16 @@ def on_mouse_move(x, y):
                 mouse_move_deltas.append((t, dp))
         _last_pos = (x, y)
 
-keyboard.Listener(on_press=on_key_press, suppress=False).start()
-mouse.Listener(on_move=on_mouse_move).start()
+def start_listeners():
+    """启动 pynput 键盘 / 鼠标监听（只启动一次）。"""
+    global _listeners
+    if _listeners is not None:
+        return
+    from pynput import keyboard, mouse
+    _listeners = (keyboard.Listener(on_press=on_key_press, suppress=False),
+                  mouse.Listener(on_move=on_mouse_move))
+    for listener in _listeners:
+        listener.start()
 
 def ks_last_60s():
     cutoff = time.time() - WINDOW
@@ -132,42 +209,43 @@ def mouse_px_last_60s():
         _purge_older(mouse_move_deltas, cutoff, is_move=True)
         return sum(dp for _, dp in mouse_move_deltas)
 
-# === tags 推断 ===
-KEYWORDS = {
-    "study": ["docs", "notion", "overleaf", "report", "homework", "lecture", "pdf",
-              "vscode", "pycharm", "jupyter", "word", "google docs"],
-    "entertainment": ["youtube", "netflix", "twitch", "spotify", "music", "reddit",
-                      "weibo", "bilibili"],
-    "meeting": ["zoom", "teams", "meet", "slack"],
-    "shopping": ["amazon", "bestbuy", "ebay", "cart", "checkout"],
-    "email": ["gmail", "outlook", "inbox", "compose"]
-}
-
-def infer_tags(app, title):
-    t = f"{app} {title}".lower()
-    tags = [tag for tag, kws in KEYWORDS.items() if any(k in t for k in kws)]
-    if not tags:
-        tags.append("browsing")
-    return ", ".join(sorted(set(tags + ["behavior"])))
-
 # === focus预测 ===
 def predict_focus(app, title, ks_per_min, mouse_px_per_min):
     tags = infer_tags(app, title)
-    text = f"{app} | {title} | {tags}"
-    emb = sbert.encode([text], convert_to_numpy=True)
-    num = scaler.transform([[ks_per_min, mouse_px_per_min]])
-    X = np.hstack([emb, num])
-    X_df = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
-    score = float(reg.predict(X_df)[0])
+    text = embed_text(app, title, tags)
+    with tick_timer.stage("encode"):
+        emb = emb_cache.encode(text)
+    with tick_timer.stage("scale"):
+        lean_reg.fill_row(emb, (ks_per_min, mouse_px_per_min))
+    with tick_timer.stage("regress"):
+        score = lean_reg.predict_row()
     return max(0.0, min(100.0, score)), tags
 
 # === tick ===
-def tick(pet: FloatingPet):
-    app_name, title = get_active_window_info()
-    ks = ks_last_60s()
-    mp = mouse_px_last_60s()
-    score, tags = predict_focus(app_name, title, ks, mp)
-    SESSION_SCORES.append(score)  # ✅ 缓存实时分数
+# tick() 在后台推理线程中执行（见 inference_worker.py），不能直接操作 pet；
+# 需要更新 UI 的内容通过返回值交给 InferenceWorker 发信号。
+def tick():
+    try:
+        with tick_timer.stage("total"):
+            return _tick()
+    finally:
+        # 第一个 tick 跑完（成功或失败）即视为后端就绪，前端可以交接退出
+        if ready_reporter is not None and not ready_reporter.done:
+            ready_reporter.ready()
+
+def _tick():
+    with tick_timer.stage("window"):
+        app_name, title = get_active_window_info()
+        ks = ks_last_60s()
+        mp = mouse_px_last_60s()
+    remote_result = None
+    if remote is not None:
+        with tick_timer.stage("remote"):
+            remote_result = remote.predict([{"app": app_name, "title": title,
+                                             "keystrokes_per_min": ks, "mouse_px_per_min": mp}])[0]
+        score, tags = remote_result["score"], remote_result["tags"]
+    else:
+        score, tags = predict_focus(app_name, title, ks, mp)
 
     entry = {
         "ts": datetime.now().isoformat(),
@@ -179,39 +257,58 @@ def tick(pet: FloatingPet):
         "pred_focus": round(score, 2),
     }
 
-    try:
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception as e:
-        print("log write error:", e)
+    with tick_timer.stage("log"):
+        log_writer.write(entry)
+        session_rollup.add(entry)  # ✅ 缓存实时分数（cleanup 时先停线程再读取）
 
+    message, alert = None, False
     try:
-        result = ai_model.monitor_activity(entry)
-        if result:
-            pet.update_message(result["message"])
-            
+        if remote is not None:
+            result = remote_result  # 服务端已经一起给出了分类结果
+        else:
+            with tick_timer.stage("classify"):
+                result = ai_model.monitor_activity(entry)
+        if result and result.get("message"):
+            message = result["message"]
             # 检查专注度是否低于阈值，如果是则播放声音效果
-            if score < FOCUS_THRESHOLD:
-                pet.play_alert_sound()
+            alert = score < FOCUS_THRESHOLD
     except Exception as e:
         print("AI 提示失败:", e)
 
-    pet.update_by_score(score)
-    print(f"[{entry['ts']}] {app_name} | {title} | ks={ks}/min, mouse={mp:.0f}px/min -> {score:.1f}")
+    if emb_cache is not None:
+        cs = emb_cache.stats()
+        note = f"emb cache {cs['hits']}/{cs['hits'] + cs['misses']} hits"
+    else:
+        note = f"via {INFERENCE_SERVICE}"
+    print(f"[{entry['ts']}] {app_name} | {title} | ks={ks}/min, mouse={mp:.0f}px/min -> {score:.1f} ({note})")
+    return {"entry": entry, "score": score, "message": message, "alert": alert}
 
 # === 生成 Tkinter 报告 ===
-def show_report(scores):
+def show_report(session: FocusRollups):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from PIL import Image, ImageTk
+    import tkinter as tk
+    from tkinter import ttk
+
+    # 曲线用每分钟均值，统计量直接来自聚合桶（不需要保留每个 tick 的分数）
+    scores = [b.mean for _, b in session.series("minute")]
+    summary = session.summary()
     if not scores:
         scores = [0]
 
-    avg, high, low = np.mean(scores), np.max(scores), np.min(scores)
+    if summary.count:
+        avg, high, low = summary.mean, summary.max, summary.min
+    else:
+        avg, high, low = 0.0, 0.0, 0.0
 
     fig, ax = plt.subplots(figsize=(5.2, 2.3))
     ax.plot(scores, color="#43A047", linewidth=2, label="Focus Score")
     ax.axhline(avg, color="#FB8C00", linestyle="--", linewidth=1.5, label=f"Avg: {avg:.1f}")
     ax.set_ylim(0, 100)
     ax.set_title("Focus Score Over Time", fontsize=11)
-    ax.set_xlabel("Time Index")
+    ax.set_xlabel("Minute")
     ax.set_ylabel("Score")
     ax.grid(alpha=0.3)
     ax.legend(fontsize=9)
@@ -238,7 +335,7 @@ def show_report(scores):
         f"Average Focus: {avg:.1f}\n"
         f"Highest Focus: {high:.1f}\n"
         f"Lowest Focus: {low:.1f}\n"
-        f"Records: {len(scores)}"
+        f"Records: {summary.count}"
     )
     tk.Label(root, text=summary_text, font=("Arial", 13), bg="white", fg="#333", justify="center").pack(pady=10)
 
@@ -251,22 +348,79 @@ def show_report(scores):
 
 # === 主程序 ===
 def _run():
+    global ready_reporter
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from pet_ui import FloatingPet
+    from inference_worker import InferenceWorker
+
+    # 由前端启动时，把各阶段进度报告给 LaunchingPage
+    ready_reporter = ReadyReporter()
+    ready_reporter.stage("starting")
+    try:
+        init_models()
+        ready_reporter.stage("models_loaded")
+        if ready_reporter.parked:
+            # 预热模式：模型已就绪，但在前端点击 "Fox it!" 之前不开始监控、不显示桌宠
+            ready_reporter.stage("parked")
+            cmd = ready_reporter.wait_command()
+            if cmd != "start":
+                print(f"Parked backend released ({cmd})")
+                ready_reporter.close()
+                return
+        init_session()
+        ready_reporter.stage("session_opened")
+        start_listeners()
+        ready_reporter.stage("listeners_started")
+    except Exception as e:
+        ready_reporter.fail(f"{type(e).__name__}: {e}")
+        raise
+
     # 后端在独立进程中运行，直接创建QApplication即可
     qapp = QApplication(sys.argv)
     pet = FloatingPet()
+    pet.set_tick_timer(tick_timer)  # pet 阶段计时 + 右键 Debug 菜单
     pet.show()
+    ready_reporter.stage("pet_shown")
+
+    # 推理放到后台线程，GUI 线程只负责动画和显示
+    worker = InferenceWorker(tick)
+    worker.scored.connect(pet.update_by_score)
+    worker.message.connect(pet.update_message)
+    worker.alert.connect(pet.play_alert_sound)
+    worker.failed.connect(lambda err: print("tick error:", err))
 
     timer = QTimer()
-    timer.timeout.connect(lambda: tick(pet))
+    timer.timeout.connect(worker.request_tick)  # 上一次还没算完时丢弃本次
     timer.start(5000)  # tick every 5s
+    QTimer.singleShot(0, worker.request_tick)  # 立即跑第一个 tick，不等 5 秒（完成后报告 ready）
 
     def cleanup():
         try:
             timer.stop()
         except:
             pass
+        worker.stop()
+        ready_reporter.close()
+        if worker.dropped:
+            print(f"Dropped {worker.dropped} ticks (inference still busy)")
+        log_writer.close()
+        rollups.save()
+        print(f"Activity log: {log_writer.records} records in {log_writer.flushes} writes")
+        if log_writer.dropped:
+            print(f"Activity log: dropped {log_writer.dropped} records (writes kept failing)")
+        if emb_cache is not None:
+            cs = emb_cache.stats()
+            print(f"Embedding cache: {cs['hits']} hits, {cs['misses']} misses "
+                  f"({cs['hit_rate']:.1%}, {cs['store_hits']} misses served by the embedding store), "
+                  f"{cs['size']} entries")
+            emb_cache.save()
+        if remote is not None:
+            remote.close()
+        if tick_timer.stats():
+            print(tick_timer.report())
         print("🦊 Session ended — generating report...")
-        show_report(SESSION_SCORES)
+        show_report(session_rollup)
         sys.exit(0)
 
     qapp.aboutToQuit.connect(cleanup)
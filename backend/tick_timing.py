@@ -0,0 +1,89 @@
+# backend/tick_timing.py
+import os, time, threading
+from collections import deque
+from contextlib import nullcontext
+
+# tick 各阶段（按执行顺序；report 按这个顺序输出）
+TICK_STAGES = ("window", "encode", "scale", "regress", "remote", "classify", "log", "pet", "total")
+TIMING_ENV = "FOXMATE_TICK_TIMING"  # =1 时启动即开启计时
+
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("_timer", "_name", "_t0")
+
+    def __init__(self, timer, name):
+        self._timer = timer
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timer.record(self._name, time.perf_counter() - self._t0)
+        return False
+
+
+class StageTimer:
+    """
+    tick 流水线的分阶段计时，每个阶段保留最近 window 次耗时，按需算 p50/p95/p99。
+
+        with tick_timer.stage("encode"):
+            emb = emb_cache.encode(text)
+
+    关闭时 stage() 直接返回共享的空上下文（不取时间、不加锁），开销可以忽略。
+    record() 线程安全：推理线程和 GUI 线程（pet 阶段）都会写入。
+    """
+
+    def __init__(self, window: int = 720, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get(TIMING_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+        self.enabled = bool(enabled)
+        self.window = int(window)
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            d = self._samples.get(name)
+            if d is None:
+                d = self._samples[name] = deque(maxlen=self.window)
+            d.append(seconds)
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def stats(self) -> dict:
+        """{stage: {"n", "p50", "p95", "p99", "max"}}，单位毫秒。"""
+        import numpy as np  # 只在查看统计时才需要（run.py 被前端 import 时不加载 numpy）
+        with self._lock:
+            snapshot = {k: np.fromiter(v, dtype=np.float64, count=len(v)) for k, v in self._samples.items()}
+        out = {}
+        order = list(TICK_STAGES) + sorted(k for k in snapshot if k not in TICK_STAGES)
+        for name in order:
+            arr = snapshot.get(name)
+            if arr is None or not len(arr):
+                continue
+            p50, p95, p99 = np.percentile(arr, (50, 95, 99)) * 1000.0
+            out[name] = {"n": len(arr), "p50": p50, "p95": p95, "p99": p99, "max": arr.max() * 1000.0}
+        return out
+
+    def report(self) -> str:
+        stats = self.stats()
+        if not stats:
+            return "Tick timing: no samples" + ("" if self.enabled else f" (disabled, set {TIMING_ENV}=1)")
+        lines = [f"{'stage':<9}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, s in stats.items():
+            lines.append(f"{name:<9}{s['n']:>6}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+        return "\n".join(lines)
@@ -6,11 +6,14 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, r2_score
 from lightgbm import LGBMRegressor
 
+from embedding_cache import EmbeddingStore
+
 BASE_DIR = os.path.dirname(__file__) if "__file__" in globals() else "."
 CSV_NAME = "focus_training_data_large.csv"     # 放同目录
 CSV_PATH = os.path.join(BASE_DIR, CSV_NAME)
 MODEL_PATH = os.path.join(BASE_DIR, "focus_regressor_sbert.pkl")
 EMB_MODEL_NAME = "all-MiniLM-L6-v2"
+EMB_STORE_DIR = os.path.join(BASE_DIR, "embedding_store")  # 向量表，后端 FocusEngine 也会读
 BATCH = 256
 
 df = pd.read_csv(CSV_PATH)
@@ -18,17 +21,23 @@ text_series = (df["app"].astype(str) + " | " + df["title"].astype(str) + " | " +
 num = df[["keystrokes_per_min","mouse_px_per_min"]].astype(float).values
 y = df["focus_score"].astype(float).values
 
-print("Loading SBERT:", EMB_MODEL_NAME)
-sbert = SentenceTransformer(EMB_MODEL_NAME)
-
-def encode_batches(s, bs=BATCH):
-    out = []
-    for i in range(0, len(s), bs):
-        out.append(sbert.encode(s[i:i+bs].tolist(), convert_to_numpy=True, show_progress_bar=False))
-    return np.vstack(out)
-
-print("Encoding...")
-X_text = encode_batches(text_series)
+sbert = None
+
+def encode_batch(texts):
+    # 向量表里全都有时不加载 SBERT
+    global sbert
+    if sbert is None:
+        print("Loading SBERT:", EMB_MODEL_NAME)
+        sbert = SentenceTransformer(EMB_MODEL_NAME)
+    return sbert.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+# 很多行的 app | title | tags 相同：去重后只编码表里没有的文本，再按下标散回每一行
+store = EmbeddingStore(EMB_STORE_DIR, EMB_MODEL_NAME)
+n_stored = len(store)
+print(f"Encoding... {len(text_series)} rows, {text_series.nunique()} unique texts, {n_stored} in store")
+X_text = store.encode_many(text_series.tolist(), encode_batch, batch_size=BATCH)
+print(f"  encoded {len(store) - n_stored} new texts")
+store.save()
 scaler = StandardScaler()
 X_num = scaler.fit_transform(num)
 X = np.hstack([X_text, X_num])
@@ -22,6 +22,10 @@ else:
 sys.path.insert(0, str(FRONTEND_DIR))
 
 from routes import Route
+from backend_link import BackendLink, STAGE_HINTS, PARKED_ENV
+
+# 预热：停在 Home 页时提前启动后端并加载模型，点击 "Fox it!" 后只需发送 start
+PREWARM_BACKEND = os.environ.get("FOXMATE_PREWARM", "1").strip() != "0"
 
 # pages
 from pages.home import HomePage
@@ -125,6 +129,10 @@ class MainWindow(QMainWindow):
             self.stack.addWidget(page)
 
         self.stack.setCurrentIndex(0)
+        self._backend_proc = None
+        self._launch_requested = False
+        self.stack.currentChanged.connect(self._on_page_changed)
+        QApplication.instance().aboutToQuit.connect(self._shutdown_backend)
         QTimer.singleShot(3000, lambda: goto(Route.HOME))
 
         # ===== Drawer + Overlay =====
@@ -279,80 +287,172 @@ class MainWindow(QMainWindow):
 
         self.stack.setCurrentIndex(list(self.pages.keys()).index(Route.HOME))
 
-    def start_backend_and_exit(self):
+    # ===== backend process =====
+    def _backend_alive(self) -> bool:
+        proc = getattr(self, "_backend_proc", None)
+        return proc is not None and proc.poll() is None
+
+    def _spawn_backend(self, parked: bool = False) -> bool:
         """
-        1) switch to launching page
-        2) start backend process with FOXMATE_READY_FLAG
-        3) poll for ready flag -> quit frontend
+        start backend process with FOXMATE_READY_PORT (+ FOXMATE_READY_FLAG as fallback).
+        parked=True: backend loads its models, reports "parked" and waits for {"cmd": "start"}.
         """
         import subprocess
 
-        # 1) show launching
-        try:
-            idx_launch = list(self.pages.keys()).index(Route.LAUNCHING)
-            self.stack.setCurrentIndex(idx_launch)
-            QApplication.processEvents()
-        except Exception:
-            pass
-
-        # 2) ready flag
-        ready_flag = Path(tempfile.gettempdir()) / "foxmate_backend_ready.flag"
+        # 上一次的通道 / 轮询定时器（后端已退出或已交接）先释放，避免 QTcpServer 监听泄漏
+        old_link = getattr(self, "_backend_link", None)
+        if old_link is not None:
+            old_link.close()
+            old_link.deleteLater()
+        old_timer = getattr(self, "_ready_poll_timer", None)
+        if old_timer is not None:
+            old_timer.stop()
+            old_timer.deleteLater()
+            self._ready_poll_timer = None
+
+        self._backend_link = BackendLink(self)
+        self._backend_link.stage.connect(self._on_backend_stage)
+        self._backend_parked = False
+        self._backend_last_stage = None
+
+        # ready flag（旧机制，后端在 ready 时仍会写它）
+        self._ready_flag = Path(tempfile.gettempdir()) / "foxmate_backend_ready.flag"
         try:
-            if ready_flag.exists():
-                ready_flag.unlink()
+            if self._ready_flag.exists():
+                self._ready_flag.unlink()
         except Exception:
             pass
 
         env = os.environ.copy()
-        env["FOXMATE_READY_FLAG"] = str(ready_flag)
+        env["FOXMATE_READY_FLAG"] = str(self._ready_flag)
+        env.update(self._backend_link.env())
+        if parked:
+            env[PARKED_ENV] = "1"
+
+        creationflags = 0
+        if sys.platform == "win32":
+            # 预热进程在用户点击前不应弹出控制台窗口
+            creationflags = subprocess.CREATE_NO_WINDOW if parked else subprocess.CREATE_NEW_CONSOLE
 
         try:
             if getattr(sys, 'frozen', False):
                 exe_path = Path(sys.executable)
-                self._backend_proc = subprocess.Popen(
-                    [str(exe_path), "--backend"],
-                    env=env,
-                    creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0
-                )
+                cmd = [str(exe_path), "--backend"]
             else:
                 launcher_path = Path(__file__).resolve().parent.parent / "launcher.py"
-                self._backend_proc = subprocess.Popen(
-                    [sys.executable, str(launcher_path), "--backend"],
-                    env=env,
-                    creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0
-                )
+                cmd = [sys.executable, str(launcher_path), "--backend"]
+            self._backend_proc = subprocess.Popen(cmd, env=env, creationflags=creationflags)
         except Exception as e:
             print(f"❌ Failed to start backend: {e}")
-            try:
-                idx_home = list(self.pages.keys()).index(Route.HOME)
-                self.stack.setCurrentIndex(idx_home)
-            except Exception:
-                pass
-            return
+            self._backend_proc = None
+            self._backend_link.close()
+            return False
 
-        # 3) poll ready flag
+        # 兜底：flag 文件出现，或后端进程提前退出
         self._ready_poll_timer = QTimer(self)
         self._ready_poll_timer.setInterval(200)
-
-        def _check_ready():
-            if ready_flag.exists():
-                self._ready_poll_timer.stop()
-                QApplication.instance().quit()
-                return
-
-            if getattr(self, "_backend_proc", None) is not None:
-                code = self._backend_proc.poll()
-                if code is not None:
-                    self._ready_poll_timer.stop()
-                    print(f"❌ Backend exited early (code={code}), ready flag not found.")
-                    try:
-                        idx_home = list(self.pages.keys()).index(Route.HOME)
-                        self.stack.setCurrentIndex(idx_home)
-                    except Exception:
-                        pass
-
-        self._ready_poll_timer.timeout.connect(_check_ready)
+        self._ready_poll_timer.timeout.connect(self._check_backend)
         self._ready_poll_timer.start()
+        return True
+
+    def prewarm_backend(self):
+        """Home 页显示时调用：提前启动一个停在 parked 状态的后端。"""
+        if not PREWARM_BACKEND or self._backend_alive():
+            return
+        self._launch_requested = False
+        if self._spawn_backend(parked=True):
+            print("🦊 Pre-warming backend…")
+
+    def start_backend_and_exit(self):
+        """
+        1) switch to launching page
+        2) pre-warmed backend: send "start"; otherwise start a new backend process
+        3) show staged progress reported by the backend -> quit frontend on "ready"
+        """
+        # 1) show launching
+        launching = self.pages[Route.LAUNCHING]
+        try:
+            launching.reset()
+            idx_launch = list(self.pages.keys()).index(Route.LAUNCHING)
+            self.stack.setCurrentIndex(idx_launch)
+            QApplication.processEvents()
+        except Exception:
+            pass
+
+        self._launch_requested = True
+
+        # 2) 已有预热进程：停好了就直接 start，还在加载就等它报告 parked
+        if self._backend_alive():
+            last = self._backend_last_stage
+            if last is not None:
+                launching.set_progress(last.get("progress"), STAGE_HINTS.get(last.get("stage")))
+            if self._backend_parked:
+                self._backend_link.send({"cmd": "start"})
+            return
+
+        if not self._spawn_backend(parked=False):
+            self._back_to_home()
+
+    def _on_backend_stage(self, msg: dict):
+        stage = msg.get("stage")
+        if stage == "error":
+            print(f"❌ Backend failed to start: {msg.get('message')}")
+            return  # 进程随后退出，由 _check_backend 处理
+        self._backend_last_stage = msg
+        if stage == "parked":
+            self._backend_parked = True
+            if self._launch_requested:
+                self._backend_link.send({"cmd": "start"})
+        if not self._launch_requested:
+            return  # 预热中，用户还在 Home 页
+        self.pages[Route.LAUNCHING].set_progress(msg.get("progress"), STAGE_HINTS.get(stage))
+        if stage == "ready":
+            self._handover_to_backend()
+
+    def _check_backend(self):
+        if self._launch_requested and self._ready_flag.exists():
+            self._handover_to_backend()
+            return
+
+        proc = getattr(self, "_backend_proc", None)
+        if proc is not None and proc.poll() is not None:
+            self._ready_poll_timer.stop()
+            self._backend_link.close()
+            self._backend_proc = None
+            if self._launch_requested:
+                print(f"❌ Backend exited early (code={proc.returncode}) before reporting ready.")
+                self._back_to_home()
+            else:
+                print(f"Pre-warmed backend exited (code={proc.returncode}).")
+
+    def _handover_to_backend(self):
+        self._ready_poll_timer.stop()
+        self._backend_link.close()
+        self._backend_proc = None  # 后端接管，前端退出时不再关闭它
+        QApplication.instance().quit()
+
+    def _shutdown_backend(self):
+        """前端退出时，如果还有没交接的（预热）后端，让它退出。"""
+        proc = getattr(self, "_backend_proc", None)
+        if proc is None or proc.poll() is not None:
+            return
+        self._backend_link.send({"cmd": "quit"})
+        self._backend_link.close()  # 连接断开本身也会让 parked 后端退出
+        try:
+            proc.wait(timeout=2)
+        except Exception:
+            proc.kill()
+
+    def _on_page_changed(self, index: int):
+        if list(self.pages.keys())[index] == Route.HOME:
+            self.prewarm_backend()
+
+    def _back_to_home(self):
+        try:
+            idx_home = list(self.pages.keys()).index(Route.HOME)
+            self.stack.setCurrentIndex(idx_home)
+        except Exception:
+            pass
 
 
 def main():
@@ -0,0 +1,90 @@
+# frontend/backend_link.py
+import json
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QTcpServer, QHostAddress
+
+READY_PORT_ENV = "FOXMATE_READY_PORT"  # 与 backend/ready_reporter.py 一致
+PARKED_ENV = "FOXMATE_PARKED"
+
+# 后端报告的阶段 -> LaunchingPage 上显示的文字（描述的是“接下来在做什么”）
+STAGE_HINTS = {
+    "starting": "Loading models",
+    "models_loaded": "Opening activity log",
+    "parked": "Starting your session",
+    "session_opened": "Starting listeners",
+    "listeners_started": "Waking up your fox",
+    "pet_shown": "First focus check",
+    "ready": "Ready",
+}
+
+
+class BackendLink(QObject):
+    """
+    前端一侧的启动进度通道：在 127.0.0.1 的随机端口上监听，
+    端口号通过环境变量 FOXMATE_READY_PORT 传给后端进程。
+    后端每行发一个 JSON（见 backend/ready_reporter.py），这里解析后发 stage 信号；
+    send() 反方向发命令（预热后端的 start / quit）。
+    全部在 GUI 线程的事件循环里完成，不需要额外线程。
+    """
+    stage = Signal(dict)   # {"stage": ..., "progress": int | None, "message": str}
+    disconnected = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QTcpServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        if not self._server.listen(QHostAddress.LocalHost, 0):
+            print("Ready channel listen failed:", self._server.errorString())
+        self._sock = None
+        self._buf = b""
+
+    @property
+    def port(self) -> int:
+        return int(self._server.serverPort()) if self._server.isListening() else 0
+
+    def env(self) -> dict:
+        return {READY_PORT_ENV: str(self.port)} if self.port else {}
+
+    def _on_new_connection(self):
+        sock = self._server.nextPendingConnection()
+        if sock is None:
+            return
+        if self._sock is not None:  # 只接受一个后端
+            sock.close()
+            return
+        self._sock = sock
+        sock.readyRead.connect(self._on_ready_read)
+        sock.disconnected.connect(self._on_disconnected)
+
+    def _on_ready_read(self):
+        self._buf += bytes(self._sock.readAll())
+        *lines, self._buf = self._buf.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                msg = json.loads(line.decode("utf-8"))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            self.stage.emit(msg)
+
+    def send(self, msg: dict) -> bool:
+        """给后端发一行 JSON 命令；还没连上时返回 False。"""
+        if self._sock is None:
+            return False
+        self._sock.write((json.dumps(msg) + "\n").encode("utf-8"))
+        self._sock.flush()
+        return True
+
+    def _on_disconnected(self):
+        self._sock = None
+        self.disconnected.emit()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.disconnected.disconnect(self._on_disconnected)
+            self._sock.close()
+            self._sock = None
+        self._server.close()
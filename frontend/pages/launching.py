@@ -61,6 +61,7 @@ class LaunchingPage(QWidget):
         spinner.setFixedWidth(120)
         spinner.setFixedHeight(10)
         spinner.setObjectName("Spinner")
+        self.spinner = spinner
 
         # 居中
         spinner_wrap = QWidget()
@@ -79,6 +80,7 @@ class LaunchingPage(QWidget):
         text_font.setPointSize(14)
         text.setFont(text_font)
         text.setObjectName("Hint")
+        self.hint = text
         root.addWidget(text)
 
         root.addStretch(9)
@@ -104,3 +106,17 @@ class LaunchingPage(QWidget):
                 background: #C9B84A;
             }
         """)
+
+    # ===== 后端启动进度（见 backend_link.py）=====
+    def set_progress(self, percent=None, text=None):
+        """percent 为 None 时保持不确定动画；否则显示真实进度。"""
+        if percent is None:
+            self.spinner.setRange(0, 0)
+        else:
+            self.spinner.setRange(0, 100)
+            self.spinner.setValue(max(0, min(100, int(percent))))
+        if text is not None:
+            self.hint.setText(text)
+
+    def reset(self):
+        self.set_progress(None, "Loading")
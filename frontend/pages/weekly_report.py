@@ -1,358 +1,391 @@
-# frontend/pages/home.py
+# frontend/pages/weekly_report.py
+import sys, os
+from datetime import date, timedelta
 from pathlib import Path
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
-    QSizePolicy, QSpacerItem, QGraphicsDropShadowEffect
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QApplication
 )
-from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtWidgets import QLabel
-from PySide6.QtGui import QMovie, QFont, QPixmap
-class ClickableLabel(QLabel):
-    clicked = Signal()
+from PySide6.QtCore import Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QPainter, QColor, QFont
+
+# 兼容 PyInstaller / 本地运行路径：聚合数据由 backend 写在 backend/ 目录下
+if getattr(sys, "frozen", False):
+    BACKEND_DIR = Path(sys._MEIPASS) / "backend"
+else:
+    BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+
+ROLLUP_DIR = BACKEND_DIR / "focus_rollups"
+LOG_PATH = BACKEND_DIR / "activity_log_focus.jsonl"
+
+DISTRACT_THRESHOLD = 40.0  # 与 backend/run.py 的 FOCUS_THRESHOLD 一致：低于它的分钟算分心
+REFRESH_MS = 30_000        # 页面可见时，多久检查一次今天的聚合文件
+TOP_N = 5
+
+
+def _fmt_duration(seconds: float) -> str:
+    minutes = int(round(seconds / 60))
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def _summarize_day(r) -> dict:
+    """DayRollup -> 页面需要的小字典（分心时间按分钟桶的均分筛选）。"""
+    distract = {}
+    for b in r.minutes.values():
+        if b.mean < DISTRACT_THRESHOLD:
+            for app, sec in b.apps.items():
+                distract[app] = distract.get(app, 0.0) + sec
+    return {
+        "mean": r.day.mean,
+        "count": r.day.count,
+        "seconds": r.day.seconds,
+        "tags": dict(r.day.tags),
+        "distract": distract,
+    }
+
+
+class WeeklyLoader(QThread):
+    """
+    后台读取一周的按天聚合文件。
+    known 是 {day: mtime}：mtime 没变的天（已经结束的天基本都是）不再读，
+    所以刷新时通常只重新读今天一个小文件。
+    backfill=True 时先从日志（含归档段）补建所有有记录、但还没有聚合文件的天
+    （不止当前这一周）；今天由后端自己写，跳过。
+    """
+    loaded = Signal(object)  # {"days": {day: summary 或 None}, "mtimes": {day: mtime}, "backfilled": bool}
+    failed = Signal(str)
+
+    def __init__(self, days, known, backfill: bool = False, parent=None):
+        super().__init__(parent)
+        self.days = list(days)
+        self.known = dict(known)
+        self.backfill = backfill
+
+    def run(self):
+        try:
+            from rollups import load_day
+            if self.backfill and LOG_PATH.exists():
+                self._build_from_log()
+                if self.isInterruptionRequested():
+                    return
+
+            out, mtimes = {}, {}
+            for day in self.days:
+                if self.isInterruptionRequested():
+                    return
+                path = ROLLUP_DIR / f"{day}.json"
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    mtime = None
+                mtimes[day] = mtime
+                if day in self.known and self.known[day] == mtime:
+                    continue  # 没变，沿用页面里已有的结果
+                r = load_day(ROLLUP_DIR, day) if mtime is not None else None
+                out[day] = _summarize_day(r) if r is not None else None
+            self.loaded.emit({"days": out, "mtimes": mtimes, "backfilled": self.backfill})
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def _build_from_log(self):
+        from rollups import backfill, missing_days
+        todo = missing_days(ROLLUP_DIR, LOG_PATH, skip=[date.today().isoformat()])
+        if todo:
+            n = backfill(ROLLUP_DIR, LOG_PATH, todo, should_stop=self.isInterruptionRequested)
+            print(f"Weekly report: backfilled {len(todo)} days from {n} log records")
+
+
+class TopBar(QHBoxLayout):
+    def __init__(self, on_menu=None, on_settings=None, on_close=None):
+        super().__init__()
+        self.setContentsMargins(0, 0, 0, 0)
+        self.setSpacing(10)
+
+        def _make_btn(symbol, slot=None):
+            b = QPushButton(symbol)
+            b.setFixedSize(40, 40)
+            b.setCursor(Qt.PointingHandCursor)
+            b.setStyleSheet("""
+                QPushButton {
+                    color: rgba(0,0,0,0.72);
+                    font-size: 20px;
+                    border: none;
+                    background: rgba(255,255,255,0.60);
+                    border-radius: 14px;
+                }
+                QPushButton:hover { background: rgba(243,154,45,0.16); }
+            """)
+            if slot:
+                b.clicked.connect(slot)
+            return b
+
+        self.btn_menu = _make_btn("≡", on_menu)
+        self.btn_settings = _make_btn("⚙", on_settings)
+        self.btn_close = _make_btn("✕", on_close)
+
+        self.addWidget(self.btn_menu)
+        self.addStretch()
+        self.addWidget(self.btn_settings)
+        self.addWidget(self.btn_close)
+
+
+class DailyBars(QWidget):
+    """7 天平均专注度的小柱状图（自己画，不引入 matplotlib）。"""
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setCursor(Qt.PointingHandCursor)
-
-    def mousePressEvent(self, e):
-        if e.button() == Qt.LeftButton:
-            self.clicked.emit()
-        super().mousePressEvent(e)
-
-
-class HomePage(QWidget):
-    def _go_dressup(self):
-        cb = getattr(self, "on_go_dressup", None)
-        if callable(cb):
-            cb()
-    def __init__(
-        self,
-        on_menu,
-        on_settings,
-        on_close,
-        on_go_fox,
-        on_go_weekly,
-        on_fox_it,
-        on_go_dressup=None,   # ✅ 关键：加上这个参数，避免 unexpected keyword
-    ):
+        self.setMinimumHeight(150)
+        self.values = []  # [(label, mean 或 None)]
+
+    def set_values(self, values):
+        self.values = list(values)
+        self.update()
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing, True)
+        n = len(self.values)
+        if not n:
+            return
+        label_h, value_h = 18, 16
+        w = self.width() / n
+        chart_h = self.height() - label_h - value_h
+        f = QFont(self.font())
+        f.setPointSize(9)
+        p.setFont(f)
+        for i, (label, mean) in enumerate(self.values):
+            x = i * w
+            bar_w = w * 0.56
+            bx = x + (w - bar_w) / 2
+            # 轨道
+            p.setPen(Qt.NoPen)
+            p.setBrush(QColor(0, 0, 0, 15))
+            p.drawRoundedRect(int(bx), value_h, int(bar_w), int(chart_h), 6, 6)
+            if mean is not None:
+                h = chart_h * max(0.0, min(mean, 100.0)) / 100.0
+                color = QColor("#1C5B45") if mean >= DISTRACT_THRESHOLD else QColor("#F39A2D")
+                p.setBrush(color)
+                p.drawRoundedRect(int(bx), int(value_h + chart_h - h), int(bar_w), int(h), 6, 6)
+                p.setPen(QColor(0, 0, 0, 170))
+                p.drawText(int(x), 0, int(w), value_h, Qt.AlignCenter, f"{mean:.0f}")
+            p.setPen(QColor(0, 0, 0, 140))
+            p.drawText(int(x), int(self.height() - label_h), int(w), label_h, Qt.AlignCenter, label)
+
+
+class WeeklyReportPage(QWidget):
+    def __init__(self, on_menu=None, on_settings=None, on_close=None):
         super().__init__()
-        self.setObjectName("HomePage")
-        self.setAttribute(Qt.WA_StyledBackground, True)
-        self.setAutoFillBackground(True)
-
-        self.on_menu = on_menu
-        self.on_settings = on_settings
-        self.on_close = on_close
-        self.on_go_fox = on_go_fox
-        self.on_go_weekly = on_go_weekly
-        self.on_fox_it = on_fox_it
-        self.on_go_dressup = on_go_dressup  # ✅ 保存回调
-        self.on_signin = None
-
-        assets_dir = Path(__file__).resolve().parent.parent / "assets"
-
-        # ===== Root layout =====
-        root = QVBoxLayout(self)
-        root.setContentsMargins(18, 16, 18, 18)
-        root.setSpacing(14)
-
-        # ===== Top bar =====
-        top = QHBoxLayout()
-        top.setSpacing(10)
-
-        self.btn_menu = QPushButton("☰")
-        self.btn_menu.setObjectName("menuBtn")
-        self.btn_menu.setCursor(Qt.PointingHandCursor)
-        self.btn_menu.clicked.connect(self.on_menu)
-        top.addWidget(self.btn_menu, 0, Qt.AlignLeft)
-
-        top.addStretch(1)
-
-        self.btn_signin = QPushButton("Sign In")
-        self.btn_signin.setObjectName("signinBtn")
-        self.btn_signin.setCursor(Qt.PointingHandCursor)
-        self.btn_signin.clicked.connect(self._handle_signin_clicked)
-        top.addWidget(self.btn_signin, 0, Qt.AlignRight)
-
-        self.btn_settings = QPushButton("⚙")
-        self.btn_settings.setObjectName("settingsBtn")
-        self.btn_settings.setCursor(Qt.PointingHandCursor)
-        self.btn_settings.clicked.connect(self.on_settings)
-        top.addWidget(self.btn_settings, 0, Qt.AlignRight)
-
-        self.btn_close = QPushButton("✕")
-        self.btn_close.setObjectName("closeBtn")
-        self.btn_close.setCursor(Qt.PointingHandCursor)
-        self.btn_close.clicked.connect(self.on_close)
-        top.addWidget(self.btn_close, 0, Qt.AlignRight)
-
-        root.addLayout(top)
-
-        # ===== Hero =====
-        root.addItem(QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding))
-
-        self.hero = QFrame()
-        self.hero.setObjectName("hero")
-        self.hero.setMinimumHeight(360)
-
-        hero_layout = QVBoxLayout(self.hero)
-        hero_layout.setContentsMargins(0, 0, 0, 0)
-        hero_layout.setSpacing(10)
-        hero_layout.setAlignment(Qt.AlignHCenter)
-
-        self.btn_power = QPushButton("Fox it!")
-        self.btn_power.setObjectName("powerBtn")
-        self.btn_power.setCursor(Qt.PointingHandCursor)
-        self.btn_power.setFixedSize(290, 290)
-        self.btn_power.clicked.connect(self.on_fox_it)
-
-        f_btn = QFont()
-        f_btn.setPointSize(28)
-        f_btn.setWeight(QFont.DemiBold)
-        self.btn_power.setFont(f_btn)
-
-        shadow = QGraphicsDropShadowEffect(self.btn_power)
-        shadow.setBlurRadius(32)
-        shadow.setOffset(0, 10)
-        shadow.setColor(Qt.black)
-        self.btn_power.setGraphicsEffect(shadow)
-
-        self.lbl_sub = QLabel("Let's focus together")
-        self.lbl_sub.setObjectName("subtitle")
-        self.lbl_sub.setAlignment(Qt.AlignCenter)
-
-        hero_layout.addWidget(self.btn_power, 0, Qt.AlignHCenter)
-        hero_layout.addWidget(self.lbl_sub, 0, Qt.AlignHCenter)
-
-        # ===== Fox sticker overlay =====
-        self.fox_sticker = QLabel(self.hero)
-        self.fox_sticker.setObjectName("foxSticker")
-        self.fox_sticker.setAttribute(Qt.WA_TransparentForMouseEvents)
-
-        sticker_candidates = [
-            assets_dir / "fox_sticker.png",
-            assets_dir / "fox_sticker.jpg",
-            assets_dir / "fox_sticker.webp",
-        ]
-        self._fox_pixmap = None
-        for p in sticker_candidates:
-            if p.exists():
-                pm = QPixmap(str(p))
-                if not pm.isNull():
-                    self._fox_pixmap = pm
-                    break
-
-        if self._fox_pixmap:
-            self.fox_sticker.setPixmap(self._fox_pixmap)
-            self.fox_sticker.setScaledContents(True)
-        else:
-            self.fox_sticker.setText("🦊")
-            self.fox_sticker.setAlignment(Qt.AlignCenter)
-
-        root.addWidget(self.hero)
-
-        root.addItem(QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding))
-
-        # =========================
-        # ===== Bottom card =====
-        # =========================
-        self.card = QFrame()
-        self.card.setObjectName("bottomCard")
-        self.card.setMinimumHeight(150)
-
-        from PySide6.QtWidgets import QGridLayout
-        grid = QGridLayout(self.card)
-        grid.setContentsMargins(18, 16, 18, 16)
-        grid.setHorizontalSpacing(12)
-        grid.setVerticalSpacing(8)
-
-        # 标题：左上
-        self.lbl_title = QLabel("Your Fox")
-        self.lbl_title.setObjectName("cardTitle")
-        grid.addWidget(self.lbl_title, 0, 0, 1, 2, alignment=Qt.AlignLeft | Qt.AlignTop)
-
-        # GIF：左下（可点击）
-        self.lbl_fox = ClickableLabel()
-        self.lbl_fox.setObjectName("foxGif")
-        self.lbl_fox.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
-        self.lbl_fox.clicked.connect(self._go_dressup)
-
-        gif_candidates = [
-            assets_dir / "fox_icon.gif",   # ✅ 你说你用这个
-            assets_dir / "weekly_fox.gif",
-            assets_dir / "fox_anim.gif",
-        ]
-        self._fox_movie = None
-        for gp in gif_candidates:
-            if gp.exists():
-                mv = QMovie(str(gp))
-                if mv.isValid():
-                    self._fox_movie = mv
-                    break
-
-        gif_size = 140
-        self.lbl_fox.setFixedSize(gif_size, gif_size)
-
-        if self._fox_movie:
-            self._fox_movie.setScaledSize(QSize(gif_size, gif_size))
-            self.lbl_fox.setMovie(self._fox_movie)
-            self._fox_movie.start()
-        else:
-            self.lbl_fox.setText("🦊")
-
-        grid.addWidget(self.lbl_fox, 1, 0, alignment=Qt.AlignLeft | Qt.AlignBottom)
-
-        # Weekly Report：右下
-        self.btn_weekly = QPushButton("Weekly Report")
-        self.btn_weekly.setObjectName("weeklyBtn")
-        self.btn_weekly.setCursor(Qt.PointingHandCursor)
-        self.btn_weekly.clicked.connect(self.on_go_weekly)
-        grid.addWidget(self.btn_weekly, 1, 1, alignment=Qt.AlignRight | Qt.AlignBottom)
-
-        grid.setColumnStretch(0, 0)
-        grid.setColumnStretch(1, 1)
-        grid.setRowStretch(0, 1)
-        grid.setRowStretch(1, 1)
-
-        card_shadow = QGraphicsDropShadowEffect(self.card)
-        card_shadow.setBlurRadius(26)
-        card_shadow.setOffset(0, 10)
-        card_shadow.setColor(Qt.black)
-        self.card.setGraphicsEffect(card_shadow)
-
-        root.addWidget(self.card)
-
-        # ===== Styles =====
-        self.setStyleSheet("""
-        QWidget#HomePage {
-            background: qlineargradient(
-                x1:0, y1:0, x2:0, y2:1,
-                stop:0 #FFF6E8,
-                stop:0.45 #FBE7CF,
-                stop:0.85 #F6D5A8,
-                stop:1 #F3C98D
-            );
-        }
-
-        QPushButton#menuBtn {
-            width: 46px; height: 46px;
-            border-radius: 23px;
-            border: none;
-            background: #F39A2D;
-            color: white;
-            font-size: 18px;
-        }
-        QPushButton#menuBtn:hover { background: #F6A94A; }
-
-        QPushButton#signinBtn {
-            padding: 10px 18px;
-            border-radius: 16px;
-            border: 2px solid rgba(243, 154, 45, 0.70);
-            background: rgba(255,255,255,0.75);
-            color: #1C5B45;
-            font-size: 16px;
-            font-weight: 600;
-        }
-        QPushButton#signinBtn:hover { background: rgba(255,255,255,0.92); }
-
-        QPushButton#settingsBtn, QPushButton#closeBtn {
-            width: 46px; height: 46px;
-            border-radius: 16px;
-            border: none;
-            background: rgba(255,255,255,0.70);
-            color: #F39A2D;
-            font-size: 18px;
-        }
-        QPushButton#settingsBtn:hover, QPushButton#closeBtn:hover {
-            background: rgba(255,255,255,0.92);
-        }
-
-        QPushButton#powerBtn {
-            border-radius: 145px;
-            border: 10px solid #F39A2D;
-            background: #214F3D;
-            color: #F6EAD3;
-        }
-        QPushButton#powerBtn:hover { background: #1E4738; }
-        QPushButton#powerBtn:pressed { background: #193D30; }
-
-        QLabel#subtitle {
-            color: rgba(0,0,0,0.70);
-            font-size: 14px;
-            letter-spacing: 0.6px;
-        }
-
-        QFrame#bottomCard {
-    background: transparent;     /* ✅ 去掉灰底 */
-    border: none;                /* ✅ 去掉边框线 */
-}
-
-        QLabel#cardTitle {
-            color: #1C5B45;
-            font-size: 22px;
-            font-weight: 700;
-        }
-
-        QLabel#foxGif {
-            background: transparent;
-            border: none;
-        }
-
-        QPushButton#weeklyBtn {
-    padding: 16px 22px;                 /* ✅ 更大 */
-    border-radius: 20px;
-    border: 1px solid rgba(28, 91, 69, 0.18);
-    background: rgba(179, 227, 211, 0.78);
-    color: #214F3D;
-    font-size: 20px;                    /* ✅ 字更大 */
-    font-weight: 700;
-    min-width: 180px;                   /* ✅ 更宽 */
-    min-height: 50px;                   /* ✅ 更高 */
-}
-QPushButton#weeklyBtn:hover {
-    background: rgba(179, 227, 211, 0.95);
-}
-
-        QLabel#foxSticker {
-            color: #F39A2D;
-            font-size: 72px;
-            background: transparent;
-        }
-        """)
-
-        self._layout_fox()
 
-    def _go_dressup(self):
-        cb = getattr(self, "on_go_dressup", None)
-        if callable(cb):
-            cb()
-
-    def resizeEvent(self, e):
-        super().resizeEvent(e)
-        self._layout_fox()
+        # ✅ 让 theme.py 的 QWidget#Page 背景生效
+        self.setObjectName("Page")
+        self.setAttribute(Qt.WA_StyledBackground, True)
 
-    def _layout_fox(self):
-        if not self.hero or not self.btn_power:
+        self.week_end = date.today()
+        self._summaries = {}  # day -> summary / None
+        self._mtimes = {}     # day -> 聚合文件 mtime（增量刷新用）
+        self._backfilled = False  # 本次运行是否已从日志补建过缺失的天
+        self._loader = None
+        self._reload_pending = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        # 顶部 bar
+        top = TopBar(on_menu, on_settings, on_close)
+        layout.addLayout(top)
+
+        # Title
+        title = QLabel("Weekly Report")
+        title.setAlignment(Qt.AlignCenter)
+        title.setStyleSheet("color:#1C5B45; font-size:26px; font-weight:900; background:transparent;")
+        layout.addWidget(title)
+
+        # 周切换
+        nav = QHBoxLayout()
+        self.btn_prev = self._make_nav_btn("‹", lambda: self._shift_week(-7))
+        self.btn_next = self._make_nav_btn("›", lambda: self._shift_week(7))
+        self.lbl_range = QLabel()
+        self.lbl_range.setAlignment(Qt.AlignCenter)
+        self.lbl_range.setStyleSheet("color: rgba(0,0,0,0.62); font-size:14px; font-weight:700;")
+        nav.addWidget(self.btn_prev)
+        nav.addWidget(self.lbl_range, 1)
+        nav.addWidget(self.btn_next)
+        layout.addLayout(nav)
+
+        # 每日平均专注度
+        card, lay = self._make_card("Daily Focus")
+        self.lbl_overall = QLabel("Loading…")
+        self.lbl_overall.setStyleSheet("color: rgba(0,0,0,0.55); font-size:13px; font-weight:600;")
+        lay.addWidget(self.lbl_overall)
+        self.bars = DailyBars()
+        lay.addWidget(self.bars)
+        layout.addWidget(card)
+
+        # 分心应用 / 标签时间
+        card, self.apps_lay = self._make_card("Top Distractions")
+        layout.addWidget(card)
+        card, self.tags_lay = self._make_card("Time by Tag")
+        layout.addWidget(card)
+
+        layout.addStretch()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(REFRESH_MS)
+        self._refresh_timer.timeout.connect(self.reload)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._stop_loader)
+
+        self._update_range_label()
+
+    # ---------- UI helpers ----------
+    def _make_nav_btn(self, symbol, slot):
+        b = QPushButton(symbol)
+        b.setFixedSize(32, 32)
+        b.setCursor(Qt.PointingHandCursor)
+        b.setStyleSheet("""
+            QPushButton {
+                color: rgba(0,0,0,0.72); font-size: 20px; border: none;
+                background: rgba(255,255,255,0.60); border-radius: 12px;
+            }
+            QPushButton:hover { background: rgba(243,154,45,0.16); }
+            QPushButton:disabled { color: rgba(0,0,0,0.20); }
+        """)
+        b.clicked.connect(slot)
+        return b
+
+    def _make_card(self, heading):
+        frame = QFrame()
+        frame.setObjectName("ReportCard")
+        frame.setStyleSheet("""
+            QFrame#ReportCard {
+                background: rgba(255,255,255,0.70);
+                border: 1px solid rgba(0,0,0,0.06);
+                border-radius: 18px;
+            }
+        """)
+        lay = QVBoxLayout(frame)
+        lay.setContentsMargins(14, 12, 14, 12)
+        lay.setSpacing(6)
+        lbl = QLabel(heading)
+        lbl.setStyleSheet("color: rgba(0,0,0,0.82); font-size:16px; font-weight:900; background:transparent;")
+        lay.addWidget(lbl)
+        return frame, lay
+
+    def _set_rows(self, lay, rows, empty_text):
+        """重建卡片里的条目（保留第 0 个标题）。"""
+        while lay.count() > 1:
+            item = lay.takeAt(1)
+            if item.widget():
+                item.widget().deleteLater()
+        if not rows:
+            rows = [(empty_text, "")]
+        for name, value in rows:
+            row = QWidget()
+            h = QHBoxLayout(row)
+            h.setContentsMargins(0, 0, 0, 0)
+            left = QLabel(name)
+            left.setStyleSheet("color: rgba(0,0,0,0.72); font-size:14px; background:transparent;")
+            right = QLabel(value)
+            right.setStyleSheet("color: #1C5B45; font-size:14px; font-weight:700; background:transparent;")
+            h.addWidget(left, 1)
+            h.addWidget(right, 0, Qt.AlignRight)
+            lay.addWidget(row)
+
+    # ---------- 数据 ----------
+    def _week_days(self):
+        return [(self.week_end - timedelta(days=6 - i)).isoformat() for i in range(7)]
+
+    def _update_range_label(self):
+        days = self._week_days()
+        self.lbl_range.setText(f"{days[0][5:]}  –  {days[-1][5:]}")
+        self.btn_next.setEnabled(self.week_end < date.today())
+
+    def _shift_week(self, delta_days):
+        self.week_end = min(self.week_end + timedelta(days=delta_days), date.today())
+        self._update_range_label()
+        self._render()   # 已缓存的天立刻显示，其余由后台补上
+        self.reload()
+
+    def reload(self):
+        """后台加载当前周；已有加载在跑时，等它结束后再来一次。"""
+        if self._loader is not None:
+            self._reload_pending = True
             return
-
-        btn_geo = self.btn_power.geometry()
-
-        w, h = 240, 240
-        self.fox_sticker.setFixedSize(w, h)
-
-        if self._fox_pixmap:
-            pm = self._fox_pixmap.scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.fox_sticker.setPixmap(pm)
-            self.fox_sticker.setScaledContents(False)
-
-        x = btn_geo.x() + btn_geo.width() - int(w * 0.72) + 10
-        y = btn_geo.y() + btn_geo.height() - int(h * 0.78) + 10
-        self.fox_sticker.move(x, y)
-
-    def update_login_ui(self, logged_in: bool, username: str, membership: str):
-        self.btn_signin.setText(username if logged_in else "Sign In")
-
-    def _handle_signin_clicked(self):
-        if callable(self.on_signin):
-            self.on_signin()
+        days = self._week_days()
+        known = {d: self._mtimes[d] for d in days if d in self._mtimes}
+        self._loader = WeeklyLoader(days, known, backfill=not self._backfilled, parent=self)
+        self._loader.loaded.connect(self._on_loaded)
+        self._loader.failed.connect(self._on_failed)
+        self._loader.finished.connect(self._on_loader_finished)
+        self._loader.start()
+
+    def _on_loaded(self, result):
+        self._backfilled = self._backfilled or result["backfilled"]
+        self._mtimes.update(result["mtimes"])
+        changed = result["days"]
+        self._summaries.update(changed)
+        if changed:
+            self._render()
+
+    def _on_failed(self, msg):
+        print("Weekly report load failed:", msg)
+        self.lbl_overall.setText("No data yet")
+
+    def _on_loader_finished(self):
+        self._loader.deleteLater()
+        self._loader = None
+        if self._reload_pending:
+            self._reload_pending = False
+            self.reload()
+
+    def _stop_loader(self):
+        self._refresh_timer.stop()
+        if self._loader is not None:
+            self._loader.requestInterruption()
+            self._loader.wait(2000)
+
+    def _render(self):
+        days = self._week_days()
+        summaries = [self._summaries.get(d) for d in days]
+        self.bars.set_values([
+            (date.fromisoformat(d).strftime("%a"), s["mean"] if s and s["count"] else None)
+            for d, s in zip(days, summaries)
+        ])
+
+        total_n = sum(s["count"] for s in summaries if s)
+        if total_n:
+            avg = sum(s["mean"] * s["count"] for s in summaries if s) / total_n
+            tracked = sum(s["seconds"] for s in summaries if s)
+            self.lbl_overall.setText(f"Average {avg:.1f}  ·  Tracked {_fmt_duration(tracked)}")
+        else:
+            self.lbl_overall.setText("No data yet")
+
+        distract, tags = {}, {}
+        for s in summaries:
+            if not s:
+                continue
+            for k, v in s["distract"].items():
+                distract[k] = distract.get(k, 0.0) + v
+            for k, v in s["tags"].items():
+                tags[k] = tags.get(k, 0.0) + v
+        top_apps = sorted(((a, s) for a, s in distract.items() if s >= 30), key=lambda kv: -kv[1])[:TOP_N]
+        top_tags = sorted(tags.items(), key=lambda kv: -kv[1])[:TOP_N]
+        self._set_rows(self.apps_lay, [(a, _fmt_duration(s)) for a, s in top_apps], "No distractions 🎉")
+        self._set_rows(self.tags_lay, [(t, _fmt_duration(s)) for t, s in top_tags], "No tags yet")
+
+    # ---------- 可见性 ----------
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.reload()
+        self._refresh_timer.start()
+
+    def hideEvent(self, e):
+        self._refresh_timer.stop()
+        super().hideEvent(e)
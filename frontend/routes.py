@@ -14,5 +14,6 @@ class Route(str, Enum):
     FAQ = "FAQ & Support"
     WELCOME = "welcome"
     LAUNCHING = "launching"
-    AUTH = "auth"
+    AUTH = "auth"
+    DRESS_UP = "dress_up"
 
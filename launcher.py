@@ -31,6 +31,7 @@ except (ImportError, ModuleNotFoundError):
 
 try:
     # 导入后端模块（让PyInstaller打包backend/run.py及其依赖）
+    # run.py 导入时只定义函数，模型和键鼠监听在 --backend 进程的 run._run() 里才初始化
     import run as _backend_run_module
 except (ImportError, ModuleNotFoundError):
     # 开发环境中可能失败，这是正常的